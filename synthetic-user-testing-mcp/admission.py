@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Admission control for the browser-backed tools.
+
+Every browser-backed tool call holds one slot while it runs. Slots are
+limited server-wide (``max_concurrency``) and per client (``max_per_client``)
+so one busy agent cannot starve the others when the server is shared over
+HTTP. Calls that find no free slot wait in a queue for up to
+``queue_timeout`` seconds; once ``max_queue`` calls are already waiting, new
+calls are turned away immediately. A rejected call returns an error result
+with ``"status": 429`` and a ``retry_after`` hint instead of running.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Calls made outside an MCP request (scripts, benchmarks, the scheduler)
+LOCAL_CLIENT = "local"
+
+class AdmissionRejected(Exception):
+    """No slot became free for the call"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def current_client() -> str:
+    """Identify the MCP client behind the current tool call"""
+    try:
+        from fastmcp.server.dependencies import get_context
+        context = get_context()
+    except (ImportError, RuntimeError):
+        return LOCAL_CLIENT
+    try:
+        return context.client_id or context.session_id or LOCAL_CLIENT
+    except Exception:
+        # No session yet (e.g. the in-memory transport before initialization)
+        return LOCAL_CLIENT
+
+class AdmissionController:
+    """Server-wide and per-client slots with a bounded wait queue"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_per_client: int = 4,
+        max_queue: int = 32,
+        queue_timeout: float = 30.0
+    ):
+        self.configure(max_concurrency, max_per_client, max_queue, queue_timeout)
+        self._active = 0
+        self._per_client: Counter = Counter()
+        self._waiting = 0
+        self._changed = asyncio.Condition()
+        # Recent call durations, for the retry_after hint
+        self._mean_seconds = 5.0
+
+    def configure(self, max_concurrency: int, max_per_client: int, max_queue: int, queue_timeout: float):
+        if max_concurrency < 1 or max_per_client < 1:
+            raise ValueError("Concurrency limits must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_per_client = max_per_client
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+    def _has_room(self, client: str) -> bool:
+        return self._active < self.max_concurrency and self._per_client[client] < self.max_per_client
+
+    def _retry_after(self) -> float:
+        # Roughly how long until the queue ahead has drained
+        rounds = (self._waiting + 1) / self.max_concurrency
+        return round(max(1.0, rounds * self._mean_seconds), 1)
+
+    @asynccontextmanager
+    async def slot(self, client: str):
+        """Hold a slot for ``client`` for the duration of the block"""
+        async with self._changed:
+            if not self._has_room(client):
+                if self._waiting >= self.max_queue:
+                    tracer.increment("admission.rejected")
+                    raise AdmissionRejected("Server is busy; too many queued requests", self._retry_after())
+                tracer.increment("admission.queued")
+                self._waiting += 1
+                try:
+                    with tracer.span("admission.wait"):
+                        await asyncio.wait_for(
+                            self._changed.wait_for(lambda: self._has_room(client)),
+                            self.queue_timeout
+                        )
+                except asyncio.TimeoutError:
+                    tracer.increment("admission.rejected")
+                    raise AdmissionRejected(
+                        f"Server is busy; no slot freed up within {self.queue_timeout:g}s",
+                        self._retry_after()
+                    )
+                finally:
+                    self._waiting -= 1
+            self._active += 1
+            self._per_client[client] += 1
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._mean_seconds = 0.8 * self._mean_seconds + 0.2 * (time.monotonic() - start)
+            async with self._changed:
+                self._active -= 1
+                self._per_client[client] -= 1
+                if not self._per_client[client]:
+                    del self._per_client[client]
+                self._changed.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "waiting": self._waiting,
+            "clients": dict(self._per_client),
+            "max_concurrency": self.max_concurrency,
+            "max_per_client": self.max_per_client,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+        }
+
+def admitted(controller: AdmissionController) -> Callable:
+    """Run an async tool only once ``controller`` grants its client a slot"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            client = current_client()
+            try:
+                async with controller.slot(client):
+                    return await func(*args, **kwargs)
+            except AdmissionRejected as e:
+                logger.warning(f"Rejected {func.__name__} for client {client}: {e}")
+                return {"error": str(e), "status": 429, "retry_after": e.retry_after}
+        return wrapper
+    return decorator
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionRejected",
+    "admitted",
+    "current_client",
+]
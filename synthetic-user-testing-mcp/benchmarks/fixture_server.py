@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Local fixture web server for offline benchmarks and load tests.
+
+Serves a small catalog of synthetic sites (signup, contact, search, heavy
+pages, slow endpoints and huge DOMs) from a background thread so benchmarks
+never depend on the network.
+"""
+
+import html
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+NAV = """
+<header>
+  <nav>
+    <a href="/">Home</a>
+    <a href="/signup-landing">Products</a>
+    <a href="/search">Search</a>
+    <a href="/contact">Contact</a>
+    <a href="/signup">Sign Up</a>
+  </nav>
+</header>
+"""
+
+FOOTER = """
+<footer>
+  <p>Email: hello@fixture.test | Phone: +1 555 0100</p>
+  <a href="/privacy">Privacy</a> <a href="/terms">Terms</a>
+</footer>
+"""
+
+def _page(title: str, body: str, head: str = "") -> str:
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>{title}</title>
+  {head}
+</head>
+<body>
+{NAV}
+<main>
+{body}
+</main>
+{FOOTER}
+</body>
+</html>"""
+
+def _home(query: Dict[str, list]) -> str:
+    return _page("Fixture Shop - Home", """
+  <h1>Welcome to Fixture Shop</h1>
+  <p>Get started by browsing our products. We take your privacy and security seriously.</p>
+  <p>This page is served locally so benchmarks are reproducible and run offline.</p>
+""")
+
+def _signup_landing(query: Dict[str, list]) -> str:
+    return _page("Fixture Shop - Products", """
+  <h1>Products</h1>
+  <p>Create an account to save your cart.</p>
+  <a class="signup" href="/signup">Sign Up</a>
+""")
+
+def _signup(query: Dict[str, list]) -> str:
+    return _page("Fixture Shop - Create your account", """
+  <h1>Create your account</h1>
+  <form method="post" action="/signup">
+    <label for="email">Email</label>
+    <input id="email" type="email" name="email" placeholder="email">
+    <label for="password">Password</label>
+    <input id="password" type="password" name="password">
+    <button type="submit">Sign Up</button>
+  </form>
+""")
+
+def _signup_done(query: Dict[str, list]) -> str:
+    return _page("Fixture Shop - Welcome", """
+  <div class="welcome confirmation"><h1>Welcome aboard!</h1></div>
+  <p>Your account has been created.</p>
+""")
+
+def _contact(query: Dict[str, list]) -> str:
+    return _page("Fixture Shop - Contact us", """
+  <h1>Contact us</h1>
+  <p>Email <a href="mailto:support@fixture.test">support@fixture.test</a>
+     or call <a href="tel:+15550100">+1 555 0100</a>.</p>
+""")
+
+def _search(query: Dict[str, list]) -> str:
+    term = html.escape(query.get("q", [""])[0])
+    results = ""
+    if term:
+        items = "".join(f'<li class="result">Result {i} for {term}</li>' for i in range(10))
+        results = f'<ul class="results">{items}</ul>'
+    return _page("Fixture Shop - Search", f"""
+  <h1>Search</h1>
+  <form action="/search" method="get" class="search">
+    <input type="search" name="q" placeholder="search products" aria-label="Search">
+  </form>
+  {results}
+""")
+
+def _heavy(query: Dict[str, list]) -> str:
+    count = int(query.get("assets", ["60"])[0])
+    images = "".join(f'<img src="/asset.svg?i={i}" alt="Product {i}" width="64" height="64">' for i in range(count))
+    script = "<script>let x = 0; const end = Date.now() + 150; while (Date.now() < end) { x++; }</script>"
+    return _page("Fixture Shop - Heavy gallery", f"<h1>Gallery</h1>{images}{script}")
+
+def _slow(query: Dict[str, list]) -> str:
+    delay_ms = int(query.get("delay", ["1500"])[0])
+    time.sleep(delay_ms / 1000)
+    return _page("Fixture Shop - Slow endpoint", f"<h1>Slow page</h1><p>Delayed by {delay_ms}ms.</p>")
+
+def _huge_dom(query: Dict[str, list]) -> str:
+    nodes = int(query.get("nodes", ["20000"])[0])
+    rows = "".join(f"<div class=\"row\"><span>Item {i}</span></div>" for i in range(nodes))
+    return _page("Fixture Shop - Huge DOM", f"<h1>Catalog</h1>{rows}")
+
+def _asset(query: Dict[str, list]) -> str:
+    return '<svg xmlns="http://www.w3.org/2000/svg" width="64" height="64"><rect width="64" height="64"/></svg>'
+
+# Path -> (handler, content type)
+ROUTES: Dict[str, tuple] = {
+    "/": (_home, "text/html"),
+    "/signup-landing": (_signup_landing, "text/html"),
+    "/signup": (_signup, "text/html"),
+    "/contact": (_contact, "text/html"),
+    "/search": (_search, "text/html"),
+    "/heavy": (_heavy, "text/html"),
+    "/slow": (_slow, "text/html"),
+    "/huge-dom": (_huge_dom, "text/html"),
+    "/asset.svg": (_asset, "image/svg+xml"),
+    "/privacy": (lambda query: _page("Privacy policy", "<h1>Privacy</h1>"), "text/html"),
+    "/terms": (lambda query: _page("Terms of service", "<h1>Terms</h1>"), "text/html"),
+}
+
+# Named fixture sites used by the benchmark scenarios
+FIXTURE_CATALOG: Dict[str, str] = {
+    "home": "/",
+    "signup": "/signup-landing",
+    "contact": "/contact",
+    "search": "/search",
+    "heavy": "/heavy",
+    "slow": "/slow",
+    "huge_dom": "/huge-dom",
+}
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    def _respond(self, route: Optional[tuple], query: Dict[str, list]):
+        if route is None:
+            self.send_error(404)
+            return
+        handler, content_type = route
+        body = handler(query).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        self._respond(ROUTES.get(parsed.path), parse_qs(parsed.query))
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        route = (_signup_done, "text/html") if parsed.path == "/signup" else ROUTES.get(parsed.path)
+        self._respond(route, parse_qs(parsed.query))
+
+    def log_message(self, format, *args):
+        pass
+
+class FixtureServer:
+    """Runs the fixture catalog on a local port in a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _FixtureHandler)
+        self.httpd.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, fixture: str) -> str:
+        """Absolute URL of a catalog entry (or a raw path)"""
+        return self.base_url + FIXTURE_CATALOG.get(fixture, fixture)
+
+    def start(self) -> "FixtureServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the benchmark fixture sites")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = FixtureServer(port=args.port)
+    print(f"Serving fixtures at {server.base_url}")
+    for name, path in FIXTURE_CATALOG.items():
+        print(f"  {name:<10} {server.base_url}{path}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
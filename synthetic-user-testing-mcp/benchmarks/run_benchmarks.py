@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the Synthetic User Testing MCP Server.
+
+Starts the local fixture server, drives the MCP tools against it at a
+configurable concurrency and records throughput, latency percentiles and
+memory per scenario. Results can be saved as a baseline and later runs are
+compared against it to catch regressions.
+
+Usage:
+    python -m benchmarks.run_benchmarks --concurrency 4 --iterations 20
+    python -m benchmarks.run_benchmarks --save-baseline
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+sys.path.insert(0, str(PROJECT_DIR))
+
+from benchmarks.fixture_server import FixtureServer
+
+def _tool(server_module, name: str) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    """Return the plain coroutine function behind a registered MCP tool"""
+    tool = getattr(server_module, name)
+    return getattr(tool, "fn", tool)
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def _rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+def build_scenarios(server_module, fixtures: FixtureServer) -> Dict[str, List[Callable[[], Awaitable[Dict[str, Any]]]]]:
+    """Map scenario names to the list of calls cycled through on each iteration"""
+    visit_page = _tool(server_module, "visit_page")
+    collect_feedback = _tool(server_module, "collect_feedback")
+    simulate_task = _tool(server_module, "simulate_task")
+    analyze_usability = _tool(server_module, "analyze_usability")
+    generate_report = _tool(server_module, "generate_report")
+
+    return {
+        "visit_page": [
+            lambda name=name: visit_page(fixtures.url(name))
+            for name in ["home", "contact", "heavy", "slow", "huge_dom"]
+        ],
+        "collect_feedback": [
+            lambda perspective=perspective: collect_feedback(fixtures.url("home"), perspective)
+            for perspective in ["new_user", "expert_user", "elderly_user", "mobile_user"]
+        ],
+        "simulate_task": [
+            lambda: simulate_task(fixtures.url("signup"), "sign up for an account", "expert_user"),
+            lambda: simulate_task(fixtures.url("home"), "find contact information", "new_user"),
+            lambda: simulate_task(fixtures.url("search"), "search for a product", "expert_user"),
+        ],
+        "analyze_usability": [
+            lambda: analyze_usability(
+                [fixtures.url("home"), fixtures.url("contact"), fixtures.url("heavy")],
+                ["clarity", "speed", "trust", "navigation"]
+            ),
+        ],
+        "generate_report": [
+            lambda: generate_report(format="markdown"),
+            lambda: generate_report(format="json"),
+        ],
+    }
+
+async def run_scenario(calls: List[Callable[[], Awaitable[Dict[str, Any]]]],
+                       iterations: int, concurrency: int) -> Dict[str, Any]:
+    """Run ``iterations`` calls with at most ``concurrency`` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(index: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await calls[index % len(calls)]()
+                if isinstance(result, dict) and "error" in result:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    wall = time.perf_counter() - start
+
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_s": round(iterations / wall, 3) if wall else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50), 2),
+        "p95_ms": round(_percentile(latencies, 0.95), 2),
+        "p99_ms": round(_percentile(latencies, 0.99), 2),
+        "max_ms": round(max(latencies), 2) if latencies else 0.0,
+    }
+
+async def run_suite(scenario_names: List[str], iterations: int, concurrency: int,
+                    trace_memory: bool) -> Dict[str, Any]:
+    # MCP_DATA_DIR points at a scratch directory (see main) to keep
+    # benchmark sessions out of the real store
+    import server as server_module
+
+    results: Dict[str, Any] = {}
+    with FixtureServer() as fixtures:
+        scenarios = build_scenarios(server_module, fixtures)
+        await server_module.tester.start_browser()
+        try:
+            for name in scenario_names:
+                if trace_memory:
+                    tracemalloc.start()
+                result = await run_scenario(scenarios[name], iterations, concurrency)
+                if trace_memory:
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    result["python_peak_mb"] = round(peak / (1024 * 1024), 2)
+                result["rss_peak_mb"] = round(_rss_mb(), 2)
+                results[name] = result
+                print(f"{name:<18} {result['throughput_per_s']:>8.2f}/s  "
+                      f"p50 {result['p50_ms']:>9.1f}ms  p95 {result['p95_ms']:>9.1f}ms  "
+                      f"p99 {result['p99_ms']:>9.1f}ms  errors {result['errors']}")
+        finally:
+            await server_module.tester.stop_browser()
+
+    return {
+        "recorded_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "scenarios": results,
+    }
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a description of every scenario that regressed beyond ``tolerance``"""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if not reference:
+            continue
+        if reference["p95_ms"] and result["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']}ms vs baseline {reference['p95_ms']}ms")
+        if reference["throughput_per_s"] and result["throughput_per_s"] < reference["throughput_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput_per_s']}/s vs baseline {reference['throughput_per_s']}/s"
+            )
+        if result["errors"] > reference["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors vs baseline {reference['errors']}")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    scenario_names = ["visit_page", "collect_feedback", "simulate_task", "analyze_usability", "generate_report"]
+
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--scenarios", nargs="+", choices=scenario_names, default=scenario_names)
+    parser.add_argument("--iterations", type=int, default=20, help="Calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Calls in flight per scenario")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also record Python heap peaks (slower)")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this path")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression ratio (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="sut-bench-") as scratch:
+        os.environ["MCP_DATA_DIR"] = scratch
+        results = asyncio.run(run_suite(args.scenarios, args.iterations, args.concurrency, args.tracemalloc))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if args.baseline.exists():
+        regressions = compare_to_baseline(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
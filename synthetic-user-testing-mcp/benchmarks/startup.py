@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Synthetic User Testing MCP Server.
+
+MCP clients that spawn the server per session wait for it to start before
+they can do anything, so this measures what they wait for, each in a fresh
+process:
+
+- ``import`` - importing the server module
+- ``handshake`` - spawning ``server.py --fast-start`` over stdio until the
+  MCP handshake completes
+- ``first_visit`` - spawning the server until the first ``visit_page``
+  (fetch_mode "http", against the local fixture server) returns
+
+Each is the median over ``--runs`` runs and is checked against a budget in
+milliseconds; the exit status is 1 when any budget is exceeded.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --handshake-budget 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(PROJECT_DIR))
+
+from benchmarks.fixture_server import FixtureServer
+
+# Median milliseconds allowed per measurement
+DEFAULT_BUDGETS = {
+    "import": 2000,
+    "handshake": 2500,
+    "first_visit": 3500,
+}
+
+IMPORT_PROBE = (
+    "import time\n"
+    "started = time.perf_counter()\n"
+    "import server\n"
+    "print((time.perf_counter() - started) * 1000)\n"
+)
+
+def measure_import(env: Dict[str, str]) -> float:
+    """Milliseconds to import the server module in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+async def measure_spawn(env: Dict[str, str], visit_url: str) -> Dict[str, float]:
+    """Milliseconds from spawning the server to the handshake and to the first visit"""
+    from fastmcp import Client
+    from fastmcp.client.transports import StdioTransport
+
+    transport = StdioTransport(
+        command=sys.executable,
+        args=[str(PROJECT_DIR / "server.py"), "--fast-start"],
+        env=env,
+        cwd=str(PROJECT_DIR),
+        keep_alive=False
+    )
+    started = time.perf_counter()
+    async with Client(transport) as client:
+        handshake = (time.perf_counter() - started) * 1000
+        result = await client.call_tool("visit_page", {"url": visit_url, "fetch_mode": "http"})
+        first_visit = (time.perf_counter() - started) * 1000
+    if result.data and result.data.get("error"):
+        raise RuntimeError(f"visit_page failed: {result.data['error']}")
+    return {"handshake": handshake, "first_visit": first_visit}
+
+def run(runs: int) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {name: [] for name in DEFAULT_BUDGETS}
+    with tempfile.TemporaryDirectory(prefix="sut-startup-") as scratch, FixtureServer() as fixtures:
+        # Keep benchmark sessions out of the real store
+        env = {**os.environ, "MCP_DATA_DIR": scratch, "LOG_LEVEL": "WARNING"}
+        for _ in range(runs):
+            samples["import"].append(measure_import(env))
+            spawn = asyncio.run(measure_spawn(env, fixtures.url("signup")))
+            samples["handshake"].append(spawn["handshake"])
+            samples["first_visit"].append(spawn["first_visit"])
+    return samples
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure server cold start against a time budget")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh server processes per measurement")
+    parser.add_argument("--import-budget", type=float, default=DEFAULT_BUDGETS["import"])
+    parser.add_argument("--handshake-budget", type=float, default=DEFAULT_BUDGETS["handshake"])
+    parser.add_argument("--first-visit-budget", type=float, default=DEFAULT_BUDGETS["first_visit"])
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    budgets = {
+        "import": args.import_budget,
+        "handshake": args.handshake_budget,
+        "first_visit": args.first_visit_budget,
+    }
+    samples = run(args.runs)
+
+    results: Dict[str, Any] = {"runs": args.runs, "measurements": {}}
+    over_budget = []
+    for name, values in samples.items():
+        median = statistics.median(values)
+        results["measurements"][name] = {
+            "median_ms": round(median, 1),
+            "min_ms": round(min(values), 1),
+            "max_ms": round(max(values), 1),
+            "budget_ms": budgets[name],
+        }
+        status = "ok" if median <= budgets[name] else "OVER BUDGET"
+        if median > budgets[name]:
+            over_budget.append(name)
+        print(f"{name:<12} median {median:>8.1f}ms  min {min(values):>8.1f}ms  "
+              f"max {max(values):>8.1f}ms  budget {budgets[name]:>7.0f}ms  {status}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    return 1 if over_budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
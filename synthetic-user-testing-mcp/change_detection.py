@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Change detection for repeated page visits.
+
+Scheduled runs revisit the same URLs over and over, and most pages have not
+changed between runs. ``ChangeDetector`` remembers, per URL, the last
+snapshot, its HTTP validators (ETag / Last-Modified), a fingerprint of the
+extracted content and the feedback and metric scores computed from it. The
+next visit can then revalidate with a conditional request, or compare
+fingerprints, and reuse the previous results when nothing changed. When
+something did change, ``diff_snapshots`` describes what.
+
+Entries are stored as one JSON file per URL under ``root``.
+"""
+
+import copy
+import difflib
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Snapshot fields that describe page content; timings and screenshots are
+# expected to differ on every visit and are left out of the fingerprint
+CONTENT_FIELDS = ("title", "main_text", "navigation_links", "forms", "footer_text", "page_signals")
+
+CHANGE_STATUSES = ("new", "not_modified", "unchanged", "changed")
+
+def fingerprint(snapshot: Dict[str, Any]) -> str:
+    """Stable hash of the content fields of a snapshot"""
+    content = {field: snapshot.get(field) for field in CONTENT_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def _text_change(before: str, after: str) -> Dict[str, Any]:
+    return {
+        "similarity": round(difflib.SequenceMatcher(None, before, after).ratio(), 3),
+        "length_before": len(before),
+        "length_after": len(after),
+    }
+
+def diff_snapshots(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe how the content of two snapshots differs"""
+    diff: Dict[str, Any] = {}
+
+    if before.get("title") != after.get("title"):
+        diff["title"] = {"before": before.get("title"), "after": after.get("title")}
+
+    for field in ("main_text", "footer_text"):
+        old_text, new_text = before.get(field) or "", after.get(field) or ""
+        if old_text != new_text:
+            diff[field] = _text_change(old_text, new_text)
+
+    old_nav = before.get("navigation_elements") or []
+    new_nav = after.get("navigation_elements") or []
+    if old_nav != new_nav:
+        diff["navigation"] = {
+            "added": [item for item in new_nav if item not in old_nav],
+            "removed": [item for item in old_nav if item not in new_nav],
+            "reordered": sorted(old_nav) == sorted(new_nav),
+        }
+
+    old_forms, new_forms = before.get("forms") or [], after.get("forms") or []
+    if old_forms != new_forms:
+        diff["forms"] = {
+            "count_before": len(old_forms),
+            "count_after": len(new_forms),
+            "fields_before": sum(len(form.get("fields", [])) for form in old_forms),
+            "fields_after": sum(len(form.get("fields", [])) for form in new_forms),
+        }
+
+    old_signals = before.get("page_signals") or {}
+    new_signals = after.get("page_signals") or {}
+    signal_changes = {
+        key: {"before": old_signals.get(key), "after": new_signals.get(key)}
+        for key in sorted(set(old_signals) | set(new_signals))
+        if old_signals.get(key) != new_signals.get(key)
+    }
+    if signal_changes:
+        diff["page_signals"] = signal_changes
+
+    return diff
+
+class ChangeDetector:
+    """Per-URL record of the last snapshot, its validators and the scores derived from it"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._entries: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+    def _write(self, entry: Dict[str, Any]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(entry["url"])
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps(entry, default=str))
+        os.replace(tmp_path, path)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """The stored entry for ``url``, loading it from disk on first use"""
+        with self._lock:
+            if url not in self._entries:
+                path = self._path(url)
+                self._entries[url] = json.loads(path.read_text()) if path.exists() else None
+            return self._entries[url]
+
+    def validators(self, url: str) -> Dict[str, str]:
+        entry = self.get(url)
+        return dict(entry.get("validators") or {}) if entry else {}
+
+    def previous_snapshot(self, url: str) -> Optional[Dict[str, Any]]:
+        """A copy of the last snapshot for ``url``, safe for the caller to modify"""
+        entry = self.get(url)
+        return copy.deepcopy(entry["snapshot"]) if entry else None
+
+    def mark_not_modified(self, url: str) -> Dict[str, Any]:
+        """Record that the server confirmed the stored snapshot of ``url`` is current"""
+        entry = self.get(url)
+        result = {
+            "status": "not_modified",
+            "previous_checked_at": entry["checked_at"],
+            "previous_changed_at": entry["changed_at"],
+        }
+        entry["checked_at"] = datetime.now().isoformat()
+        self._write(entry)
+        return result
+
+    def record(self, url: str, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compare a freshly extracted snapshot with the stored one and store it.
+
+        Returns:
+            Dictionary with the change "status" ("new", "unchanged" or
+            "changed"), and a "diff" when the content changed
+        """
+        now = datetime.now().isoformat()
+        new_fingerprint = fingerprint(snapshot)
+        entry = self.get(url)
+
+        if entry is None:
+            status, diff = "new", None
+        elif entry["fingerprint"] == new_fingerprint:
+            status, diff = "unchanged", None
+        else:
+            status, diff = "changed", diff_snapshots(entry["snapshot"], snapshot)
+
+        result: Dict[str, Any] = {"status": status}
+        if entry is not None:
+            result["previous_checked_at"] = entry["checked_at"]
+            result["previous_changed_at"] = entry["changed_at"]
+        if diff is not None:
+            result["diff"] = diff
+
+        if status == "unchanged":
+            # Keep the stored snapshot (and its scores), but pick up new validators
+            entry["validators"] = snapshot.get("validators") or entry.get("validators") or {}
+            entry["checked_at"] = now
+        else:
+            entry = {
+                "url": url,
+                "fingerprint": new_fingerprint,
+                "validators": snapshot.get("validators") or {},
+                # Shallow copy so callers can annotate their snapshot afterwards
+                "snapshot": dict(snapshot),
+                "checked_at": now,
+                "changed_at": now,
+                "metric_scores": None,
+                "feedback": {},
+                "session_ids": {},
+            }
+            with self._lock:
+                self._entries[url] = entry
+        self._write(entry)
+        return result
+
+    def previous_scores(self, url: str, perspective: str) -> Optional[Dict[str, Any]]:
+        """Feedback and metric scores computed from the stored snapshot, if any"""
+        entry = self.get(url)
+        if not entry or perspective not in entry["feedback"] or entry["metric_scores"] is None:
+            return None
+        return {
+            "feedback": entry["feedback"][perspective],
+            "metric_scores": entry["metric_scores"],
+            "session_id": entry["session_ids"].get(perspective),
+        }
+
+    def remember_scores(self, url: str, perspective: str, feedback: Dict[str, Any],
+                        metric_scores: Dict[str, float], session_id: str):
+        """Attach the scores computed from the stored snapshot so later visits can reuse them"""
+        entry = self.get(url)
+        if entry is None:
+            return
+        entry["feedback"][perspective] = feedback
+        entry["metric_scores"] = metric_scores
+        entry["session_ids"][perspective] = session_id
+        self._write(entry)
+
+__all__ = [
+    "CHANGE_STATUSES",
+    "ChangeDetector",
+    "diff_snapshots",
+    "fingerprint",
+]
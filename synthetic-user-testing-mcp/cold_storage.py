@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Transparent compression of cold data files.
+
+Sessions and reports that have not been touched for a while are compressed
+in place by the retention collector: ``<name>`` becomes ``<name>.zst`` (when
+the ``zstandard`` package is installed) or ``<name>.gz``. Everything that
+reads those files goes through ``read_bytes``/``existing_path``, so callers
+do not care whether a file is hot or cold, and ``write_bytes`` keeps a
+compressed file compressed when it is rewritten (e.g. by re-scoring).
+"""
+
+import gzip
+import os
+from pathlib import Path
+from typing import Optional
+
+from lazy import optional_import
+
+# Suffix per codec, in the order readers look for them
+CODEC_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+COMPRESSED_SUFFIXES = tuple(CODEC_SUFFIXES.values())
+
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 6
+
+def resolve_codec(codec: str = "auto") -> str:
+    """Turn "auto" into "zstd" when zstandard is installed, "gzip" otherwise"""
+    if codec == "auto":
+        return "zstd" if optional_import("zstandard") is not None else "gzip"
+    if codec not in CODEC_SUFFIXES:
+        raise ValueError(f"Unknown compression codec: {codec}. Use one of {['auto', *CODEC_SUFFIXES]}")
+    if codec == "zstd" and optional_import("zstandard") is None:
+        raise ValueError("zstd compression needs the zstandard package (pip install zstandard)")
+    return codec
+
+def is_compressed(path: Path) -> bool:
+    return path.suffix in COMPRESSED_SUFFIXES
+
+def plain_path(path: Path) -> Path:
+    """``path`` without its compression suffix"""
+    return path.with_suffix("") if is_compressed(path) else path
+
+def variants(path: Path):
+    """The plain path and every compressed name it may be stored under"""
+    plain = plain_path(path)
+    yield plain
+    for suffix in COMPRESSED_SUFFIXES:
+        yield plain.with_name(plain.name + suffix)
+
+def existing_path(path: Path) -> Optional[Path]:
+    """Whichever of the plain or compressed files for ``path`` exists"""
+    for candidate in variants(path):
+        if candidate.exists():
+            return candidate
+    return None
+
+def remove_variants(path: Path, keep: Optional[Path] = None):
+    """Delete the plain and compressed files for ``path``, except ``keep``"""
+    for candidate in variants(path):
+        if candidate != keep:
+            candidate.unlink(missing_ok=True)
+
+def encode(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        zstandard = optional_import("zstandard")
+        if zstandard is None:
+            raise ValueError("Writing .zst files needs the zstandard package")
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if suffix == ".gz":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return data
+
+def decode(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        zstandard = optional_import("zstandard")
+        if zstandard is None:
+            raise ValueError("Reading .zst files needs the zstandard package")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if suffix == ".gz":
+        return gzip.decompress(data)
+    return data
+
+def read_bytes(path: Path) -> bytes:
+    """Read ``path``, decompressing it if its suffix says it is compressed"""
+    with open(path, 'rb') as f:
+        return decode(f.read(), path.suffix)
+
+def write_bytes(path: Path, data: bytes):
+    """Atomically write ``path``, compressing it if its suffix says so"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(encode(data, path.suffix))
+    os.replace(tmp_path, path)
+
+def compress_file(path: Path, codec: str) -> Optional[Path]:
+    """
+    Compress a plain file in place.
+
+    Returns:
+        The compressed file's path (the plain file is removed), or None when
+        the file was rewritten while it was being compressed
+    """
+    target = path.with_name(path.name + CODEC_SUFFIXES[codec])
+    stat = path.stat()
+    with open(path, 'rb') as f:
+        data = f.read()
+    write_bytes(target, data)
+    if path.stat().st_mtime_ns != stat.st_mtime_ns:
+        # Written to in the meantime; it is hot again
+        target.unlink(missing_ok=True)
+        return None
+    # Keep the original timestamps, which retention ages files by
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    path.unlink()
+    return target
+
+__all__ = [
+    "CODEC_SUFFIXES",
+    "COMPRESSED_SUFFIXES",
+    "compress_file",
+    "existing_path",
+    "is_compressed",
+    "plain_path",
+    "read_bytes",
+    "remove_variants",
+    "resolve_codec",
+    "write_bytes",
+]
@@ -11,17 +11,15 @@ from typing import Dict, List, Any
 from dataclasses import dataclass
 from pathlib import Path
 
-# Base directories
+# Base directories. Resolved once here, independent of the working directory
+# the server was started from; each directory is created by whatever first
+# writes to it, not at import.
 BASE_DIR = Path(__file__).parent
-DATA_DIR = BASE_DIR / "data"
+DATA_DIR = Path(os.getenv("MCP_DATA_DIR", str(BASE_DIR / "data"))).expanduser()
 SESSIONS_DIR = DATA_DIR / "sessions"
 REPORTS_DIR = DATA_DIR / "reports"
 SCREENSHOTS_DIR = DATA_DIR / "screenshots"
 
-# Ensure directories exist
-for directory in [DATA_DIR, SESSIONS_DIR, REPORTS_DIR, SCREENSHOTS_DIR]:
-    directory.mkdir(exist_ok=True)
-
 @dataclass
 class BrowserConfig:
     """Browser configuration settings"""
@@ -32,6 +30,22 @@ class BrowserConfig:
     user_agent: str = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     slow_mo: int = 100  # Milliseconds between actions
     
+@dataclass
+class RetentionPolicy:
+    """How long one kind of data is kept; 0 disables a limit"""
+    max_age_days: float = 0
+    max_bytes: int = 0
+    compress_after_days: float = 0
+
+def _retention_policy(kind: str, max_age_days: float, max_bytes: int, compress_after_days: float) -> RetentionPolicy:
+    """A retention policy, overridable with RETENTION_<KIND>_* environment variables"""
+    prefix = f"RETENTION_{kind.upper()}"
+    return RetentionPolicy(
+        max_age_days=float(os.getenv(f"{prefix}_MAX_AGE_DAYS", str(max_age_days))),
+        max_bytes=int(os.getenv(f"{prefix}_MAX_BYTES", str(max_bytes))),
+        compress_after_days=float(os.getenv(f"{prefix}_COMPRESS_AFTER_DAYS", str(compress_after_days)))
+    )
+    
 @dataclass
 class UserPersona:
     """User persona configuration"""
@@ -131,7 +145,16 @@ TASK_PATTERNS: Dict[str, Dict[str, Any]] = {
             "Form validation unclear",
             "Too many required fields",
             "Email verification confusing"
-        ]
+        ],
+        # Looked for in visible text and elements that appear after submitting
+        "outcome_signals": {
+            "success_text": ["welcome", "thank you", "account created", "account has been created",
+                             "check your email", "verify your email", "successfully"],
+            "success_selectors": [".success", ".welcome", ".confirmation"],
+            "error_text": ["already exists", "already registered", "already taken", "invalid",
+                           "is required", "try again"],
+            "error_selectors": [".error", ".alert-danger", ".form-error", '[aria-invalid="true"]']
+        }
     },
     
     "login": {
@@ -153,7 +176,11 @@ TASK_PATTERNS: Dict[str, Dict[str, Any]] = {
             "Contact information buried",
             "No phone number provided",
             "Contact form too complex"
-        ]
+        ],
+        "outcome_signals": {
+            "success_text": ["email", "phone", "@"],
+            "success_selectors": ['a[href^="mailto:"]', 'a[href^="tel:"]']
+        }
     },
     
     "search": {
@@ -164,7 +191,11 @@ TASK_PATTERNS: Dict[str, Dict[str, Any]] = {
             "Search box not visible",
             "Search results poor quality",
             "No search suggestions"
-        ]
+        ],
+        "outcome_signals": {
+            "success_selectors": [".result", ".search-result", ".results li"],
+            "error_text": ["no results", "nothing found", "0 results"]
+        }
     },
     
     "purchase": {
@@ -253,9 +284,10 @@ FEEDBACK_TEMPLATES: Dict[str, Dict[str, List[str]]] = {
 }
 
 # Usability metrics and their weights
+# Weights of the overall ranking; they sum to 1.0
 USABILITY_METRICS: Dict[str, Dict[str, Any]] = {
     "clarity": {
-        "weight": 0.25,
+        "weight": 0.20,
         "description": "How clear and understandable the interface is",
         "factors": ["navigation clarity", "content organization", "visual hierarchy"]
     },
@@ -265,7 +297,7 @@ USABILITY_METRICS: Dict[str, Dict[str, Any]] = {
         "factors": ["page load time", "interaction responsiveness", "search speed"]
     },
     "trust": {
-        "weight": 0.20,
+        "weight": 0.15,
         "description": "How trustworthy and professional the site appears",
         "factors": ["design quality", "security indicators", "contact information"]
     },
@@ -275,12 +307,21 @@ USABILITY_METRICS: Dict[str, Dict[str, Any]] = {
         "factors": ["color contrast", "text size", "keyboard navigation"]
     },
     "mobile_friendliness": {
-        "weight": 0.20,
+        "weight": 0.15,
         "description": "How well the site works on mobile devices",
         "factors": ["responsive design", "touch targets", "mobile navigation"]
+    },
+    "findability": {
+        "weight": 0.15,
+        "description": "How few clicks it takes to reach the pages for key tasks",
+        "factors": ["click depth", "navigation links", "link labels"]
     }
 }
 
+# Tasks whose pages (matched by their TASK_PATTERNS target_elements) the
+# findability metric looks for in the site's link graph
+FINDABILITY_TASKS = ["signup", "login", "contact"]
+
 # Server configuration
 class ServerConfig:
     """Server configuration settings"""
@@ -296,10 +337,85 @@ class ServerConfig:
     DEFAULT_TIMEOUT = int(os.getenv("DEFAULT_TIMEOUT", "30"))  # seconds
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
     
+    # load_test limits: virtual users (one pooled browser context each) and seconds
+    LOAD_TEST_MAX_USERS = int(os.getenv("LOAD_TEST_MAX_USERS", "50"))
+    LOAD_TEST_MAX_DURATION = int(os.getenv("LOAD_TEST_MAX_DURATION", "600"))
+    
+    # Transport used when running server.py directly ("stdio", "http" or "sse")
+    TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+    HOST = os.getenv("MCP_HOST", "127.0.0.1")
+    PORT = int(os.getenv("MCP_PORT", "8000"))
+    # Launch the browser before accepting requests rather than on first use
+    PRELOAD_BROWSER = os.getenv("PRELOAD_BROWSER", "true").lower() == "true"
+    # Answer the handshake first and launch the browser in the background;
+    # meant for clients that spawn a server per session
+    FAST_START = os.getenv("FAST_START", "false").lower() == "true"
+    
+    # Admission control for browser-backed tools: concurrent calls overall and
+    # per client, calls allowed to queue, and seconds a queued call may wait
+    MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "8"))
+    MAX_PER_CLIENT = int(os.getenv("MAX_PER_CLIENT", "4"))
+    MAX_QUEUE = int(os.getenv("MAX_QUEUE", "32"))
+    QUEUE_TIMEOUT = float(os.getenv("QUEUE_TIMEOUT", "30"))
+    
+    # Overall time budget per tool call, in seconds; Playwright waits inside a
+    # tool are cut to what is left of it
+    TOOL_DEADLINES = {
+        "visit_page": DEFAULT_TIMEOUT * 3,
+        "collect_feedback": DEFAULT_TIMEOUT * 3,
+        "simulate_task": DEFAULT_TIMEOUT * 4,
+        "simulate_journey": DEFAULT_TIMEOUT * 10,
+        "analyze_usability": DEFAULT_TIMEOUT * 10,
+        "crawl_site": DEFAULT_TIMEOUT * 10,
+    }
+    
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE = os.getenv("LOG_FILE", str(BASE_DIR / "server.log"))
     
+    # HAR record-and-replay archives (data/har/)
+    HAR_MAX_BYTES = int(os.getenv("HAR_MAX_BYTES", str(500 * 1024 * 1024)))
+    HAR_MAX_ARCHIVES = int(os.getenv("HAR_MAX_ARCHIVES", "1000"))
+    
+    # Monitoring scheduler: concurrent jobs overall, seconds between requests
+    # to the same origin, and the shortest allowed monitor interval
+    MONITOR_MAX_CONCURRENCY = int(os.getenv("MONITOR_MAX_CONCURRENCY", "4"))
+    MONITOR_ORIGIN_INTERVAL = float(os.getenv("MONITOR_ORIGIN_INTERVAL", "2.0"))
+    MONITOR_MIN_INTERVAL = int(os.getenv("MONITOR_MIN_INTERVAL", "60"))
+    
+    # Profiling ("off", "cprofile" or "pyinstrument"); captures land in data/profiles/
+    PROFILE_MODE = os.getenv("PROFILE_MODE", "off").lower()
+    
+    # Page snapshots and scores shared by every server process on the host
+    # (see shared_cache.py); seconds an entry stays fresh, 0 disables it
+    SHARED_CACHE_TTL = float(os.getenv("SHARED_CACHE_TTL", "0"))
+    SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", str(DATA_DIR / "shared_cache.sqlite3"))
+    
+    # analyze_usability: most URLs per call (0 = no limit) and pages visited at once
+    ANALYZE_MAX_URLS = int(os.getenv("ANALYZE_MAX_URLS", "50"))
+    ANALYZE_CONCURRENCY = int(os.getenv("ANALYZE_CONCURRENCY", "4"))
+    
+    # Site link graphs (data/link_graphs/): pages crawl_site fetches at once,
+    # and the most clicks a simulated user follows along a known route
+    CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+    ROUTE_MAX_CLICKS = int(os.getenv("ROUTE_MAX_CLICKS", "3"))
+    
+    # Data retention (opt-in): a background sweep every RETENTION_INTERVAL
+    # seconds (0, the default, disables it) deletes data past its age or size
+    # limit (none unless configured), compresses cold sessions and reports
+    # ("auto" is zstd when zstandard is installed, gzip otherwise) and removes
+    # screenshots nothing refers to. Each step handles at most RETENTION_BATCH
+    # files, with RETENTION_PAUSE seconds between steps.
+    RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", "0"))
+    RETENTION_CODEC = os.getenv("RETENTION_CODEC", "auto")
+    RETENTION_BATCH = int(os.getenv("RETENTION_BATCH", "100"))
+    RETENTION_PAUSE = float(os.getenv("RETENTION_PAUSE", "0.05"))
+    RETENTION = {
+        "sessions": _retention_policy("sessions", max_age_days=0, max_bytes=0, compress_after_days=7),
+        "reports": _retention_policy("reports", max_age_days=0, max_bytes=0, compress_after_days=7),
+        "screenshots": _retention_policy("screenshots", max_age_days=0, max_bytes=0, compress_after_days=0),
+    }
+    
     # Screenshots
     TAKE_SCREENSHOTS = os.getenv("TAKE_SCREENSHOTS", "true").lower() == "true"
     SCREENSHOT_ON_ERROR = os.getenv("SCREENSHOT_ON_ERROR", "true").lower() == "true"
@@ -316,10 +432,12 @@ __all__ = [
     "REPORTS_DIR",
     "SCREENSHOTS_DIR",
     "BrowserConfig",
+    "RetentionPolicy",
     "UserPersona",
     "USER_PERSONAS",
     "TASK_PATTERNS",
     "FEEDBACK_TEMPLATES",
     "USABILITY_METRICS",
+    "FINDABILITY_TASKS",
     "ServerConfig"
 ]
\ No newline at end of file
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Per-call time budgets for the Synthetic User Testing MCP Server.
+
+``deadline(seconds)`` sets a time budget for the enclosed block. The budget
+lives in a context variable, so it follows the call into every task it
+spawns. ``clamp_playwright_call`` (applied by the tracing proxy to every
+Playwright call) shortens Playwright timeouts and sleeps to what is left.
+Retries and circuit breakers built on top of this live in ``resilience``.
+"""
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import ServerConfig
+
+# Playwright's own default for actions and navigations
+DEFAULT_PLAYWRIGHT_TIMEOUT_MS = ServerConfig.BROWSER.timeout
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+class DeadlineExceeded(Exception):
+    """The call's time budget ran out"""
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """Limit the enclosed block to ``seconds``; nested deadlines never extend an outer one"""
+    if seconds is None:
+        yield
+        return
+    expires_at = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+    token = _deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left before the active deadline, or None when there is none"""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+@functools.lru_cache(maxsize=None)
+def _accepts_timeout(func: Callable) -> bool:
+    try:
+        return "timeout" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+def clamp_playwright_call(name: str, method: Callable, args: tuple, kwargs: Dict[str, Any]) -> Tuple[tuple, Dict[str, Any]]:
+    """
+    Fit a Playwright call into the active deadline.
+
+    Calls that wait (anything taking a ``timeout``) get their timeout cut to
+    the time left, and fail with DeadlineExceeded once it is gone. Calls that
+    do not wait, like ``close``, always go through so cleanup still works.
+    """
+    left = remaining()
+    if left is None or not _accepts_timeout(getattr(method, "__func__", method)):
+        return args, kwargs
+
+    left_ms = left * 1000
+    if left_ms <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before {name}")
+
+    if name == "wait_for_timeout":
+        # The "timeout" here is the sleep itself
+        if args:
+            args = (min(args[0], left_ms),) + tuple(args[1:])
+        else:
+            kwargs = {**kwargs, "timeout": min(kwargs.get("timeout", 0), left_ms)}
+    else:
+        current = kwargs.get("timeout")
+        limit = current if current is not None else DEFAULT_PLAYWRIGHT_TIMEOUT_MS
+        kwargs = {**kwargs, "timeout": min(limit, left_ms)}
+    return args, kwargs
+
+__all__ = [
+    "DeadlineExceeded",
+    "clamp_playwright_call",
+    "deadline",
+    "expired",
+    "remaining",
+]
@@ -64,6 +64,33 @@ class MockMCPClient:
                 "error_message": "No clear signup option found" if not success else None
             }
 
+        elif tool_name == "simulate_journey":
+            steps = kwargs["steps"]
+            # Simulate a journey that stalls at checkout
+            step_results = []
+            for index, task in enumerate(steps):
+                success = "checkout" not in task
+                step_results.append({
+                    "step_index": index,
+                    "task_description": task,
+                    "success": success,
+                    "time_taken": 3.2 if success else 9.8,
+                    "steps_attempted": [f"Attempted '{task}'"],
+                    "url_after": f"https://mystore.com/step-{index + 1}",
+                    "error_message": None
+                })
+                if not success:
+                    break
+            return {
+                "session_id": f"journey_{len(self.session_data) + 1}",
+                "success": all(step["success"] for step in step_results) and len(step_results) == len(steps),
+                "steps_completed": sum(1 for step in step_results if step["success"]),
+                "total_steps": len(steps),
+                "time_taken": sum(step["time_taken"] for step in step_results),
+                "steps": step_results,
+                "error_message": None
+            }
+
         elif tool_name == "collect_feedback":
             perspective = kwargs.get("perspective", "new_user")
             if perspective == "new_user":
@@ -234,29 +261,20 @@ async def demonstrate_complete_workflow():
 
     print("\n🎯 Testing complete user journey for an e-commerce site")
 
-    # Test different user tasks
-    tasks = [
-        ("browse products", "new_user"),
-        ("sign up for account", "new_user"),
-        ("add item to cart", "expert_user"),
-        ("checkout process", "expert_user")
-    ]
-
-    results = []
-
-    for task_desc, perspective in tasks:
-        print(f"\n🎭 Testing: '{task_desc}' as {perspective}")
-        result = await client.call_tool(
-            "simulate_task",
-            url="https://mystore.com",
-            task_description=task_desc,
-            perspective=perspective
-        )
-        results.append(result)
+    # Run the whole journey in one browser session so cart state carries over
+    journey = await client.call_tool(
+        "simulate_journey",
+        url="https://mystore.com",
+        steps=["browse products", "sign up for account", "add item to cart", "checkout process"],
+        perspective="new_user"
+    )
 
-        success_emoji = "✅" if result["success"] else "❌"
+    for step in journey["steps"]:
+        success_emoji = "✅" if step["success"] else "❌"
         print(
-            f"{success_emoji} {task_desc}: {'Success' if result['success'] else 'Failed'}")
+            f"{success_emoji} {step['task_description']}: {'Success' if step['success'] else 'Failed'} "
+            f"({step['time_taken']:.1f}s)")
+    print(f"🧭 Completed {journey['steps_completed']}/{journey['total_steps']} steps")
 
     # Collect feedback from different perspectives
     print("\n💭 Collecting feedback from different user types")
@@ -317,6 +335,7 @@ def print_integration_guide():
 3. **Available Tools:**
    - visit_page(url)
    - simulate_task(url, task_description, perspective)
+   - simulate_journey(url, steps, perspective)
    - collect_feedback(url, perspective)
    - analyze_usability(urls, metrics)
    - generate_report(session_id, format)
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Columnar bulk export of stored sessions for analytics.
+
+Streams every session file matching a filter into flat tables:
+
+- ``sessions`` - one row per session (task outcome, feedback score, ...)
+- ``steps`` - one row per attempted step, of the task or of a journey step
+- ``feedback_items`` - one row per positive or negative feedback item
+- ``journey_steps`` - one row per step of a multi-step journey
+- ``scores`` - one row per metric or perspective score
+
+Rows are buffered into row groups of ``batch_rows`` and flushed as they fill,
+so memory stays flat however many sessions are exported. Parquet and Arrow
+output need pyarrow; without it exports fall back to gzip-compressed CSV or
+JSON Lines.
+
+Usage:
+    python export.py --format parquet --url-prefix https://myapp.com
+    python export.py --format csv --since 2024-01-01 --output ./exports/january
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from cold_storage import read_bytes
+from config import DATA_DIR, SESSIONS_DIR
+from rescore import matches_filter
+from session_store import SessionStore, classify_task
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_FORMATS = ("auto", "parquet", "arrow", "csv", "jsonl")
+
+DEFAULT_BATCH_ROWS = 50_000
+
+# Column name and Arrow type name per table; created_at columns are timestamps
+TABLES: Dict[str, List[Tuple[str, str]]] = {
+    "sessions": [
+        ("session_id", "string"),
+        ("url", "string"),
+        ("created_at", "timestamp"),
+        ("perspective", "string"),
+        ("task_type", "string"),
+        ("task_description", "string"),
+        ("success", "bool"),
+        ("steps_taken", "int64"),
+        ("time_taken", "float64"),
+        ("error_message", "string"),
+        ("overall_score", "int64"),
+        ("journey_step_count", "int64"),
+        ("har_archive", "string"),
+        ("reused_from", "string"),
+        ("rescored_at", "timestamp"),
+    ],
+    "steps": [
+        ("session_id", "string"),
+        ("journey_step", "int64"),
+        ("position", "int64"),
+        ("step", "string"),
+    ],
+    "feedback_items": [
+        ("session_id", "string"),
+        ("kind", "string"),
+        ("position", "int64"),
+        ("text", "string"),
+    ],
+    "journey_steps": [
+        ("session_id", "string"),
+        ("step_index", "int64"),
+        ("task_description", "string"),
+        ("success", "bool"),
+        ("time_taken", "float64"),
+        ("url_after", "string"),
+        ("error_message", "string"),
+    ],
+    "scores": [
+        ("session_id", "string"),
+        ("kind", "string"),
+        ("name", "string"),
+        ("score", "float64"),
+    ],
+}
+
+def resolve_format(format: str) -> str:
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {format}. Use one of {list(EXPORT_FORMATS)}")
+    if format == "auto":
+        return "parquet" if pyarrow is not None else "csv"
+    if format in ("parquet", "arrow") and pyarrow is None:
+        raise ValueError(f"The {format} format needs pyarrow (pip install pyarrow); use csv or jsonl")
+    return format
+
+def flatten_session(data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Split one stored session dictionary into rows per table"""
+    session_id = data["session_id"]
+    task_result = data.get("task_result") or {}
+    feedback = data.get("feedback") or {}
+    journey = data.get("journey_steps") or []
+    description = data.get("task_description")
+
+    if journey:
+        task_type = "journey"
+    elif description:
+        task_type = classify_task(description)
+    else:
+        task_type = "feedback"
+
+    rows: Dict[str, List[Dict[str, Any]]] = {name: [] for name in TABLES}
+    rows["sessions"].append({
+        "session_id": session_id,
+        "url": data.get("url"),
+        "created_at": data.get("created_at"),
+        "perspective": data.get("perspective") or feedback.get("perspective"),
+        "task_type": task_type,
+        "task_description": description,
+        "success": task_result.get("success"),
+        "steps_taken": task_result.get("steps_taken"),
+        "time_taken": task_result.get("time_taken"),
+        "error_message": task_result.get("error_message"),
+        "overall_score": feedback.get("overall_score"),
+        "journey_step_count": len(journey),
+        "har_archive": data.get("har_archive"),
+        "reused_from": data.get("reused_from"),
+        "rescored_at": data.get("rescored_at"),
+    })
+
+    for position, step in enumerate(task_result.get("steps_attempted") or []):
+        rows["steps"].append({"session_id": session_id, "journey_step": None, "position": position, "step": step})
+
+    for kind in ("positives", "negatives"):
+        for position, text in enumerate(feedback.get(kind) or []):
+            rows["feedback_items"].append({
+                "session_id": session_id, "kind": kind[:-1], "position": position, "text": text,
+            })
+
+    for journey_step in journey:
+        rows["journey_steps"].append({
+            "session_id": session_id,
+            "step_index": journey_step.get("step_index"),
+            "task_description": journey_step.get("task_description"),
+            "success": journey_step.get("success"),
+            "time_taken": journey_step.get("time_taken"),
+            "url_after": journey_step.get("url_after"),
+            "error_message": journey_step.get("error_message"),
+        })
+        for position, step in enumerate(journey_step.get("steps_attempted") or []):
+            rows["steps"].append({
+                "session_id": session_id, "journey_step": journey_step.get("step_index"),
+                "position": position, "step": step,
+            })
+
+    for kind, scores in (("metric", data.get("metric_scores")), ("perspective", data.get("perspective_scores"))):
+        for name, score in (scores or {}).items():
+            rows["scores"].append({"session_id": session_id, "kind": kind, "name": name, "score": score})
+
+    return rows
+
+class _CsvTable:
+    """Gzip-compressed CSV, or JSON Lines, written row group by row group"""
+
+    def __init__(self, path: Path, columns: List[Tuple[str, str]], jsonl: bool):
+        self.path = path
+        self.columns = [name for name, _ in columns]
+        self.jsonl = jsonl
+        self._file = gzip.open(path, "wt", newline="", encoding="utf-8")
+        self._writer = None
+        if not jsonl:
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.columns)
+
+    def write(self, rows: List[Dict[str, Any]]):
+        if self.jsonl:
+            self._file.writelines(json.dumps(row, default=str) + "\n" for row in rows)
+        else:
+            self._writer.writerows([row.get(column) for column in self.columns] for row in rows)
+
+    def close(self):
+        self._file.close()
+
+class _ArrowTable:
+    """Parquet or Arrow IPC file with one row group per flushed batch"""
+
+    def __init__(self, path: Path, columns: List[Tuple[str, str]], parquet: bool):
+        self.path = path
+        self.columns = columns
+        arrow_types = {
+            "string": pyarrow.string(),
+            "bool": pyarrow.bool_(),
+            "int64": pyarrow.int64(),
+            "float64": pyarrow.float64(),
+            "timestamp": pyarrow.timestamp("us"),
+        }
+        self.schema = pyarrow.schema([pyarrow.field(name, arrow_types[type_name]) for name, type_name in columns])
+        if parquet:
+            self._writer = pyarrow.parquet.ParquetWriter(str(path), self.schema, compression="zstd")
+        else:
+            self._writer = pyarrow.ipc.new_file(str(path), self.schema)
+
+    def write(self, rows: List[Dict[str, Any]]):
+        arrays = {}
+        for name, type_name in self.columns:
+            values = [row.get(name) for row in rows]
+            if type_name == "timestamp":
+                values = [datetime.fromisoformat(value) if isinstance(value, str) else value for value in values]
+            arrays[name] = values
+        self._writer.write_table(pyarrow.Table.from_pydict(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+def _open_table(directory: Path, name: str, format: str):
+    columns = TABLES[name]
+    if format == "parquet":
+        return _ArrowTable(directory / f"{name}.parquet", columns, parquet=True)
+    if format == "arrow":
+        return _ArrowTable(directory / f"{name}.arrow", columns, parquet=False)
+    if format == "jsonl":
+        return _CsvTable(directory / f"{name}.jsonl.gz", columns, jsonl=True)
+    return _CsvTable(directory / f"{name}.csv.gz", columns, jsonl=False)
+
+def _iter_sessions(store: SessionStore, session_filter: Dict[str, Any], counts: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+    for path in store.iter_paths():
+        counts["scanned"] += 1
+        try:
+            data = _loads(read_bytes(path))
+        except (OSError, ValueError):
+            counts["failed"] += 1
+            continue
+        if matches_filter(data, session_filter):
+            yield data
+
+def export_sessions(
+    store: SessionStore,
+    output_dir: Path,
+    session_filter: Optional[Dict[str, Any]] = None,
+    format: str = "auto",
+    batch_rows: int = DEFAULT_BATCH_ROWS
+) -> Dict[str, Any]:
+    """
+    Export every stored session matching ``session_filter`` into ``output_dir``.
+
+    Returns:
+        Dictionary with the resolved format, the file and row count of each
+        table, and counts of scanned/exported/failed session files
+    """
+    format = resolve_format(format)
+    start = time.perf_counter()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    writers = {name: _open_table(output_dir, name, format) for name in TABLES}
+    buffers: Dict[str, List[Dict[str, Any]]] = {name: [] for name in TABLES}
+    row_counts = {name: 0 for name in TABLES}
+    counts = {"scanned": 0, "exported": 0, "failed": 0}
+
+    def flush(name: str):
+        if buffers[name]:
+            writers[name].write(buffers[name])
+            row_counts[name] += len(buffers[name])
+            buffers[name] = []
+
+    try:
+        for data in _iter_sessions(store, session_filter or {}, counts):
+            try:
+                rows = flatten_session(data)
+            except (KeyError, TypeError, AttributeError):
+                counts["failed"] += 1
+                continue
+            counts["exported"] += 1
+            for name, table_rows in rows.items():
+                buffers[name].extend(table_rows)
+                if len(buffers[name]) >= batch_rows:
+                    flush(name)
+        for name in TABLES:
+            flush(name)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "format": format,
+        "output_dir": str(output_dir),
+        "tables": {
+            name: {"path": str(writers[name].path), "rows": row_counts[name]}
+            for name in TABLES
+        },
+        **counts,
+        "elapsed_seconds": round(elapsed, 3),
+        "sessions_per_second": round(counts["scanned"] / elapsed, 1) if elapsed else 0.0,
+    }
+
+def new_export_dir(exports_root: Path) -> Path:
+    return exports_root / f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export stored sessions into columnar tables")
+    parser.add_argument("--sessions-dir", type=Path, default=SESSIONS_DIR)
+    parser.add_argument("--output", type=Path, help="Directory for the tables (default: a new one under the data directory's exports/)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="auto")
+    parser.add_argument("--url-prefix")
+    parser.add_argument("--perspective", help="Only sessions whose feedback used this perspective")
+    parser.add_argument("--since", help="ISO timestamp; only sessions created at or after it")
+    parser.add_argument("--until", help="ISO timestamp; only sessions created at or before it")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS)
+    args = parser.parse_args(argv)
+
+    session_filter = {
+        key: value for key, value in {
+            "url_prefix": args.url_prefix,
+            "perspective": args.perspective,
+            "since": args.since,
+            "until": args.until,
+        }.items() if value
+    }
+    output_dir = args.output or new_export_dir(DATA_DIR / "exports")
+
+    try:
+        summary = export_sessions(SessionStore(args.sessions_dir), output_dir, session_filter,
+                                  args.format, args.batch_rows)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Exported {summary['exported']} of {summary['scanned']} sessions as {summary['format']} "
+          f"in {summary['elapsed_seconds']}s ({summary['sessions_per_second']}/s)")
+    for name, table in summary["tables"].items():
+        print(f"  {name}: {table['rows']} rows -> {table['path']}")
+    return 1 if summary["failed"] else 0
+
+__all__ = [
+    "EXPORT_FORMATS",
+    "TABLES",
+    "export_sessions",
+    "flatten_session",
+]
+
+if __name__ == "__main__":
+    raise SystemExit(main())
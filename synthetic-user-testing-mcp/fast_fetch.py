@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Browserless fetch tier for the Synthetic User Testing MCP Server.
+
+Server-rendered pages can be analyzed from their HTML alone. This module
+fetches pages over a pooled keep-alive HTTP client and extracts the same
+snapshot fields ``UserTester.visit_page`` gets from the browser (title, main
+text, navigation, forms, footer, accessibility signals) in a single parser
+pass. ``needs_javascript`` decides when a page has to be escalated to the
+browser instead.
+"""
+
+import logging
+import re
+import time
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from resilience import (
+    RETRYABLE_STATUS_CODES, CircuitBreakers, RetryableStatusError, RetryReport, remaining, retry_call
+)
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+FETCH_MODES = ("auto", "http", "browser")
+
+# Escalation reason returned when a conditional request came back 304
+NOT_MODIFIED = "not modified"
+
+MAX_MAIN_TEXT = 1000
+MAX_NAV_LINKS = 10
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+SKIPPED_TEXT_ELEMENTS = {"script", "style", "noscript", "template", "svg"}
+NAV_CLASSES = {"nav", "navigation"}
+
+# Client-side app shells: an empty mount point means the content is rendered by JS
+EMPTY_APP_ROOT = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|svelte)["\'][^>]*>\s*</div>',
+    re.IGNORECASE
+)
+
+class _SnapshotParser(HTMLParser):
+    """Single-pass extraction of the snapshot fields from raw HTML"""
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.stack: List[Tuple[str, bool]] = []  # (tag, opens a navigation region)
+        self.nav_depth = 0
+        self.skip_depth = 0
+        self.in_title = False
+        self.in_main = 0
+        self.in_body = 0
+        self.in_footer = 0
+        self.in_noscript = 0
+        self.label_depth = 0
+
+        self.title_parts: List[str] = []
+        self.main_parts: List[str] = []
+        self.body_parts: List[str] = []
+        self.footer_parts: List[str] = []
+        self.noscript_parts: List[str] = []
+        self.has_main = False
+
+        self.nav_links: List[Dict[str, str]] = []
+        self.current_link: Optional[Dict[str, Any]] = None
+
+        self.forms: List[Dict[str, Any]] = []
+        self.current_form: Optional[Dict[str, Any]] = None
+
+        self.html_lang: Optional[str] = None
+        self.has_viewport_meta = False
+        self.images = 0
+        self.images_missing_alt = 0
+        self.label_targets = set()
+        self.inputs: List[Dict[str, Any]] = []
+        self.scripts = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        attributes = {name: value or "" for name, value in attrs}
+
+        if tag == "html":
+            self.html_lang = attributes.get("lang") or None
+        elif tag == "meta" and attributes.get("name", "").lower() == "viewport":
+            self.has_viewport_meta = True
+        elif tag == "img":
+            self.images += 1
+            if "alt" not in attributes:
+                self.images_missing_alt += 1
+        elif tag == "label" and attributes.get("for"):
+            self.label_targets.add(attributes["for"])
+        elif tag in ("input", "select", "textarea"):
+            input_type = attributes.get("type", "text").lower()
+            if input_type != "hidden":
+                self.inputs.append({
+                    "id": attributes.get("id"),
+                    "labelled": bool(self.label_depth or attributes.get("aria-label")
+                                     or attributes.get("aria-labelledby") or attributes.get("title")),
+                })
+                if self.current_form is not None:
+                    self.current_form["fields"].append({
+                        "type": input_type if tag == "input" else tag,
+                        "name": attributes.get("name"),
+                        "placeholder": attributes.get("placeholder"),
+                    })
+        elif tag == "script":
+            self.scripts += 1
+
+        if tag in VOID_ELEMENTS:
+            return
+
+        classes = set(attributes.get("class", "").split())
+        opens_nav = tag in ("nav", "header") or bool(classes & NAV_CLASSES)
+        self.stack.append((tag, opens_nav))
+        if opens_nav:
+            self.nav_depth += 1
+
+        if tag in SKIPPED_TEXT_ELEMENTS:
+            self.skip_depth += 1
+            if tag == "noscript":
+                self.in_noscript += 1
+        elif tag == "title":
+            self.in_title = True
+        elif tag == "main":
+            self.in_main += 1
+            self.has_main = True
+        elif tag == "body":
+            self.in_body += 1
+        elif tag == "footer":
+            self.in_footer += 1
+        elif tag == "label":
+            self.label_depth += 1
+        elif tag == "form":
+            self.current_form = {
+                "action": urljoin(self.base_url, attributes.get("action", "")),
+                "method": attributes.get("method", "get").lower(),
+                "fields": [],
+            }
+        elif tag == "a" and self.nav_depth:
+            self.current_link = {"href": attributes.get("href"), "parts": []}
+
+    def handle_endtag(self, tag: str):
+        if tag in VOID_ELEMENTS:
+            return
+        # Pop up to the matching open tag so unclosed children don't leak state
+        while self.stack:
+            open_tag, opened_nav = self.stack.pop()
+            self._close(open_tag, opened_nav)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag: str, opened_nav: bool):
+        if opened_nav:
+            self.nav_depth -= 1
+        if tag in SKIPPED_TEXT_ELEMENTS:
+            self.skip_depth -= 1
+            if tag == "noscript":
+                self.in_noscript -= 1
+        elif tag == "title":
+            self.in_title = False
+        elif tag == "main":
+            self.in_main -= 1
+        elif tag == "body":
+            self.in_body -= 1
+        elif tag == "footer":
+            self.in_footer -= 1
+        elif tag == "label":
+            self.label_depth -= 1
+        elif tag == "form" and self.current_form is not None:
+            self.forms.append(self.current_form)
+            self.current_form = None
+        elif tag == "a" and self.current_link is not None:
+            text = " ".join("".join(self.current_link["parts"]).split())
+            if text:
+                href = self.current_link["href"]
+                self.nav_links.append({
+                    "text": text,
+                    "href": urljoin(self.base_url, href) if href else None,
+                })
+            self.current_link = None
+
+    def handle_data(self, data: str):
+        if self.in_noscript:
+            self.noscript_parts.append(data)
+        if self.skip_depth:
+            return
+        if self.in_title:
+            self.title_parts.append(data)
+            return
+        if self.current_link is not None:
+            self.current_link["parts"].append(data)
+        if self.in_main:
+            self.main_parts.append(data)
+        if self.in_body or not self.stack:
+            self.body_parts.append(data)
+        if self.in_footer:
+            self.footer_parts.append(data)
+
+def _collapse(parts: List[str]) -> str:
+    return " ".join(" ".join(parts).split())
+
+def parse_snapshot(html: str, url: str) -> Dict[str, Any]:
+    """Extract snapshot fields from raw HTML"""
+    parser = _SnapshotParser(url)
+    parser.feed(html)
+    parser.close()
+    # Close anything left open (e.g. missing </form>) so it is still counted
+    while parser.stack:
+        parser._close(*parser.stack.pop())
+
+    main_text = _collapse(parser.main_parts if parser.has_main else parser.body_parts)
+    inputs = parser.inputs
+    unlabeled = sum(1 for field in inputs
+                    if not field["labelled"] and field["id"] not in parser.label_targets)
+
+    nav_links = parser.nav_links[:MAX_NAV_LINKS]
+    return {
+        "title": _collapse(parser.title_parts),
+        "url": url,
+        "main_text": main_text[:MAX_MAIN_TEXT],
+        "navigation_elements": [link["text"] for link in nav_links],
+        "navigation_links": nav_links,
+        "forms": parser.forms,
+        "footer_text": _collapse(parser.footer_parts)[:MAX_MAIN_TEXT],
+        "page_signals": {
+            "html_lang": parser.html_lang,
+            "has_viewport_meta": parser.has_viewport_meta,
+            # Layout is unknown without rendering; assume no overflow
+            "horizontal_overflow": False,
+            "images": parser.images,
+            "images_missing_alt": parser.images_missing_alt,
+            "form_inputs": len(inputs),
+            "unlabeled_inputs": unlabeled,
+        },
+        "_text_length": len(main_text),
+        "_scripts": parser.scripts,
+        "_noscript_text": _collapse(parser.noscript_parts).lower(),
+    }
+
+def needs_javascript(html: str, snapshot: Dict[str, Any]) -> Optional[str]:
+    """Return why the page needs a real browser, or None if the HTML is enough"""
+    if EMPTY_APP_ROOT.search(html):
+        return "empty client-side app root"
+    if "javascript" in snapshot.get("_noscript_text", ""):
+        return "page asks for JavaScript in <noscript>"
+    if snapshot.get("_text_length", 0) < 200 and snapshot.get("_scripts", 0) > 0:
+        return "little server-rendered text alongside scripts"
+    if not snapshot.get("title") and not snapshot.get("navigation_elements"):
+        return "no title or navigation in HTML"
+    return None
+
+def response_validators(headers) -> Dict[str, str]:
+    """ETag / Last-Modified cache validators from response headers"""
+    validators = {}
+    if headers.get("etag"):
+        validators["etag"] = headers["etag"]
+    if headers.get("last-modified"):
+        validators["last_modified"] = headers["last-modified"]
+    return validators
+
+def conditional_headers(validators: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Request headers that make a request conditional on ``validators``"""
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+class FastFetcher:
+    """Pooled keep-alive HTTP client for the browserless tier"""
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        user_agent: Optional[str] = None,
+        max_connections: int = 50,
+        retries: int = 0,
+        breakers: Optional[CircuitBreakers] = None
+    ):
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.max_connections = max_connections
+        self.retries = retries
+        self.breakers = breakers
+        self._client = None
+
+    @property
+    def available(self) -> bool:
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+            headers = {"User-Agent": self.user_agent} if self.user_agent else {}
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=self.timeout,
+                headers=headers,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+            )
+        return self._client
+
+    async def fetch(
+        self,
+        url: str,
+        validators: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch and parse a page without a browser.
+
+        ``validators`` ("etag" / "last_modified" from an earlier snapshot) turn
+        the request into a conditional one.
+
+        Returns:
+            (snapshot, escalation_reason) - the snapshot is None when the page
+            could not be handled over HTTP, and the reason says why; the reason
+            is NOT_MODIFIED when the server confirmed the validators are current
+        """
+        if not self.available:
+            return None, "httpx is not installed"
+
+        headers = conditional_headers(validators)
+
+        client = self._get_client()
+        start = time.perf_counter()
+        report = RetryReport()
+
+        async def get():
+            nonlocal start
+            start = time.perf_counter()
+            left = remaining()
+            timeout = self.timeout if left is None else max(0.001, min(self.timeout, left))
+            with tracer.span("http.fetch"):
+                response = await client.get(url, headers=headers, timeout=timeout)
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise RetryableStatusError(response.status_code)
+            return response
+
+        try:
+            response = await retry_call(get, url, self.breakers, self.retries, report)
+        except RetryableStatusError as e:
+            return None, f"HTTP status {e.status_code} after {report.attempts} attempts"
+        except Exception as e:
+            logger.warning(f"HTTP fetch failed for {url}: {e}")
+            return None, f"HTTP fetch failed: {e}"
+        load_time = time.perf_counter() - start
+
+        if response.status_code == 304:
+            return None, NOT_MODIFIED
+        content_type = response.headers.get("content-type", "")
+        if response.status_code >= 400:
+            return None, f"HTTP status {response.status_code}"
+        if "html" not in content_type:
+            return None, f"non-HTML content type {content_type or 'unknown'}"
+
+        html = response.text
+        with tracer.span("http.parse"):
+            snapshot = parse_snapshot(html, str(response.url))
+        reason = needs_javascript(html, snapshot)
+
+        for private_key in ("_text_length", "_scripts", "_noscript_text"):
+            snapshot.pop(private_key, None)
+        snapshot.update({
+            "url": url,
+            "load_time": load_time,
+            "wall_time": load_time,
+            "performance": {
+                "ttfb": response.elapsed.total_seconds() * 1000,
+                "request_count": 1,
+                "transfer_bytes": len(response.content),
+            },
+            "screenshot": None,
+            "validators": response_validators(response.headers),
+        })
+        if report.notable:
+            snapshot["retries"] = report.as_dict()
+        return snapshot, reason
+
+    async def revalidate(self, url: str, validators: Optional[Dict[str, str]]) -> bool:
+        """
+        Whether ``validators`` are still current for ``url``.
+
+        Sends a conditional HEAD request, so nothing is downloaded either way.
+        Any failure counts as "not confirmed".
+        """
+        headers = conditional_headers(validators)
+        if not self.available or not headers:
+            return False
+        left = remaining()
+        timeout = self.timeout if left is None else max(0.001, min(self.timeout, left))
+        try:
+            with tracer.span("http.revalidate"):
+                response = await self._get_client().head(url, headers=headers, timeout=timeout)
+        except Exception as e:
+            logger.debug(f"Revalidation failed for {url}: {e}")
+            return False
+        return response.status_code == 304
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+__all__ = [
+    "FETCH_MODES",
+    "FastFetcher",
+    "NOT_MODIFIED",
+    "conditional_headers",
+    "needs_javascript",
+    "parse_snapshot",
+    "response_validators",
+]
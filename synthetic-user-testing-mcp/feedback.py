@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Perspective-based feedback heuristics for the Synthetic User Testing MCP Server.
+
+``generate_feedback`` works purely on a page snapshot, so the same code scores
+live visits and stored snapshots during offline re-scoring.
+"""
+
+import random
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from models import Feedback
+
+def generate_feedback(
+    page_info: Dict[str, Any],
+    perspective: str,
+    rng: Optional[random.Random] = None
+) -> Feedback:
+    """
+    Generate realistic feedback based on page information and user perspective.
+    
+    Pass a seeded ``rng`` to make the simulated user variability reproducible.
+    """
+    positives = []
+    negatives = []
+    score = 5  # Base score
+    
+    # Analyze load time
+    load_time = page_info.get("load_time", 0)
+    if load_time < 2:
+        positives.append("Page loads quickly")
+        score += 1
+    elif load_time > 5:
+        negatives.append("Page takes too long to load")
+        score -= 1
+    
+    # Analyze title
+    title = page_info.get("title", "")
+    if title and len(title) > 10:
+        positives.append("Clear page title")
+    else:
+        negatives.append("Missing or unclear page title")
+        score -= 1
+    
+    # Analyze navigation
+    nav_elements = page_info.get("navigation_elements", [])
+    if len(nav_elements) >= 3:
+        positives.append("Good navigation structure")
+        score += 1
+    elif len(nav_elements) < 2:
+        negatives.append("Limited navigation options")
+        score -= 1
+    
+    # Analyze content
+    main_text = page_info.get("main_text", "")
+    if len(main_text) > 100:
+        positives.append("Sufficient content available")
+    else:
+        negatives.append("Limited content on page")
+        score -= 1
+    
+    # Perspective-specific feedback
+    if perspective == "new_user":
+        # New users need clear guidance
+        if "welcome" in main_text.lower() or "get started" in main_text.lower():
+            positives.append("Welcoming content for new users")
+        else:
+            negatives.append("Lacks clear guidance for new users")
+            score -= 1
+        
+        # New users might be overwhelmed by too many options
+        if len(nav_elements) > 8:
+            negatives.append("Too many navigation options might confuse new users")
+            score -= 1
+    
+    elif perspective == "expert_user":
+        # Expert users want efficiency
+        if len(nav_elements) >= 5:
+            positives.append("Comprehensive navigation for power users")
+        else:
+            negatives.append("Limited options for advanced users")
+            score -= 1
+        
+        # Expert users appreciate shortcuts
+        if "search" in str(nav_elements).lower():
+            positives.append("Search functionality available")
+        else:
+            negatives.append("No search functionality found")
+            score -= 1
+    
+    elif perspective == "elderly_user":
+        # Elderly users need larger, clearer elements
+        negatives.append("Cannot assess text size and contrast from automation")
+        score -= 1
+        
+        # Prefer simpler navigation
+        if len(nav_elements) <= 5:
+            positives.append("Simple, uncluttered navigation")
+        else:
+            negatives.append("Navigation might be too complex")
+            score -= 1
+    
+    elif perspective == "mobile_user":
+        # Mobile users need responsive design
+        negatives.append("Cannot assess mobile responsiveness from desktop automation")
+        score -= 1
+        
+        # Mobile users prefer concise content
+        if len(main_text) < 500:
+            positives.append("Concise content suitable for mobile")
+        else:
+            negatives.append("Content might be too lengthy for mobile")
+            score -= 1
+    
+    # Ensure score is within bounds
+    score = max(1, min(10, score))
+    
+    # Add some randomness to simulate real user variability
+    rng = rng or random
+    if rng.random() < 0.3:  # 30% chance of additional random feedback
+        random_negatives = [
+            "Button placement could be improved",
+            "Color scheme feels outdated",
+            "Some text is hard to read",
+            "Layout feels cluttered"
+        ]
+        negatives.append(rng.choice(random_negatives))
+        score = max(1, score - 1)
+    
+    return Feedback(
+        positives=positives,
+        negatives=negatives,
+        overall_score=score,
+        perspective=perspective,
+        timestamp=datetime.now()
+    )
+
+__all__ = [
+    "generate_feedback",
+]
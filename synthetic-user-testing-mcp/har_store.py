@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+HAR archive store for record-and-replay runs.
+
+Sessions can record their network traffic to a HAR file and later replay it
+through Playwright's ``route_from_har``, so re-simulations run against the
+recorded responses instead of the live site. Response bodies are moved out of
+the HAR files into a content-addressed blob directory, so identical bodies
+(shared scripts, stylesheets, fonts) are stored once across all archives, and
+the store evicts the oldest archives when it grows past its size limit. The
+archive just recorded is never evicted, even when it alone exceeds the limit,
+since the session that recorded it refers to it.
+
+Layout under ``root``:
+    index.json              archive metadata and the latest archive per URL
+    archives/<id>.har       HAR files whose bodies point at blobs via "_file"
+    archives/blobs/<sha256> deduplicated response bodies
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HAR_MODES = ("off", "record", "replay")
+
+class HarStore:
+    """Content-addressed HAR archive store with size limits"""
+
+    def __init__(self, root: Path, max_bytes: int = 500 * 1024 * 1024, max_archives: int = 1000):
+        self.root = root
+        self.archives_dir = root / "archives"
+        self.blobs_dir = self.archives_dir / "blobs"
+        self.index_path = root / "index.json"
+        self.max_bytes = max_bytes
+        self.max_archives = max_archives
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Any]] = None
+
+    def _load_index(self) -> Dict[str, Any]:
+        if self._index is None:
+            if self.index_path.exists():
+                self._index = json.loads(self.index_path.read_text())
+            else:
+                self._index = {"archives": {}, "latest_by_url": {}, "blobs": {}}
+        return self._index
+
+    def _save_index(self):
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._index, indent=2))
+        os.replace(tmp_path, self.index_path)
+
+    def recording_path(self, archive_id: str) -> Path:
+        """Where Playwright should write the HAR for a new recording"""
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        return self.archives_dir / f"{archive_id}.har"
+
+    def archive_path(self, archive_id: Optional[str] = None, url: Optional[str] = None) -> Optional[Path]:
+        """Path of a stored archive by id, or of the latest archive recorded for ``url``"""
+        with self._lock:
+            index = self._load_index()
+            if archive_id is None and url is not None:
+                archive_id = index["latest_by_url"].get(url)
+            if archive_id is None or archive_id not in index["archives"]:
+                return None
+        path = self.archives_dir / f"{archive_id}.har"
+        return path if path.exists() else None
+
+    def finalize(self, archive_id: str, url: str) -> Dict[str, Any]:
+        """
+        Deduplicate the bodies of a freshly recorded HAR and register it.
+
+        Must be called after the recording context has been closed, since
+        Playwright only writes the HAR file on close.
+        """
+        har_path = self.archives_dir / f"{archive_id}.har"
+        har = json.loads(har_path.read_text())
+
+        with self._lock:
+            index = self._load_index()
+            blobs = index["blobs"]
+            referenced = set()
+            new_bytes = 0
+
+            for entry in har.get("log", {}).get("entries", []):
+                content = entry.get("response", {}).get("content", {})
+                text = content.get("text")
+                if text is None:
+                    continue
+                if content.get("encoding") == "base64":
+                    body = base64.b64decode(text)
+                else:
+                    body = text.encode("utf-8")
+
+                digest = hashlib.sha256(body).hexdigest()
+                if digest not in blobs:
+                    (self.blobs_dir / digest).write_bytes(body)
+                    blobs[digest] = {"size": len(body), "refs": 0}
+                    new_bytes += len(body)
+                if digest not in referenced:
+                    blobs[digest]["refs"] += 1
+                    referenced.add(digest)
+
+                content.pop("text", None)
+                content.pop("encoding", None)
+                content["_file"] = f"blobs/{digest}"
+
+            har_path.write_text(json.dumps(har))
+            metadata = {
+                "archive_id": archive_id,
+                "url": url,
+                "created_at": datetime.now().isoformat(),
+                "entries": len(har.get("log", {}).get("entries", [])),
+                "har_bytes": har_path.stat().st_size,
+                "blobs": sorted(referenced),
+                "new_blob_bytes": new_bytes,
+            }
+            index["archives"][archive_id] = metadata
+            index["latest_by_url"][url] = archive_id
+            self._enforce_limits(index, keep=archive_id)
+            self._save_index()
+
+        return {key: value for key, value in metadata.items() if key != "blobs"}
+
+    def _total_bytes(self, index: Dict[str, Any]) -> int:
+        har_bytes = sum(archive["har_bytes"] for archive in index["archives"].values())
+        blob_bytes = sum(blob["size"] for blob in index["blobs"].values())
+        return har_bytes + blob_bytes
+
+    def _enforce_limits(self, index: Dict[str, Any], keep: str):
+        """Evict the oldest archives other than ``keep`` until the store is within its limits"""
+        archives = index["archives"]
+        oldest_first = sorted(
+            (archive for archive in archives.values() if archive["archive_id"] != keep),
+            key=lambda archive: archive["created_at"]
+        )
+        while oldest_first and (
+            len(archives) > self.max_archives or self._total_bytes(index) > self.max_bytes
+        ):
+            self._remove_archive(index, oldest_first.pop(0)["archive_id"])
+        if self._total_bytes(index) > self.max_bytes:
+            logger.warning(
+                f"HAR archive {keep} alone exceeds the store's {self.max_bytes} byte limit; "
+                f"keeping it for the session that recorded it"
+            )
+
+    def _remove_archive(self, index: Dict[str, Any], archive_id: str):
+        archive = index["archives"].pop(archive_id)
+        (self.archives_dir / f"{archive_id}.har").unlink(missing_ok=True)
+        for digest in archive["blobs"]:
+            blob = index["blobs"].get(digest)
+            if blob is None:
+                continue
+            blob["refs"] -= 1
+            if blob["refs"] <= 0:
+                del index["blobs"][digest]
+                (self.blobs_dir / digest).unlink(missing_ok=True)
+        if index["latest_by_url"].get(archive["url"]) == archive_id:
+            remaining = [a for a in index["archives"].values() if a["url"] == archive["url"]]
+            if remaining:
+                index["latest_by_url"][archive["url"]] = max(remaining, key=lambda a: a["created_at"])["archive_id"]
+            else:
+                del index["latest_by_url"][archive["url"]]
+        logger.info(f"Evicted HAR archive {archive_id} for {archive['url']}")
+
+    def delete(self, archive_id: str) -> bool:
+        with self._lock:
+            index = self._load_index()
+            if archive_id not in index["archives"]:
+                return False
+            self._remove_archive(index, archive_id)
+            self._save_index()
+            return True
+
+    def list_archives(self, url: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            archives = list(self._load_index()["archives"].values())
+        if url is not None:
+            archives = [archive for archive in archives if archive["url"] == url]
+        return [
+            {key: value for key, value in archive.items() if key != "blobs"}
+            for archive in sorted(archives, key=lambda archive: archive["created_at"], reverse=True)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._load_index()
+            return {
+                "archives": len(index["archives"]),
+                "unique_bodies": len(index["blobs"]),
+                "total_bytes": self._total_bytes(index),
+                "max_bytes": self.max_bytes,
+            }
+
+__all__ = [
+    "HAR_MODES",
+    "HarStore",
+]
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Deferred imports for modules that are slow to import.
+
+MCP clients typically spawn the server once per session and wait for the
+handshake before they can call anything, so the server avoids importing
+modules (NumPy, Playwright, pyarrow) that only some tool calls need.
+``optional_import`` imports a module the first time it is asked for and
+caches the result, including the fact that an optional dependency is
+missing.
+"""
+
+import importlib
+import threading
+from typing import Any, Dict, Optional
+
+_modules: Dict[str, Optional[Any]] = {}
+_lock = threading.Lock()
+
+def optional_import(name: str) -> Optional[Any]:
+    """
+    Import ``name`` on first use.
+
+    Returns:
+        The module, or None when it is not installed
+    """
+    try:
+        return _modules[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _modules:
+            try:
+                _modules[name] = importlib.import_module(name)
+            except ImportError:
+                _modules[name] = None
+        return _modules[name]
+
+__all__ = [
+    "optional_import",
+]
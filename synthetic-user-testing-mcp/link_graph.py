@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Per-site link graph and click-depth analysis.
+
+Every page visit (and every page ``crawl_site`` fetches) extracts the page's
+navigation links. ``LinkGraphIndex`` keeps them as one directed graph per
+origin, so the server can answer "how many clicks from the landing page does
+it take to reach a page about X?" without visiting anything:
+
+- URLs are interned: each page is an integer id, and its out-links are an
+  ``array("I")`` of ids, so a graph of thousands of pages stays small and a
+  breadth-first search touches only integers,
+- a page matches a task when one of the task's keywords appears in its URL
+  path or in the text of a link pointing to it, and
+- only same-origin links are kept; fragments are dropped, so ``/about`` and
+  ``/about#team`` are one page.
+
+Graphs are stored as one JSON file per origin under ``root``. The index
+serializes every read and change of a graph with one lock, so visits recorded
+from worker threads never race a route search.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from array import array
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlsplit, urlunsplit
+
+# Link texts kept per page, for keyword matching
+MAX_LABELS = 4
+
+def normalize_url(url: str) -> Optional[str]:
+    """``url`` without its fragment and with a lowercase scheme and host, or None if it is not http(s)"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return urlunsplit((scheme, parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+def origin_of(url: str) -> Optional[str]:
+    normalized = normalize_url(url)
+    if normalized is None:
+        return None
+    parts = urlsplit(normalized)
+    return f"{parts.scheme}://{parts.netloc}"
+
+class SiteGraph:
+    """The navigation links between the known pages of one origin"""
+
+    def __init__(self, origin: str):
+        self.origin = origin
+        self.urls: List[str] = []
+        self.ids: Dict[str, int] = {}
+        # Lowercase texts of the links pointing to each page
+        self.labels: List[List[str]] = []
+        self.edges: List[array] = []
+        # Pages whose own links have been seen
+        self.expanded = set()
+        self._matches: Dict[tuple, frozenset] = {}
+
+    def intern(self, url: str) -> int:
+        node = self.ids.get(url)
+        if node is None:
+            node = len(self.urls)
+            self.ids[url] = node
+            self.urls.append(url)
+            self.labels.append([])
+            self.edges.append(array("I"))
+            self._matches.clear()
+        return node
+
+    def add_page(self, url: str, links: Iterable[Dict[str, Any]]) -> bool:
+        """
+        Replace the out-links of ``url`` with its same-origin ``links``
+        (``{"text", "href"}`` dicts as in snapshots).
+
+        Returns:
+            Whether the graph changed
+        """
+        normalized = normalize_url(url)
+        if normalized is None or origin_of(normalized) != self.origin:
+            return False
+        node = self.intern(normalized)
+        changed = node not in self.expanded
+        self.expanded.add(node)
+
+        targets = array("I")
+        for link in links or []:
+            href = normalize_url(link.get("href") or "")
+            if href is None or origin_of(href) != self.origin:
+                continue
+            target = self.intern(href)
+            if target != node and target not in targets:
+                targets.append(target)
+            text = " ".join((link.get("text") or "").split()).lower()
+            labels = self.labels[target]
+            if text and text not in labels and len(labels) < MAX_LABELS:
+                labels.append(text)
+                self._matches.clear()
+                changed = True
+        if targets != self.edges[node]:
+            self.edges[node] = targets
+            changed = True
+        return changed
+
+    def matching(self, keywords: Sequence[str]) -> frozenset:
+        """Ids of the pages whose URL path or link text contains one of ``keywords``"""
+        key = tuple(keyword.lower() for keyword in keywords)
+        matches = self._matches.get(key)
+        if matches is None:
+            found = set()
+            for node, url in enumerate(self.urls):
+                parts = urlsplit(url)
+                haystack = " ".join([parts.path.lower(), parts.query.lower()] + self.labels[node])
+                if any(keyword in haystack for keyword in key):
+                    found.add(node)
+            matches = self._matches[key] = frozenset(found)
+        return matches
+
+    def _search(self, start: int, is_goal: Callable[[int], bool]) -> Optional[List[int]]:
+        """Breadth-first search: the shortest path of ids from ``start`` to a goal page"""
+        parents = array("i", [-1]) * len(self.urls)
+        parents[start] = start
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if is_goal(node):
+                path = [node]
+                while node != start:
+                    node = parents[node]
+                    path.append(node)
+                return path[::-1]
+            for target in self.edges[node]:
+                if parents[target] < 0:
+                    parents[target] = node
+                    queue.append(target)
+        return None
+
+    def route(self, start_url: str, keywords: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """
+        The fewest clicks from ``start_url`` to a page matching ``keywords``.
+
+        Returns:
+            ``{"url", "clicks", "path"}`` for the nearest matching page, or
+            None when ``start_url`` is unknown or no known page matches
+        """
+        start = self.ids.get(normalize_url(start_url) or "")
+        goals = self.matching(keywords)
+        if start is None or not goals:
+            return None
+        path = self._search(start, goals.__contains__)
+        if path is None:
+            return None
+        return {
+            "url": self.urls[path[-1]],
+            "clicks": len(path) - 1,
+            "path": [self.urls[node] for node in path],
+        }
+
+    def depths(self, start_url: str) -> Dict[str, int]:
+        """Click depth of every page reachable from ``start_url``"""
+        start = self.ids.get(normalize_url(start_url) or "")
+        if start is None:
+            return {}
+        depth = array("i", [-1]) * len(self.urls)
+        depth[start] = 0
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for target in self.edges[node]:
+                if depth[target] < 0:
+                    depth[target] = depth[node] + 1
+                    queue.append(target)
+        return {self.urls[node]: value for node, value in enumerate(depth) if value >= 0}
+
+    def links_from(self, url: str) -> List[str]:
+        node = self.ids.get(normalize_url(url) or "")
+        return [] if node is None else [self.urls[target] for target in self.edges[node]]
+
+    def summary(self, start_url: str) -> Dict[str, Any]:
+        depths = self.depths(start_url)
+        histogram: Dict[int, int] = {}
+        for value in depths.values():
+            histogram[value] = histogram.get(value, 0) + 1
+        return {
+            "origin": self.origin,
+            "pages_known": len(self.urls),
+            "pages_expanded": len(self.expanded),
+            "links": sum(len(targets) for targets in self.edges),
+            "reachable": len(depths),
+            "max_depth": max(depths.values(), default=0),
+            "depth_histogram": {str(key): histogram[key] for key in sorted(histogram)},
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "origin": self.origin,
+            "urls": self.urls,
+            "labels": self.labels,
+            "edges": [targets.tolist() for targets in self.edges],
+            "expanded": sorted(self.expanded),
+            "updated_at": datetime.now().isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SiteGraph":
+        graph = cls(data["origin"])
+        graph.urls = list(data["urls"])
+        graph.ids = {url: node for node, url in enumerate(graph.urls)}
+        graph.labels = [list(labels) for labels in data["labels"]]
+        graph.edges = [array("I", targets) for targets in data["edges"]]
+        graph.expanded = set(data.get("expanded", []))
+        return graph
+
+class LinkGraphIndex:
+    """One ``SiteGraph`` per origin, loaded on first use and saved as pages are added"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._graphs: Dict[str, SiteGraph] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, origin: str) -> Path:
+        return self.root / f"{hashlib.sha1(origin.encode('utf-8')).hexdigest()}.json"
+
+    def _write(self, graph: SiteGraph):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(graph.origin)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps(graph.to_dict(), separators=(",", ":")))
+        os.replace(tmp_path, path)
+
+    def graph(self, url: str) -> Optional[SiteGraph]:
+        """The graph of ``url``'s origin, or None for non-http(s) URLs"""
+        origin = origin_of(url)
+        if origin is None:
+            return None
+        with self._lock:
+            graph = self._graphs.get(origin)
+            if graph is None:
+                path = self._path(origin)
+                graph = SiteGraph.from_dict(json.loads(path.read_text())) if path.exists() else SiteGraph(origin)
+                self._graphs[origin] = graph
+            return graph
+
+    def record(self, url: str, links: Optional[Iterable[Dict[str, Any]]]) -> bool:
+        """Add a visited page and its navigation links, saving the graph if it changed"""
+        graph = self.graph(url)
+        if graph is None:
+            return False
+        with self._lock:
+            changed = graph.add_page(url, links or [])
+            if changed:
+                self._write(graph)
+        return changed
+
+    def route(self, start_url: str, keywords: Sequence[str]) -> Optional[Dict[str, Any]]:
+        graph = self.graph(start_url)
+        if graph is None:
+            return None
+        with self._lock:
+            return graph.route(start_url, keywords)
+
+    def links_from(self, url: str) -> List[str]:
+        graph = self.graph(url)
+        if graph is None:
+            return []
+        with self._lock:
+            return graph.links_from(url)
+
+    def summary(self, start_url: str) -> Optional[Dict[str, Any]]:
+        graph = self.graph(start_url)
+        if graph is None:
+            return None
+        with self._lock:
+            return graph.summary(start_url)
+
+    def findability(self, start_url: str, tasks: Dict[str, Sequence[str]]) -> Dict[str, Any]:
+        """
+        How many clicks from ``start_url`` each task's pages are.
+
+        Returns:
+            ``{"tasks": {task: route or None}, "pages_known": n}``, where a
+            route is as returned by ``SiteGraph.route``
+        """
+        graph = self.graph(start_url)
+        if graph is None:
+            return {"tasks": {}, "pages_known": 0}
+        with self._lock:
+            return {
+                "tasks": {task: graph.route(start_url, keywords) for task, keywords in tasks.items()},
+                "pages_known": len(graph.urls),
+            }
+
+__all__ = [
+    "LinkGraphIndex",
+    "SiteGraph",
+    "normalize_url",
+    "origin_of",
+]
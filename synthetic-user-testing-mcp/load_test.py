@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Synthetic load testing: many concurrent virtual users against one site.
+
+Virtual users are ramped up evenly over the ramp-up period, each cycling
+through the personas, and keep repeating the task until the test duration is
+over. Every iteration borrows a browser context from a shared pool, so the
+number of contexts stays bounded by the number of concurrent users and
+contexts are reused across iterations instead of being created per run. The
+pool can hold an admission slot for each context it opens, so a load test
+counts against the server's concurrency limits like any other browser work.
+
+Per-iteration samples (start offset, navigation time, total duration,
+success) are bucketed over time into throughput, p95 load time and success
+rate curves, which show how usability degrades as load builds up.
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import time
+from contextlib import AsyncExitStack
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKET_SECONDS = 5.0
+MAX_BUCKETS = 120
+
+# (context, persona) -> sample fields: "load_time_ms", "success", "error"
+IterationRunner = Callable[[Any, str], Awaitable[Dict[str, Any]]]
+
+class ContextPool:
+    """
+    A bounded pool of reusable browser contexts.
+
+    When ``admit`` is given, it is entered (e.g. ``AdmissionController.slot``)
+    before each context is opened and held until the pool is closed.
+    """
+
+    def __init__(
+        self,
+        new_context: Callable[[], Awaitable[Any]],
+        size: int,
+        admit: Optional[Callable[[], AsyncContextManager]] = None
+    ):
+        self.new_context = new_context
+        self.size = size
+        self.admit = admit
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._created = 0
+        self._lock = asyncio.Lock()
+        self._slots = AsyncExitStack()
+
+    async def acquire(self):
+        if self._idle.empty():
+            async with self._lock:
+                if self._created < self.size:
+                    if self.admit is not None:
+                        await self._slots.enter_async_context(self.admit())
+                    self._created += 1
+                    return await self.new_context()
+        return await self._idle.get()
+
+    async def release(self, context):
+        try:
+            # Each iteration starts as a fresh visitor
+            await context.clear_cookies()
+        except Exception as e:
+            logger.warning(f"Could not reset pooled context: {e}")
+        self._idle.put_nowait(context)
+
+    async def close(self):
+        while not self._idle.empty():
+            context = self._idle.get_nowait()
+            try:
+                await context.close()
+            except Exception:
+                pass
+        await self._slots.aclose()
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+def summarize(
+    samples: List[Dict[str, Any]],
+    duration: float,
+    bucket_seconds: float,
+    user_spans: Optional[List[Tuple[float, float]]] = None
+) -> Dict[str, Any]:
+    """
+    Bucket samples by the time they finished and compute the curves.
+
+    ``user_spans`` holds each virtual user's (start, end) offsets, used to
+    report how many users were active in every bucket.
+    """
+    bucket_count = max(1, math.ceil(duration / bucket_seconds))
+    buckets: List[List[Dict[str, Any]]] = [[] for _ in range(bucket_count)]
+    for sample in samples:
+        index = min(bucket_count - 1, int(sample["finished_at"] // bucket_seconds))
+        buckets[index].append(sample)
+
+    curves = []
+    for index, bucket in enumerate(buckets):
+        load_times = [s["load_time_ms"] for s in bucket if s.get("load_time_ms") is not None]
+        successes = sum(1 for s in bucket if s["success"])
+        bucket_start = index * bucket_seconds
+        bucket_end = bucket_start + bucket_seconds
+        curves.append({
+            "start": round(bucket_start, 3),
+            "active_users": sum(1 for user_start, user_end in user_spans or []
+                                if user_start < bucket_end and user_end > bucket_start),
+            "completed": len(bucket),
+            "throughput_per_s": round(len(bucket) / bucket_seconds, 3),
+            "p95_load_time_ms": round(_percentile(load_times, 0.95), 1),
+            "success_rate": round(successes / len(bucket), 3) if bucket else None,
+            "errors": sum(1 for s in bucket if s.get("error")),
+        })
+
+    load_times = [s["load_time_ms"] for s in samples if s.get("load_time_ms") is not None]
+    durations = [s["duration_ms"] for s in samples]
+    successes = sum(1 for s in samples if s["success"])
+    return {
+        "iterations": len(samples),
+        "success_rate": round(successes / len(samples), 3) if samples else 0.0,
+        "throughput_per_s": round(len(samples) / duration, 3) if duration else 0.0,
+        "p50_load_time_ms": round(_percentile(load_times, 0.50), 1),
+        "p95_load_time_ms": round(_percentile(load_times, 0.95), 1),
+        "p95_iteration_ms": round(_percentile(durations, 0.95), 1),
+        "errors": sum(1 for s in samples if s.get("error")),
+        "timeline": curves,
+    }
+
+def _per_persona(samples: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    by_persona: Dict[str, List[Dict[str, Any]]] = {}
+    for sample in samples:
+        by_persona.setdefault(sample["persona"], []).append(sample)
+    return {
+        persona: {
+            "iterations": len(group),
+            "success_rate": round(sum(1 for s in group if s["success"]) / len(group), 3),
+            "p95_load_time_ms": round(_percentile(
+                [s["load_time_ms"] for s in group if s.get("load_time_ms") is not None], 0.95), 1),
+        }
+        for persona, group in sorted(by_persona.items())
+    }
+
+async def run_load_test(
+    pool: ContextPool,
+    run_iteration: IterationRunner,
+    personas: List[str],
+    concurrent_users: int,
+    duration: float,
+    ramp_up: float = 0.0,
+    bucket_seconds: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Drive ``concurrent_users`` virtual users for ``duration`` seconds.
+
+    User ``i`` starts at ``i * ramp_up / concurrent_users`` seconds and uses
+    persona ``personas[i % len(personas)]``. Iterations still running when the
+    duration ends are allowed to finish and are included in the results.
+    """
+    bucket_seconds = bucket_seconds or DEFAULT_BUCKET_SECONDS
+    # Keep the timeline readable for long tests
+    bucket_seconds = max(bucket_seconds, duration / MAX_BUCKETS)
+
+    samples: List[Dict[str, Any]] = []
+    user_spans: List[Tuple[float, float]] = []
+    start = time.monotonic()
+    persona_cycle = itertools.cycle(personas)
+
+    async def virtual_user(user_id: int, persona: str):
+        delay = user_id * ramp_up / concurrent_users if concurrent_users else 0.0
+        await asyncio.sleep(delay)
+        user_start = time.monotonic() - start
+        try:
+            while time.monotonic() - start < duration:
+                iteration_start = time.monotonic()
+                context = await pool.acquire()
+                try:
+                    outcome = await run_iteration(context, persona)
+                except Exception as e:
+                    outcome = {"success": False, "error": str(e)}
+                finally:
+                    await pool.release(context)
+                finished = time.monotonic()
+                samples.append({
+                    "user_id": user_id,
+                    "persona": persona,
+                    "started_at": iteration_start - start,
+                    "finished_at": finished - start,
+                    "duration_ms": (finished - iteration_start) * 1000,
+                    "load_time_ms": outcome.get("load_time_ms"),
+                    "success": bool(outcome.get("success")),
+                    "error": outcome.get("error"),
+                })
+        finally:
+            user_spans.append((user_start, time.monotonic() - start))
+
+    try:
+        await asyncio.gather(*(virtual_user(i, next(persona_cycle)) for i in range(concurrent_users)))
+    finally:
+        await pool.close()
+
+    elapsed = time.monotonic() - start
+    summary = summarize(samples, max(duration, elapsed), bucket_seconds, user_spans)
+    return {
+        "concurrent_users": concurrent_users,
+        "duration": duration,
+        "ramp_up": ramp_up,
+        "elapsed_seconds": round(elapsed, 3),
+        "bucket_seconds": round(bucket_seconds, 3),
+        **summary,
+        "personas": _per_persona(samples),
+    }
+
+__all__ = [
+    "ContextPool",
+    "run_load_test",
+    "summarize",
+]
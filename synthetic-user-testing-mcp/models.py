@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Data models for the Synthetic User Testing MCP Server.
+
+Kept free of browser and MCP imports so offline tools (re-scoring workers,
+exports) can load and validate sessions cheaply.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+class TaskResult(BaseModel):
+    success: bool
+    steps_taken: int
+    time_taken: float
+    steps_attempted: List[str]
+    error_message: Optional[str] = None
+
+class Feedback(BaseModel):
+    positives: List[str]
+    negatives: List[str]
+    overall_score: int  # 1-10
+    perspective: str
+    timestamp: datetime
+
+class JourneyStepResult(BaseModel):
+    step_index: int
+    task_description: str
+    success: bool
+    time_taken: float
+    steps_attempted: List[str]
+    url_after: Optional[str] = None
+    error_message: Optional[str] = None
+
+class Session(BaseModel):
+    session_id: str
+    url: str
+    task_description: Optional[str] = None
+    perspective: Optional[str] = None
+    task_result: Optional[TaskResult] = None
+    journey_steps: List[JourneyStepResult] = []
+    feedback: Optional[Feedback] = None
+    screenshots: List[str] = []
+    har_archive: Optional[str] = None
+    # Page snapshot the feedback was generated from, kept so sessions can be
+    # re-scored offline when the heuristics change
+    snapshot: Optional[Dict[str, Any]] = None
+    metric_scores: Dict[str, float] = {}
+    perspective_scores: Dict[str, int] = {}
+    rescored_at: Optional[datetime] = None
+    # Set when the page was unchanged and the scores of an earlier session were reused
+    reused_from: Optional[str] = None
+    # What changed since the previous visit, when change detection found a difference
+    changes: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+class PerformanceMetrics(BaseModel):
+    """Browser-reported timings for a single navigation (milliseconds unless noted)"""
+    ttfb: Optional[float] = None
+    fcp: Optional[float] = None
+    lcp: Optional[float] = None
+    cls: Optional[float] = None  # unitless layout shift score
+    tbt: Optional[float] = None
+    dom_content_loaded: Optional[float] = None
+    load_event: Optional[float] = None
+    request_count: int = 0
+    transfer_bytes: int = 0
+
+class Monitor(BaseModel):
+    """A recurring monitoring job run by the in-process scheduler"""
+    monitor_id: str
+    urls: List[str]
+    tasks: List[str] = []
+    perspectives: List[str] = ["new_user"]
+    interval: int  # seconds between runs
+    created_at: datetime
+    next_run_at: datetime
+    last_run_at: Optional[datetime] = None
+    runs: int = 0
+    # Runs skipped while the server was down, coalesced into a single catch-up run
+    missed_runs: int = 0
+    last_results: List[Dict[str, Any]] = []
+
+__all__ = [
+    "Feedback",
+    "JourneyStepResult",
+    "Monitor",
+    "PerformanceMetrics",
+    "Session",
+    "TaskResult",
+]
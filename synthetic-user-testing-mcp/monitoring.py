@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+In-process scheduler for recurring usability monitoring.
+
+A monitor re-runs feedback collection and task simulations for a set of URLs
+and perspectives on a fixed interval. The scheduler jitters start times so
+monitors created together do not fire in lockstep, spaces out requests to the
+same origin, and caps how many jobs run at once across all monitors. Monitors
+are persisted to ``monitors.json``; when the server restarts after being down,
+overdue monitors run once (not once per missed interval) and then continue on
+their normal schedule.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from models import Monitor
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# First and catch-up runs start up to this fraction of the interval late, so
+# monitors created or resumed together spread out
+JITTER_FRACTION = 0.1
+# Longest the scheduler sleeps before re-checking for due monitors
+MAX_IDLE_SECONDS = 60.0
+# Results kept per monitor from its latest run
+MAX_LAST_RESULTS = 50
+
+JobRunner = Callable[[str, Optional[str], str], Awaitable[Dict[str, Any]]]
+
+class OriginRateLimiter:
+    """Enforces a minimum delay between requests to the same origin"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_start: Dict[str, float] = {}
+
+    async def wait(self, url: str):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            delay = self._last_start.get(origin, 0.0) + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_start[origin] = time.monotonic()
+
+class MonitorScheduler:
+    """Runs monitors on their interval, sharing one concurrency budget"""
+
+    def __init__(
+        self,
+        path: Path,
+        run_job: JobRunner,
+        max_concurrency: int = 4,
+        origin_interval: float = 2.0,
+        min_interval: int = 60
+    ):
+        self.path = path
+        self.run_job = run_job
+        self.min_interval = min_interval
+        self.monitors: Dict[str, Monitor] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate_limiter = OriginRateLimiter(origin_interval)
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _jitter(self, interval: int) -> timedelta:
+        return timedelta(seconds=random.uniform(0, interval * JITTER_FRACTION))
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        data = [monitor.dict() for monitor in self.monitors.values()]
+        tmp_path.write_text(json.dumps(data, indent=2, default=str))
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        now = datetime.now()
+        for data in json.loads(self.path.read_text()):
+            monitor = Monitor.parse_obj(data)
+            if monitor.next_run_at < now:
+                # Coalesce everything missed while stopped into one catch-up run
+                overdue = (now - monitor.next_run_at).total_seconds()
+                missed = int(overdue // monitor.interval)
+                monitor.missed_runs += missed
+                monitor.next_run_at = now + self._jitter(monitor.interval)
+                if missed:
+                    tracer.increment("monitor.coalesced_runs", missed)
+                    logger.info(f"Monitor {monitor.monitor_id} missed {missed} runs; running once to catch up")
+            self.monitors[monitor.monitor_id] = monitor
+
+    @property
+    def started(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    async def start(self):
+        """Load persisted monitors and start the scheduling loop"""
+        if self.started:
+            return
+        self._load()
+        self._stopping = False
+        self._loop_task = asyncio.create_task(self._loop())
+        logger.info(f"Monitor scheduler started with {len(self.monitors)} monitors")
+
+    async def stop(self):
+        # Let the loop exit on its own; cancelling it mid wait_for can be lost
+        self._stopping = True
+        self._wakeup.set()
+        runs = list(self._running.values())
+        for task in runs:
+            task.cancel()
+        await asyncio.gather(*runs, return_exceptions=True)
+        if self._loop_task is not None:
+            await self._loop_task
+            self._loop_task = None
+        self._running.clear()
+
+    def schedule(
+        self,
+        urls: List[str],
+        tasks: Optional[List[str]],
+        perspectives: Optional[List[str]],
+        interval: int
+    ) -> Monitor:
+        if not urls:
+            raise ValueError("At least one URL is required")
+        if interval < self.min_interval:
+            raise ValueError(f"Interval must be at least {self.min_interval} seconds")
+
+        now = datetime.now()
+        monitor = Monitor(
+            monitor_id=str(uuid.uuid4()),
+            urls=urls,
+            tasks=tasks or [],
+            perspectives=perspectives or ["new_user"],
+            interval=interval,
+            created_at=now,
+            next_run_at=now + self._jitter(interval)
+        )
+        self.monitors[monitor.monitor_id] = monitor
+        self._save()
+        self._wakeup.set()
+        return monitor
+
+    def cancel(self, monitor_id: str) -> bool:
+        monitor = self.monitors.pop(monitor_id, None)
+        if monitor is None:
+            return False
+        running = self._running.pop(monitor_id, None)
+        if running is not None:
+            running.cancel()
+        self._save()
+        self._wakeup.set()
+        return True
+
+    def describe(self, monitor: Monitor) -> Dict[str, Any]:
+        jobs = len(monitor.urls) * max(len(monitor.tasks), 1) * len(monitor.perspectives)
+        return {
+            **monitor.dict(exclude={"last_results"}),
+            "jobs_per_run": jobs,
+            "running": monitor.monitor_id in self._running,
+            "last_results": monitor.last_results,
+        }
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [self.describe(monitor)
+                for monitor in sorted(self.monitors.values(), key=lambda m: m.next_run_at)]
+
+    async def _loop(self):
+        while not self._stopping:
+            now = datetime.now()
+            for monitor in list(self.monitors.values()):
+                if monitor.next_run_at <= now and monitor.monitor_id not in self._running:
+                    self._running[monitor.monitor_id] = asyncio.create_task(self._run(monitor))
+
+            waiting = [monitor.next_run_at for monitor in self.monitors.values()
+                       if monitor.monitor_id not in self._running]
+            timeout = MAX_IDLE_SECONDS
+            if waiting:
+                timeout = min(timeout, max(0.0, (min(waiting) - datetime.now()).total_seconds()))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_job(self, url: str, task: Optional[str], perspective: str) -> Dict[str, Any]:
+        async with self._semaphore:
+            await self._rate_limiter.wait(url)
+            try:
+                result = await self.run_job(url, task, perspective)
+            except Exception as e:
+                logger.error(f"Monitor job failed for {url}: {e}")
+                result = {"error": str(e)}
+        summary = {
+            "url": url,
+            "task": task,
+            "perspective": perspective,
+            "session_id": result.get("session_id"),
+        }
+        if "error" in result:
+            summary["error"] = result["error"]
+        elif task:
+            summary["success"] = result.get("success")
+        else:
+            summary["overall_score"] = result.get("overall_score")
+            summary["change"] = result.get("change")
+        return summary
+
+    async def _run(self, monitor: Monitor):
+        scheduled_at = monitor.next_run_at
+        try:
+            with tracer.span("monitor.run"):
+                jobs = itertools.product(monitor.urls, monitor.tasks or [None], monitor.perspectives)
+                results = await asyncio.gather(*(self._run_job(*job) for job in jobs))
+
+            now = datetime.now()
+            monitor.runs += 1
+            monitor.last_run_at = now
+            monitor.last_results = results[:MAX_LAST_RESULTS]
+            # Keep the (already jittered) cadence, skipping slots that passed
+            # while the run was going rather than queueing them up
+            next_run = scheduled_at + timedelta(seconds=monitor.interval)
+            while next_run <= now:
+                next_run += timedelta(seconds=monitor.interval)
+            monitor.next_run_at = next_run
+            tracer.increment("monitor.runs")
+            if monitor.monitor_id in self.monitors:
+                self._save()
+        finally:
+            self._running.pop(monitor.monitor_id, None)
+            self._wakeup.set()
+
+__all__ = [
+    "MonitorScheduler",
+    "OriginRateLimiter",
+]
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo persona outcome simulation.
+
+One real ``simulate_task`` or ``simulate_journey`` run gives a trace of steps,
+how easily each step's target was found and how long it took. This module
+replays that trace for thousands of synthetic users per persona, using the
+``success_rate``, ``average_time_multiplier`` and ``confusion_probability`` of
+each ``config.UserPersona``, to estimate a success probability with a
+confidence interval, time-to-complete percentiles and where users drop off.
+
+Per user and step the model is:
+    confused   ~ Bernoulli(confusion_probability + (1 - confusion_probability) * (1 - findability))
+    recovered  ~ Bernoulli(success_rate)            (only when confused)
+    step time  ~ LogNormal(base_time * average_time_multiplier, TIME_SIGMA)
+                 plus a detour of DETOUR_FACTOR * step time when confused
+and a user who is confused and does not recover drops off at that step.
+
+Sampling is vectorized over all users with NumPy when it is installed and
+falls back to a plain Python loop otherwise. Both backends are seedable, but
+they draw different streams, so results only reproduce on the same backend.
+"""
+
+import hashlib
+import math
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import USER_PERSONAS, UserPersona
+from lazy import optional_import
+
+DEFAULT_USERS = 5000
+MAX_USERS = 200_000
+TIME_SIGMA = 0.35
+DETOUR_FACTOR = 1.0
+CONFIDENCE_Z = 1.96  # 95% interval
+TIME_PERCENTILES = (50, 75, 90, 95, 99)
+
+# How easily a step's target was found, judged from the recorded step text
+HARD_STEP_MARKERS = ("could not", "failed", "error", "no clear", "not find", "no obvious")
+DETOUR_STEP_MARKERS = ("tried", "looking", "try ", "fallback")
+FINDABILITY_FOUND = 0.95
+FINDABILITY_DETOUR = 0.6
+FINDABILITY_HARD = 0.2
+
+def step_findability(step: str) -> float:
+    """Estimate 0-1 findability of a recorded step from its description"""
+    text = step.lower()
+    if any(marker in text for marker in HARD_STEP_MARKERS):
+        return FINDABILITY_HARD
+    if any(marker in text for marker in DETOUR_STEP_MARKERS):
+        return FINDABILITY_DETOUR
+    return FINDABILITY_FOUND
+
+def trace_from_session(session: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Build a step trace from a stored session dictionary.
+
+    Journey sessions use their per-step timings; single-task sessions split the
+    measured task time evenly across the recorded steps.
+    """
+    journey_steps = session.get("journey_steps") or []
+    if journey_steps:
+        return [{
+            "name": step["task_description"],
+            "time": max(step["time_taken"], 0.001),
+            "findability": (
+                min(step_findability(detail) for detail in step["steps_attempted"])
+                if step["steps_attempted"] else FINDABILITY_FOUND
+            ) if step["success"] else FINDABILITY_HARD,
+        } for step in journey_steps]
+
+    task_result = session.get("task_result")
+    if not task_result or not task_result.get("steps_attempted"):
+        return []
+    steps = task_result["steps_attempted"]
+    step_time = max(task_result["time_taken"], 0.001) / len(steps)
+    return [{"name": step, "time": step_time, "findability": step_findability(step)} for step in steps]
+
+def wilson_interval(successes: int, trials: int, z: float = CONFIDENCE_Z) -> Dict[str, float]:
+    """Wilson score interval for a binomial proportion"""
+    if trials == 0:
+        return {"low": 0.0, "high": 0.0}
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return {"low": round(max(0.0, centre - margin), 4), "high": round(min(1.0, centre + margin), 4)}
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    # Linear interpolation, matching numpy.percentile's default
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def persona_seed(seed: int, persona: str) -> int:
+    """A persona's own seed, derived from the run's ``seed`` and the persona's name"""
+    digest = hashlib.sha256(f"{seed}:{persona}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def _sample_numpy(persona: UserPersona, base_times, findability, users: int, seed: Optional[int]):
+    np = optional_import("numpy")
+    rng = np.random.default_rng(seed)
+    base_times = np.asarray(base_times, dtype=float)
+    findability = np.asarray(findability, dtype=float)
+    step_count = len(base_times)
+
+    confusion = persona.confusion_probability + (1 - persona.confusion_probability) * (1 - findability)
+    confused = rng.random((users, step_count)) < confusion
+    recovered = rng.random((users, step_count)) < persona.success_rate
+    dropped = confused & ~recovered
+
+    # Log-normal step times whose mean is base_time * multiplier
+    means = base_times * persona.average_time_multiplier
+    mu = np.log(means) - TIME_SIGMA ** 2 / 2
+    times = rng.lognormal(mu, TIME_SIGMA, size=(users, step_count))
+    times = times * (1 + DETOUR_FACTOR * confused)
+
+    # First step each user dropped at, or step_count when they finished
+    any_drop = dropped.any(axis=1)
+    drop_step = np.where(any_drop, dropped.argmax(axis=1), step_count)
+    # Time only accrues for steps the user actually reached
+    reached = np.arange(step_count)[None, :] <= drop_step[:, None]
+    elapsed = (times * reached).sum(axis=1)
+
+    return (~any_drop).tolist(), drop_step.tolist(), elapsed.tolist()
+
+def _sample_python(persona: UserPersona, base_times, findability, users: int, seed: Optional[int]):
+    rng = random.Random(seed)
+    step_count = len(base_times)
+    confusion = [persona.confusion_probability + (1 - persona.confusion_probability) * (1 - f)
+                 for f in findability]
+    mus = [math.log(base * persona.average_time_multiplier) - TIME_SIGMA ** 2 / 2 for base in base_times]
+
+    completed, drop_steps, elapsed = [], [], []
+    for _ in range(users):
+        total = 0.0
+        drop_step = step_count
+        for step in range(step_count):
+            confused = rng.random() < confusion[step]
+            step_time = rng.lognormvariate(mus[step], TIME_SIGMA)
+            total += step_time * (1 + DETOUR_FACTOR * confused)
+            if confused and rng.random() >= persona.success_rate:
+                drop_step = step
+                break
+        completed.append(drop_step == step_count)
+        drop_steps.append(drop_step)
+        elapsed.append(total)
+    return completed, drop_steps, elapsed
+
+def simulate_persona(
+    trace: List[Dict[str, Any]],
+    persona: UserPersona,
+    users: int = DEFAULT_USERS,
+    seed: Optional[int] = None,
+    trace_time_multiplier: float = 1.0
+) -> Dict[str, Any]:
+    """
+    Simulate ``users`` synthetic users of one persona through a step trace.
+
+    ``trace_time_multiplier`` is the time multiplier of the persona that
+    recorded the trace, so its timings are normalized before rescaling.
+    """
+    base_times = [step["time"] / trace_time_multiplier for step in trace]
+    findability = [step["findability"] for step in trace]
+    # NumPy is optional, and imported on first use to keep startup fast
+    sampler = _sample_numpy if optional_import("numpy") is not None else _sample_python
+    completed, drop_steps, elapsed = sampler(persona, base_times, findability, users, seed)
+
+    successes = sum(completed)
+    completion_ms = sorted(seconds * 1000 for seconds, done in zip(elapsed, completed) if done)
+
+    drop_off = []
+    reached = users
+    for index, step in enumerate(trace):
+        drop_times = sorted(seconds * 1000 for seconds, drop_step in zip(elapsed, drop_steps)
+                            if drop_step == index)
+        dropped = len(drop_times)
+        drop_off.append({
+            "step_index": index,
+            "step": step["name"],
+            "findability": step["findability"],
+            "reached": reached,
+            "dropped": dropped,
+            "drop_rate": round(dropped / reached, 4) if reached else 0.0,
+            "median_time_at_drop_ms": round(_percentile(drop_times, 50), 1),
+        })
+        reached -= dropped
+
+    return {
+        "persona": persona.name,
+        "users": users,
+        "success_probability": round(successes / users, 4) if users else 0.0,
+        "confidence_interval": wilson_interval(successes, users),
+        "time_to_complete_ms": {
+            f"p{q}": round(_percentile(completion_ms, q), 1) for q in TIME_PERCENTILES
+        },
+        "drop_off": drop_off,
+    }
+
+def simulate_population(
+    trace: List[Dict[str, Any]],
+    personas: Optional[Sequence[str]] = None,
+    users: int = DEFAULT_USERS,
+    seed: Optional[int] = None,
+    trace_perspective: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run ``simulate_persona`` for each persona.
+
+    Each persona is seeded from ``seed`` and its name, so its numbers do not
+    depend on which other personas are simulated alongside it.
+    """
+    personas = list(personas or USER_PERSONAS)
+    unknown = [name for name in personas if name not in USER_PERSONAS]
+    if unknown:
+        raise ValueError(f"Unknown personas: {', '.join(unknown)}")
+    if not trace:
+        raise ValueError("Trace has no steps to simulate")
+    users = max(1, min(int(users), MAX_USERS))
+
+    trace_persona = USER_PERSONAS.get(trace_perspective or "")
+    trace_multiplier = trace_persona.average_time_multiplier if trace_persona else 1.0
+
+    results = {}
+    for name in personas:
+        results[name] = simulate_persona(
+            trace, USER_PERSONAS[name], users,
+            None if seed is None else persona_seed(seed, name), trace_multiplier
+        )
+
+    return {
+        "users_per_persona": users,
+        "seed": seed,
+        "backend": "numpy" if optional_import("numpy") is not None else "python",
+        "steps": len(trace),
+        "personas": results,
+    }
+
+__all__ = [
+    "DEFAULT_USERS",
+    "persona_seed",
+    "simulate_persona",
+    "simulate_population",
+    "step_findability",
+    "trace_from_session",
+    "wilson_interval",
+]
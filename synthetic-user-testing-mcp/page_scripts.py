@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+In-page helper library.
+
+All JavaScript the server runs inside pages lives here, as one library that
+is installed into every browser context with ``add_init_script``. It defines
+``window.__sut`` in each page before the page's own scripts run, and Python
+calls its functions by name with small arguments (``call(page, "snapshot")``)
+instead of sending a script source with every ``page.evaluate``:
+
+- ``snapshot()`` - title, main text, navigation links, forms, footer text and
+  accessibility/mobile signals, in one round trip
+- ``performance()`` - Navigation Timing, Paint Timing and Web Vitals
+- ``firstMatch(selectors)`` - the first selector with a visible match
+- ``findByText(selector, keywords, limit)`` - the first element whose text
+  contains one of the keywords
+- ``count(selector)`` - how many elements match
+- ``findLink(url)`` - the first visible link to ``url`` (ignoring fragments)
+- ``checkOutcome(signals, scope)`` - the first success or error signal in the
+  page's (or the ``scope`` element's) visible text and elements
+- ``armOutcome(signals)``/``awaitOutcome(timeout, id)`` - watch DOM mutations
+  and URL changes after an action and resolve on the first signal in content
+  that appeared since (see ``observe_outcome``)
+
+Selectors may use Playwright's ``:has-text("...")`` suffix, which the library
+resolves itself. Pages opened in a context the library was not installed in
+get it injected on first call.
+"""
+
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page
+
+# Bump whenever the library changes, so a stale copy is replaced
+PAGE_LIBRARY_VERSION = 4
+
+PAGE_LIBRARY_SCRIPT = """
+(() => {
+    if (window.__sut && window.__sut.version === %(version)d) return;
+
+    // Observe from the start so buffered-less entries (long tasks) and
+    // late-arriving entries (LCP, layout shifts) are not missed
+    const perf = { lcp: null, cls: 0, longTasks: [] };
+    try { performance.setResourceTimingBufferSize(1000); } catch (e) {}
+    const observe = (type, callback) => {
+        try {
+            new PerformanceObserver(list => list.getEntries().forEach(callback))
+                .observe({ type, buffered: true });
+        } catch (e) {}
+    };
+    observe('largest-contentful-paint', entry => { perf.lcp = entry.startTime; });
+    observe('layout-shift', entry => { if (!entry.hadRecentInput) perf.cls += entry.value; });
+    observe('longtask', entry => { perf.longTasks.push([entry.startTime, entry.duration]); });
+
+    const HAS_TEXT = /^(.*?):has-text\\((["'])(.*)\\2\\)$/;
+    const queryAll = (selector, root = document) => {
+        const match = HAS_TEXT.exec(selector.trim());
+        try {
+            if (!match) return Array.from(root.querySelectorAll(selector));
+            const text = match[3].toLowerCase();
+            return Array.from(root.querySelectorAll(match[1] || '*'))
+                .filter(el => (el.textContent || '').toLowerCase().includes(text));
+        } catch (e) {
+            return [];
+        }
+    };
+    const isVisible = el => {
+        if (!el.getClientRects().length) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    const textOf = el => (el.innerText || el.textContent || '').trim();
+    // innerText of a hidden element falls back to its raw text, so check first
+    const visibleText = el => el && el.isConnected && isVisible(el) ? el.innerText.toLowerCase() : '';
+    // Error signals win over success signals
+    const findSignal = (signals, texts, isNew, root = document) => {
+        for (const kind of ['error', 'success']) {
+            for (const word of signals[kind + '_text'] || []) {
+                if (texts.some(text => text.includes(word.toLowerCase()))) return { status: kind, signal: word };
+            }
+            for (const selector of signals[kind + '_selectors'] || []) {
+                if (queryAll(selector, root).some(el => isVisible(el) && isNew(el))) return { status: kind, signal: selector };
+            }
+        }
+        return null;
+    };
+    let watch = null;
+    let armed = 0;
+    const fieldsOf = root => Array.from(root.querySelectorAll('input:not([type="hidden"]), select, textarea'));
+
+    const pageSignals = () => {
+        const images = Array.from(document.images);
+        const inputs = fieldsOf(document);
+        const isLabelled = el => (el.labels && el.labels.length > 0)
+            || el.getAttribute('aria-label') || el.getAttribute('aria-labelledby') || el.getAttribute('title');
+        return {
+            html_lang: document.documentElement.lang || null,
+            has_viewport_meta: !!document.querySelector('meta[name="viewport"]'),
+            horizontal_overflow: document.documentElement.scrollWidth > window.innerWidth,
+            images: images.length,
+            images_missing_alt: images.filter(img => !img.hasAttribute('alt')).length,
+            form_inputs: inputs.length,
+            unlabeled_inputs: inputs.filter(el => !isLabelled(el)).length,
+        };
+    };
+
+    window.__sut = {
+        version: %(version)d,
+
+        snapshot() {
+            const content = document.querySelector('main') || document.body;
+            const footer = document.querySelector('footer');
+            return {
+                title: document.title,
+                main_text: content ? content.innerText.slice(0, 1000) : '',
+                nav_links: Array.from(document.querySelectorAll('nav a, .nav a, .navigation a, header a'))
+                    .map(a => ({ text: a.textContent?.trim(), href: a.href || null }))
+                    .filter(link => link.text)
+                    .slice(0, 10),
+                forms: Array.from(document.forms).map(form => ({
+                    action: form.action,
+                    method: (form.getAttribute('method') || 'get').toLowerCase(),
+                    fields: fieldsOf(form).map(el => ({
+                        type: el.tagName === 'INPUT' ? (el.getAttribute('type') || 'text').toLowerCase() : el.tagName.toLowerCase(),
+                        name: el.getAttribute('name'),
+                        placeholder: el.getAttribute('placeholder'),
+                    })),
+                })),
+                footer_text: footer ? footer.innerText.replace(/\\s+/g, ' ').trim().slice(0, 1000) : '',
+                signals: pageSignals(),
+            };
+        },
+
+        performance() {
+            const nav = performance.getEntriesByType('navigation')[0];
+            const fcpEntry = performance.getEntriesByName('first-contentful-paint')[0];
+            const fcp = fcpEntry ? fcpEntry.startTime : null;
+            const tbt = perf.longTasks
+                .filter(([start]) => fcp === null || start >= fcp)
+                .reduce((total, [, duration]) => total + Math.max(0, duration - 50), 0);
+            const resources = performance.getEntriesByType('resource');
+            const transfer = resources.reduce((total, r) => total + (r.transferSize || 0), 0);
+            return {
+                ttfb: nav ? nav.responseStart : null,
+                fcp: fcp,
+                lcp: perf.lcp,
+                cls: perf.cls,
+                tbt: tbt,
+                dom_content_loaded: nav ? nav.domContentLoadedEventEnd : null,
+                load_event: nav && nav.loadEventEnd > 0 ? nav.loadEventEnd : null,
+                transfer_bytes: Math.round(transfer + (nav ? nav.transferSize || 0 : 0)),
+            };
+        },
+
+        firstMatch(selectors) {
+            for (let index = 0; index < selectors.length; index++) {
+                if (queryAll(selectors[index]).some(isVisible)) {
+                    return { index, selector: selectors[index] };
+                }
+            }
+            return null;
+        },
+
+        findByText(selector, keywords, limit) {
+            const elements = queryAll(selector).slice(0, limit);
+            for (let index = 0; index < elements.length; index++) {
+                const text = textOf(elements[index]);
+                const lower = text.toLowerCase();
+                if (keywords.some(keyword => lower.includes(keyword))) {
+                    return { index, text };
+                }
+            }
+            return null;
+        },
+
+        count(selector) {
+            return queryAll(selector).length;
+        },
+
+        findLink(url) {
+            // Indexes count every link, to match page.locator('a').nth(index)
+            const links = queryAll('a');
+            for (let index = 0; index < links.length; index++) {
+                const link = links[index];
+                if (link.href && link.href.split('#')[0] === url && isVisible(link)) {
+                    return { index, text: textOf(link) };
+                }
+            }
+            return null;
+        },
+
+        checkOutcome(signals, scope) {
+            const root = scope ? document.querySelector(scope) : document.body;
+            return root ? findSignal(signals, [visibleText(root)], () => true, root) : null;
+        },
+
+        armOutcome(signals) {
+            if (watch) watch.stop();
+            // Signals already on screen before the action do not count
+            const baseline = new Set();
+            for (const kind of ['error', 'success']) {
+                for (const selector of signals[kind + '_selectors'] || []) {
+                    queryAll(selector).filter(isVisible).forEach(el => baseline.add(el));
+                }
+            }
+            // Unique across documents, so a watch from before a navigation is never mistaken for this one
+            const state = {
+                id: `${performance.timeOrigin}:${++armed}`,
+                url: location.href, started: performance.now(), verdict: null, waiters: [],
+            };
+            const settle = found => {
+                if (state.verdict) return;
+                state.verdict = {
+                    ...found,
+                    url_changed: location.href !== state.url,
+                    elapsed_ms: Math.round(performance.now() - state.started),
+                };
+                state.stop();
+                state.waiters.forEach(resolve => resolve(state.verdict));
+            };
+            const observer = new MutationObserver(records => {
+                const texts = [];
+                for (const record of records) {
+                    if (record.type === 'childList') {
+                        record.addedNodes.forEach(node => {
+                            if (node.nodeType === Node.ELEMENT_NODE) {
+                                texts.push(visibleText(node));
+                            } else if (node.nodeType === Node.TEXT_NODE && node.parentElement && isVisible(node.parentElement)) {
+                                texts.push(node.data.toLowerCase());
+                            }
+                        });
+                    } else if (record.type === 'characterData') {
+                        const parent = record.target.parentElement;
+                        if (parent && isVisible(parent)) texts.push(record.target.data.toLowerCase());
+                    } else {
+                        // Revealed by a class, style or hidden change
+                        texts.push(visibleText(record.target));
+                    }
+                }
+                // A client-side route change replaces the whole view
+                if (location.href !== state.url) texts.push(visibleText(document.body));
+                const found = findSignal(signals, texts, el => !baseline.has(el));
+                if (found) settle(found);
+            });
+            observer.observe(document.documentElement, {
+                childList: true, subtree: true, characterData: true,
+                attributes: true, attributeFilter: ['class', 'style', 'hidden', 'aria-hidden', 'open'],
+            });
+            state.settle = settle;
+            // The verdict stays on the state until the next armOutcome
+            state.stop = () => { observer.disconnect(); clearTimeout(state.timer); };
+            watch = state;
+            return state.id;
+        },
+
+        awaitOutcome(timeout, id) {
+            // null when the armed document is gone (it was navigated away from)
+            if (!watch || watch.id !== id) return null;
+            const state = watch;
+            // Settled before anyone waited, e.g. by a synchronous click handler
+            if (state.verdict) return state.verdict;
+            return new Promise(resolve => {
+                state.waiters.push(resolve);
+                clearTimeout(state.timer);
+                state.timer = setTimeout(() => state.settle({ status: 'timeout', signal: null }), timeout);
+            });
+        },
+    };
+})();
+""" % {"version": PAGE_LIBRARY_VERSION}
+
+# The only source sent per call; the result is boxed so a missing library
+# (None) can be told apart from a function returning null
+_CALL = "([name, args]) => window.__sut ? { value: window.__sut[name](...args) } : null"
+_POLL = "([name, args]) => window.__sut && window.__sut[name](...args)"
+# Unboxed, as Playwright only awaits a promise returned at the top level
+_AWAIT_OUTCOME = "([timeout, id]) => window.__sut ? window.__sut.awaitOutcome(timeout, id) : null"
+
+async def install(context: "BrowserContext"):
+    """Install the library into every page and frame ``context`` opens from now on"""
+    await context.add_init_script(PAGE_LIBRARY_SCRIPT)
+
+async def call(page: "Page", name: str, *args: Any) -> Any:
+    """Call a library function in ``page`` and return its (JSON) result"""
+    boxed = await page.evaluate(_CALL, [name, list(args)])
+    if boxed is None:
+        # Opened outside a context from install()
+        await page.evaluate(PAGE_LIBRARY_SCRIPT)
+        boxed = await page.evaluate(_CALL, [name, list(args)])
+    return boxed["value"]
+
+async def wait_for(page: "Page", name: str, *args: Any, timeout: float = 2000) -> Optional[Any]:
+    """
+    Poll a library function until it returns something truthy.
+
+    Returns:
+        The function's result, or None when ``timeout`` milliseconds pass first
+    """
+    value = await call(page, name, *args)
+    if value:
+        return value
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    try:
+        handle = await page.wait_for_function(_POLL, arg=[name, list(args)], timeout=timeout)
+    except PlaywrightTimeoutError:
+        return None
+    return await handle.json_value()
+
+async def observe_outcome(
+    page: "Page",
+    signals: Dict[str, Any],
+    action: Callable[[], Awaitable[Any]],
+    timeout: float = 3000
+) -> Dict[str, Any]:
+    """
+    Run ``action`` and wait for the first success or error signal it brings up.
+
+    ``signals`` holds ``success_text``/``error_text`` (words looked for in
+    visible text) and ``success_selectors``/``error_selectors``. Only content
+    that appears after the action counts, in the same document or in the
+    one a navigation lands on, and the wait ends as soon as a signal shows.
+
+    Returns:
+        A verdict: "status" ("success", "error" or "timeout"), the "signal"
+        that matched, "url_changed" and "elapsed_ms"
+    """
+    from playwright.async_api import Error as PlaywrightError
+    start_url = page.url
+    started = time.monotonic()
+
+    def remaining() -> float:
+        return max(0.0, timeout - (time.monotonic() - started) * 1000)
+
+    armed = await call(page, "armOutcome", signals)
+    await action()
+    verdict = None
+    while verdict is None:
+        try:
+            verdict = await page.evaluate(_AWAIT_OUTCOME, [remaining(), armed])
+            if verdict is None:
+                # The armed document was replaced, so everything in this one is new
+                await page.wait_for_load_state("domcontentloaded", timeout=remaining() or 1)
+                verdict = await call(page, "checkOutcome", signals, None)
+                if verdict is None:
+                    armed = await call(page, "armOutcome", signals)
+        except PlaywrightError:
+            # The document was replaced mid-call; look at the new one
+            verdict = None
+        if verdict is None and not remaining():
+            verdict = {"status": "timeout", "signal": None}
+    verdict["url_changed"] = page.url != start_url
+    verdict["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+    return verdict
+
+__all__ = [
+    "PAGE_LIBRARY_SCRIPT",
+    "PAGE_LIBRARY_VERSION",
+    "call",
+    "install",
+    "observe_outcome",
+    "wait_for",
+]
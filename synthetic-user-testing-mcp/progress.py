@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Progress notifications and partial results for long-running tools.
+
+A client that sends a progress token with a tool call gets an MCP progress
+notification each time a unit of work finishes (a URL analyzed, a task step
+taken, a report chunk rendered). The notification's message says what
+finished, and its ``_meta`` carries the unit's partial result under
+``partial_result``: the tool name and the result itself. Clients can act on
+early results, and cancel the call once they have seen enough.
+
+Reports posted from synchronous code (``post``, used by ``StepLog``) are
+throttled: at most one goes out per ``MIN_POST_INTERVAL`` seconds, carrying
+the latest of the reports posted in the meantime. Awaited reports are sent
+one per unit of work.
+
+Calls made without a progress token, or outside an MCP request (scripts,
+benchmarks, the scheduler), report nothing.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, List, Optional, Tuple
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Key of the partial result in a progress notification's _meta
+PARTIAL_RESULT_KEY = "partial_result"
+
+# Shortest gap between two posted (not awaited) progress notifications
+MIN_POST_INTERVAL = 0.25
+
+def _progress_target() -> Tuple[Any, Any]:
+    """The current request's FastMCP context and progress token, if its client asked for progress"""
+    try:
+        from fastmcp.server.dependencies import get_context
+        context = get_context()
+    except (ImportError, RuntimeError):
+        return None, None
+    try:
+        meta = context.request_context.meta or {}
+    except Exception:
+        # No session yet (e.g. the in-memory transport before initialization)
+        return None, None
+    token = meta.get("progressToken")
+    return (context, token) if token is not None else (None, None)
+
+class ProgressReporter:
+    """Reports one tool call's progress and partial results to its client"""
+
+    def __init__(self, tool: str, total: Optional[float] = None, min_post_interval: float = MIN_POST_INTERVAL):
+        self.tool = tool
+        self.total = total
+        self.progress = 0.0
+        self.min_post_interval = min_post_interval
+        self._context, self._token = _progress_target()
+        # Latest report posted from synchronous code, sent by one task once
+        # the throttle allows; newer posts replace it
+        self._pending: Optional[Tuple[float, str, Any]] = None
+        self._sender: Optional[asyncio.Task] = None
+        self._closing = asyncio.Event()
+        self._last_sent = float("-inf")
+
+    @property
+    def active(self) -> bool:
+        return self._context is not None
+
+    async def advance(self, message: str, result: Any = None, amount: float = 1):
+        """Count ``amount`` units of work as done and report them"""
+        self.progress += amount
+        await self._send_now(self.progress, message, result)
+
+    async def advance_to(self, progress: float, message: str, result: Any = None):
+        """Report ``progress`` units of work as done"""
+        self.progress = progress
+        await self._send_now(self.progress, message, result)
+
+    def post(self, message: str, result: Any = None, amount: float = 1):
+        """
+        Like ``advance``, but without waiting, for code that cannot await.
+
+        Posts are throttled to one notification per ``min_post_interval``;
+        one posted while another is waiting replaces it.
+        """
+        self.progress += amount
+        if self._context is None:
+            return
+        self._pending = (self.progress, message, result)
+        if self._sender is None or self._sender.done():
+            self._sender = asyncio.get_running_loop().create_task(self._send_pending())
+
+    async def close(self):
+        """Send the last ``post``ed report without waiting out the throttle"""
+        if self._sender is None:
+            return
+        self._closing.set()
+        try:
+            await self._sender
+        finally:
+            self._sender = None
+
+    async def _send_now(self, progress: float, message: str, result: Any):
+        # A report posted earlier goes first, so progress never goes backwards
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            await self._send(*pending)
+        await self._send(progress, message, result)
+
+    async def _send_pending(self):
+        while self._pending is not None:
+            wait = self._last_sent + self.min_post_interval - time.monotonic()
+            if wait > 0 and not self._closing.is_set():
+                try:
+                    await asyncio.wait_for(self._closing.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+            if self._pending is None:
+                # Sent by an awaited report in the meantime
+                break
+            pending, self._pending = self._pending, None
+            await self._send(*pending)
+
+    async def _send(self, progress: float, message: str, result: Any):
+        if self._context is None:
+            return
+        try:
+            from mcp import types
+            meta = None
+            if result is not None:
+                meta = {PARTIAL_RESULT_KEY: {
+                    "tool": self.tool,
+                    "result": json.loads(json.dumps(result, default=str)),
+                }}
+            await self._context.session.send_notification(
+                types.ProgressNotification(params=types.ProgressNotificationParams(
+                    progress_token=self._token,
+                    progress=progress,
+                    total=self.total,
+                    message=message,
+                    meta=meta
+                )),
+                self._context.request_id
+            )
+        except Exception as e:
+            # A client that went away must not fail the call itself
+            logger.debug(f"Could not send progress for {self.tool}: {e}")
+            return
+        self._last_sent = time.monotonic()
+        tracer.increment(f"progress.{self.tool}")
+
+class StepLog(list):
+    """A list of step descriptions that reports each step as it is added"""
+
+    def __init__(self, reporter: ProgressReporter, steps: Optional[List[str]] = None):
+        super().__init__()
+        self.reporter = reporter
+        self.extend(steps or [])
+
+    def append(self, step: str):
+        super().append(step)
+        self.reporter.post(step, {"step": len(self), "description": step})
+
+    def extend(self, steps):
+        for step in steps:
+            self.append(step)
+
+__all__ = [
+    "MIN_POST_INTERVAL",
+    "PARTIAL_RESULT_KEY",
+    "ProgressReporter",
+    "StepLog",
+]
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Catalog of generated usability reports.
+
+``generate_report`` records each report's metadata (format, session count,
+the time range its sessions cover, size and summary statistics) when it
+writes the report, appending one line to ``reports/index.jsonl``. Listing
+reports then reads the in-memory index instead of stat-ing every file on
+disk, and pages through it newest first with an opaque cursor. The cursor,
+the time range and the format filter are bisects into sorted lists; only the
+URL prefix filter is checked entry by entry.
+
+Removed reports are appended to the index as tombstone lines. Once they
+outnumber half the live entries (and at least ``COMPACT_MIN_TOMBSTONES``),
+the index is rewritten with only the live entries.
+
+Reports written before the catalog existed are indexed once, the first time
+the catalog is used without an index file. Entries keep the report's plain
+filename; a report the retention collector compressed is found and read
+through ``path_for``/``read`` all the same. The index is read on first use
+rather than when the catalog is created, so server startup does not touch
+the reports directory.
+"""
+
+import bisect
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from cold_storage import existing_path, plain_path, read_bytes, remove_variants
+from models import Session
+
+logger = logging.getLogger(__name__)
+
+# File extension per report format
+REPORT_FORMATS = {"markdown": "md", "json": "json"}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# URLs kept per catalog entry, for filtering by URL prefix
+MAX_ENTRY_URLS = 50
+
+INDEX_NAME = "index.jsonl"
+# Fewest tombstones worth rewriting the index for
+COMPACT_MIN_TOMBSTONES = 64
+
+def report_summary(sessions: List[Session]) -> Dict[str, Any]:
+    """Task success and satisfaction statistics over ``sessions``"""
+    successful_tasks = sum(1 for s in sessions if s.task_result and s.task_result.success)
+    total_tasks = sum(1 for s in sessions if s.task_result)
+    scores = [s.feedback.overall_score for s in sessions if s.feedback]
+    return {
+        "task_success_rate": (successful_tasks / total_tasks * 100) if total_tasks > 0 else 0,
+        "average_satisfaction_score": sum(scores) / len(scores) if scores else 0,
+        "total_tasks_attempted": total_tasks,
+        "successful_tasks": successful_tasks
+    }
+
+class ReportCatalog:
+    """Append-only index of report metadata, paged newest first"""
+
+    def __init__(self, reports_dir: Path):
+        self.reports_dir = reports_dir
+        self.index_path = reports_dir / INDEX_NAME
+        # Live entries in creation order, with their seqs and creation times
+        self._entries: List[Dict[str, Any]] = []
+        self._seqs: List[int] = []
+        self._created: List[str] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_seq: Dict[int, Dict[str, Any]] = {}
+        # Sorted seqs of the live entries in each format
+        self._format_seqs: Dict[str, List[int]] = {}
+        self._tombstones = 0
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.index_path.exists():
+            self._load()
+        elif self.reports_dir.is_dir():
+            self._rebuild()
+
+    def _track(self, entry: Dict[str, Any]):
+        self._entries.append(entry)
+        self._seqs.append(entry["seq"])
+        self._created.append(entry["created_at"])
+        self._by_id[entry["report_id"]] = entry
+        self._by_seq[entry["seq"]] = entry
+        self._format_seqs.setdefault(entry["format"], []).append(entry["seq"])
+
+    def _load(self):
+        removed = set()
+        entries = []
+        with open(self.index_path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if "removed" in entry:
+                        removed.add(entry["removed"])
+                    else:
+                        entries.append(entry)
+        for entry in entries:
+            if entry["report_id"] not in removed:
+                self._track(entry)
+        # Entry lines of removed reports, each with its tombstone line
+        self._tombstones = len(entries) - len(self._entries)
+        self._compact_if_needed()
+
+    def _write_index(self, entries: List[Dict[str, Any]]):
+        tmp_path = self.index_path.with_name(f".{INDEX_NAME}.tmp")
+        with open(tmp_path, 'w') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+        os.replace(tmp_path, self.index_path)
+
+    def _compact_if_needed(self):
+        """Rewrite the index without tombstones once they make up a large part of it"""
+        if self._tombstones < max(COMPACT_MIN_TOMBSTONES, len(self._entries) / 2):
+            return
+        self._write_index(self._entries)
+        logger.info(f"Compacted the report index, dropping {self._tombstones} removed reports")
+        self._tombstones = 0
+
+    def _rebuild(self):
+        """Index report files written before the catalog existed"""
+        found = []
+        with os.scandir(self.reports_dir) as files:
+            for item in files:
+                match = re.fullmatch(r"report_(.+)\.(md|markdown|json)(?:\.gz|\.zst)?", item.name)
+                if match:
+                    found.append((item.stat(), match.group(1), match.group(2), Path(item.path)))
+        found.sort(key=lambda f: f[0].st_mtime)
+
+        entries = []
+        for seq, (stat, report_id, extension, path) in enumerate(found, 1):
+            report_format = "json" if extension == "json" else "markdown"
+            entry = {
+                "seq": seq,
+                "report_id": report_id,
+                "format": report_format,
+                "filename": plain_path(path).name,
+                "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                "size_bytes": stat.st_size,
+                "session_count": None,
+                "sessions_from": None,
+                "sessions_to": None,
+                "urls": [],
+                "summary": None,
+            }
+            try:
+                content = read_bytes(path).decode("utf-8")
+                if report_format == "json":
+                    data = json.loads(content)
+                    entry["session_count"] = data.get("sessions_count")
+                    entry["summary"] = data.get("summary")
+                else:
+                    match = re.search(r"Sessions analyzed: (\d+)", content)
+                    entry["session_count"] = int(match.group(1)) if match else None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read report {path.name} while indexing: {e}")
+            entries.append(entry)
+
+        self._write_index(entries)
+        for entry in entries:
+            self._track(entry)
+        if entries:
+            logger.info(f"Indexed {len(entries)} existing reports")
+
+    def prepare(self):
+        """Load the index and create the reports directory, before a report is written into it"""
+        self._ensure_loaded()
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def describe(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """An entry without its internal ordering key"""
+        return {key: value for key, value in entry.items() if key != "seq"}
+
+    def path_for(self, entry: Dict[str, Any]) -> Path:
+        """Where the report is stored, compressed or not"""
+        path = self.reports_dir / entry["filename"]
+        return existing_path(path) or path
+
+    def read(self, entry: Dict[str, Any]) -> str:
+        """The report's content, decompressed if needed"""
+        return read_bytes(self.path_for(entry)).decode("utf-8")
+
+    def add(self, report_id: str, report_format: str, filename: str,
+            sessions: List[Session], size_bytes: int) -> Dict[str, Any]:
+        """Record a newly written report"""
+        self.prepare()
+        created = [s.created_at for s in sessions]
+        entry = {
+            "seq": (self._seqs[-1] + 1) if self._seqs else 1,
+            "report_id": report_id,
+            "format": report_format,
+            "filename": filename,
+            "created_at": datetime.now().isoformat(),
+            "size_bytes": size_bytes,
+            "session_count": len(sessions),
+            "sessions_from": min(created).isoformat() if created else None,
+            "sessions_to": max(created).isoformat() if created else None,
+            "urls": sorted({s.url for s in sessions})[:MAX_ENTRY_URLS],
+            "summary": report_summary(sessions),
+        }
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+        self._track(entry)
+        return entry
+
+    def get(self, report_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        return self._by_id.get(report_id)
+
+    def remove(self, report_id: str) -> bool:
+        """Delete a report file and drop it from the catalog"""
+        self._ensure_loaded()
+        entry = self._by_id.pop(report_id, None)
+        if entry is None:
+            return False
+        del self._by_seq[entry["seq"]]
+        position = bisect.bisect_left(self._seqs, entry["seq"])
+        del self._seqs[position]
+        del self._entries[position]
+        del self._created[position]
+        format_seqs = self._format_seqs[entry["format"]]
+        del format_seqs[bisect.bisect_left(format_seqs, entry["seq"])]
+        remove_variants(self.reports_dir / entry["filename"])
+        # Removals are appended as tombstones rather than rewriting the index
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps({"removed": report_id}) + "\n")
+        self._tombstones += 1
+        self._compact_if_needed()
+        return True
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Every catalog entry, oldest first"""
+        self._ensure_loaded()
+        return list(self._entries)
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._entries)
+
+    def page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        format: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        url_prefix: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of reports, newest first.
+
+        Reports are created in time order, so the time range is a bisect on
+        creation times; with ``format`` the page is read from that format's
+        own seq list. Only ``url_prefix`` is checked entry by entry.
+
+        Args:
+            cursor: ``next_cursor`` from the previous page
+            limit: Reports per page (capped at MAX_PAGE_SIZE)
+            format: Only reports in this format
+            since / until: ISO timestamps bounding the report creation time
+            url_prefix: Only reports covering a URL with this prefix
+
+        Returns:
+            Dictionary with "reports", "next_cursor" (None on the last page)
+            and "total_reports" in the catalog
+
+        Raises:
+            ValueError: ``cursor`` is not one this catalog handed out
+        """
+        if cursor and not (cursor.isascii() and cursor.isdigit()):
+            raise ValueError("Invalid cursor")
+        self._ensure_loaded()
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        # The range of seqs to list: [low_seq, high_seq)
+        high = bisect.bisect_left(self._seqs, int(cursor)) if cursor else len(self._seqs)
+        if until:
+            high = min(high, bisect.bisect_right(self._created, until))
+        low = bisect.bisect_left(self._created, since) if since else 0
+        low_seq = self._seqs[low] if low < len(self._seqs) else float("inf")
+        high_seq = self._seqs[high] if high < len(self._seqs) else float("inf")
+
+        seqs = self._format_seqs.get(format, []) if format else self._seqs
+        first = bisect.bisect_left(seqs, low_seq)
+        position = bisect.bisect_left(seqs, high_seq) - 1
+
+        reports: List[Dict[str, Any]] = []
+        while position >= first and len(reports) < limit:
+            entry = self._by_seq[seqs[position]]
+            position -= 1
+            if url_prefix and not any(url.startswith(url_prefix) for url in entry["urls"]):
+                continue
+            reports.append(self.describe(entry))
+
+        next_cursor = str(seqs[position + 1]) if position >= first else None
+        return {
+            "reports": reports,
+            "next_cursor": next_cursor,
+            "total_reports": len(self._entries),
+        }
+
+__all__ = [
+    "REPORT_FORMATS",
+    "ReportCatalog",
+    "report_summary",
+]
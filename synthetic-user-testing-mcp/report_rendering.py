@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Memoized report rendering.
+
+Agents tend to call ``generate_report`` over and over with the same
+arguments. A ``RenderedReport`` keeps the per-session pieces of a report
+(markdown sections or JSON fragments) together with running totals for the
+summary blocks, so a report can be:
+
+- returned as is when its sessions have not changed since it was rendered,
+- extended by rendering only the sessions added since, or
+- rendered from scratch when earlier sessions changed or dropped out.
+
+``ReportCache`` holds the latest rendering per (session selection, format).
+Freshness is judged from the session store's per-session revisions, so a
+session that was re-saved (e.g. re-scored) forces a full re-render.
+"""
+
+import json
+import textwrap
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from models import Session
+
+# Cached renderings kept in memory, least recently used dropped first
+MAX_CACHED_REPORTS = 64
+# Sessions rendered between progress updates
+CHUNK_SIZE = 50
+
+def _markdown_session(index: int, session: Session) -> str:
+    report = []
+    report.append(f"\n### Session {index}: {session.url}")
+    report.append(f"\n**Created:** {session.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    if session.task_description:
+        report.append(f"\n**Task:** {session.task_description}")
+
+    if session.task_result:
+        result = session.task_result
+        status = "✅ Success" if result.success else "❌ Failed"
+        report.append(f"\n**Result:** {status}")
+        report.append(f"\n**Steps taken:** {result.steps_taken}")
+        report.append(f"\n**Time taken:** {result.time_taken:.2f} seconds")
+
+        if result.steps_attempted:
+            report.append("\n**Steps attempted:**")
+            for step in result.steps_attempted:
+                report.append(f"- {step}")
+
+        if result.error_message:
+            report.append(f"\n**Error:** {result.error_message}")
+
+    if session.journey_steps:
+        report.append("\n**Journey:**")
+        for step in session.journey_steps:
+            status = "✅" if step.success else "❌"
+            report.append(f"{step.step_index + 1}. {status} {step.task_description} ({step.time_taken:.2f}s)")
+
+    if session.feedback:
+        feedback = session.feedback
+        report.append(f"\n**User Perspective:** {feedback.perspective}")
+        report.append(f"\n**Overall Score:** {feedback.overall_score}/10")
+
+        if feedback.positives:
+            report.append("\n**Positives:**")
+            for positive in feedback.positives:
+                report.append(f"- ✅ {positive}")
+
+        if feedback.negatives:
+            report.append("\n**Issues:**")
+            for negative in feedback.negatives:
+                report.append(f"- ❌ {negative}")
+
+    report.append("\n---")
+    return "\n".join(report)
+
+def _json_session(session: Session) -> str:
+    # Indented to sit inside the report's "sessions" list
+    return textwrap.indent(json.dumps(session.dict(), indent=2, default=str), "    ")
+
+class RenderedReport:
+    """The per-session pieces and summary totals of one report"""
+
+    def __init__(self, format: str):
+        self.format = format
+        self.session_ids: List[str] = []
+        self.revisions: List[int] = []
+        self.pieces: List[str] = []
+        self.successful_tasks = 0
+        self.total_tasks = 0
+        self.score_total = 0
+        self.score_count = 0
+        self.negatives: Counter = Counter()
+        # Set once the rendering is written out, with the sessions it covered
+        self.report_id: Optional[str] = None
+        self.report_path: Optional[str] = None
+        self.report_sessions = 0
+
+    def mark_saved(self, report_id: str, report_path: str):
+        self.report_id, self.report_path = report_id, report_path
+        self.report_sessions = len(self.session_ids)
+
+    @property
+    def report_is_current(self) -> bool:
+        """Whether the saved report covers every session rendered so far"""
+        return self.report_id is not None and self.report_sessions == len(self.session_ids)
+
+    def add(self, session: Session, revision: int):
+        self.session_ids.append(session.session_id)
+        self.revisions.append(revision)
+        if session.task_result:
+            self.total_tasks += 1
+            if session.task_result.success:
+                self.successful_tasks += 1
+        if session.feedback:
+            self.score_total += session.feedback.overall_score
+            self.score_count += 1
+            self.negatives.update(session.feedback.negatives)
+        if self.format == "markdown":
+            self.pieces.append(_markdown_session(len(self.pieces) + 1, session))
+        else:
+            self.pieces.append(_json_session(session))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "task_success_rate": (self.successful_tasks / self.total_tasks * 100) if self.total_tasks > 0 else 0,
+            "average_satisfaction_score": self.score_total / self.score_count if self.score_count else 0,
+            "total_tasks_attempted": self.total_tasks,
+            "successful_tasks": self.successful_tasks
+        }
+
+    def render(self) -> str:
+        return self._render_markdown() if self.format == "markdown" else self._render_json()
+
+    def _render_markdown(self) -> str:
+        report = []
+        report.append("# Synthetic User Testing Report")
+        report.append(f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        report.append(f"\nSessions analyzed: {len(self.session_ids)}")
+        report.append("\n---\n")
+
+        # Executive Summary
+        report.append("## Executive Summary")
+
+        if self.total_tasks > 0:
+            success_rate = (self.successful_tasks / self.total_tasks) * 100
+            report.append(f"\n- Task Success Rate: {success_rate:.1f}% ({self.successful_tasks}/{self.total_tasks})")
+
+        if self.score_count:
+            avg_score = self.score_total / self.score_count
+            report.append(f"- Average User Satisfaction: {avg_score:.1f}/10")
+
+        # Top Issues
+        if self.negatives:
+            report.append("\n### Top Issues:")
+            for issue, count in self.negatives.most_common(3):
+                report.append(f"- {issue} (mentioned {count} times)")
+
+        # Detailed Session Results
+        report.append("\n## Detailed Results")
+        report.extend(self.pieces)
+
+        # Recommendations
+        report.append("\n## Recommendations")
+
+        if self.total_tasks > 0 and success_rate < 70:
+            report.append("\n- **Critical:** Task success rate is below 70%. Review user flows and simplify key actions.")
+
+        if self.score_count and avg_score < 6:
+            report.append("\n- **Important:** User satisfaction is below average. Focus on addressing common usability issues.")
+
+        if self.negatives:
+            most_common_issue = self.negatives.most_common(1)[0]
+            report.append(f"\n- **Priority:** Address '{most_common_issue[0]}' as it was the most frequently reported issue.")
+
+        report.append("\n- **General:** Continue regular usability testing to monitor improvements.")
+
+        return "\n".join(report)
+
+    def _render_json(self) -> str:
+        # Same layout as json.dumps(report, indent=2), with the session
+        # fragments spliced in rather than re-serialized
+        summary = textwrap.indent(json.dumps(self.summary(), indent=2), "  ").lstrip()
+        return "\n".join([
+            "{",
+            f'  "generated_at": {json.dumps(datetime.now().isoformat())},',
+            f'  "sessions_count": {len(self.session_ids)},',
+            '  "sessions": [',
+            ",\n".join(self.pieces),
+            "  ],",
+            f'  "summary": {summary}',
+            "}",
+        ])
+
+def render_report(sessions: List[Session], format: str) -> str:
+    """Render a report from scratch"""
+    rendered = RenderedReport(format)
+    for session in sessions:
+        rendered.add(session, 0)
+    return rendered.render()
+
+class ReportCache:
+    """Latest rendering per (selection, format), refreshed from session revisions"""
+
+    def __init__(self, max_entries: int = MAX_CACHED_REPORTS):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], RenderedReport]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> Optional[RenderedReport]:
+        rendered = self._entries.get(key)
+        if rendered is not None:
+            self._entries.move_to_end(key)
+        return rendered
+
+    def refresh(
+        self,
+        key: Tuple[str, str],
+        sessions: List[Session],
+        revisions: List[int]
+    ) -> Tuple[RenderedReport, str]:
+        """
+        Bring the rendering for ``key`` up to date with ``sessions``.
+
+        Returns:
+            (rendering, status) where status is "unchanged" (nothing to do),
+            "extended" (only new sessions were rendered) or "rendered"
+        """
+        for rendered, status, _ in self.refresh_chunks(key, sessions, revisions):
+            pass
+        return rendered, status
+
+    def refresh_chunks(
+        self,
+        key: Tuple[str, str],
+        sessions: List[Session],
+        revisions: List[int],
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[Tuple[RenderedReport, str, List[str]]]:
+        """
+        Like ``refresh``, rendering ``chunk_size`` sessions at a time.
+
+        Yields (rendering, status, pieces) after each chunk, with the pieces
+        rendered in that chunk; the last one yielded is up to date. A new
+        rendering is only cached once it is complete, so a caller that stops
+        early (e.g. a cancelled call) leaves the cache as it was.
+        """
+        previous = self.get(key)
+        session_ids = [session.session_id for session in sessions]
+
+        rendered, status, start = RenderedReport(key[1]), "rendered", 0
+        if previous is not None:
+            known = len(previous.session_ids)
+            if session_ids[:known] == previous.session_ids and revisions[:known] == previous.revisions:
+                if known == len(session_ids):
+                    yield previous, "unchanged", []
+                    return
+                # Extending in place keeps it consistent after any chunk. Its
+                # saved report stays recorded (but no longer current) until
+                # the caller writes and saves the new one
+                rendered, status, start = previous, "extended", known
+
+        offsets = range(start, len(sessions), chunk_size) or [start]
+        for offset in offsets:
+            first_piece = len(rendered.pieces)
+            end = offset + chunk_size
+            for session, revision in zip(sessions[offset:end], revisions[offset:end]):
+                rendered.add(session, revision)
+            if status == "rendered" and end >= len(sessions):
+                self._entries[key] = rendered
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            yield rendered, status, rendered.pieces[first_piece:]
+
+    def forget(self, key: Tuple[str, str]):
+        self._entries.pop(key, None)
+
+__all__ = [
+    "RenderedReport",
+    "ReportCache",
+    "render_report",
+]
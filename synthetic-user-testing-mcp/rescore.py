@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Bulk offline re-scoring of stored sessions.
+
+When the feedback heuristics or metric scorers change, every stored score is
+stale. This module re-runs ``generate_feedback`` and the metric scorers over
+the page snapshots stored with each session, in parallel across a process
+pool and without a browser, and writes the refreshed scores back in place.
+
+Usage:
+    python rescore.py --url-prefix https://myapp.com --perspectives new_user expert_user
+    python rescore.py --since 2024-01-01 --workers 8
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from config import SESSIONS_DIR
+from feedback import generate_feedback
+from scoring import METRIC_SCORERS, ScoringEngine
+from session_store import SessionStore, read_session_file, write_session_file
+
+CHUNK_SIZE = 500
+
+_engine: Optional[ScoringEngine] = None
+
+def _get_engine() -> ScoringEngine:
+    # Built once per worker process
+    global _engine
+    if _engine is None:
+        _engine = ScoringEngine(list(METRIC_SCORERS))
+    return _engine
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+def matches_filter(data: Dict[str, Any], session_filter: Dict[str, Any]) -> bool:
+    """Check a stored session dictionary against a filter
+
+    Supported keys: url_prefix, perspective, since, until, session_ids.
+    """
+    if not session_filter:
+        return True
+    url_prefix = session_filter.get("url_prefix")
+    if url_prefix and not data.get("url", "").startswith(url_prefix):
+        return False
+    perspective = session_filter.get("perspective")
+    if perspective and (data.get("feedback") or {}).get("perspective") != perspective:
+        return False
+    session_ids = session_filter.get("session_ids")
+    if session_ids and data.get("session_id") not in session_ids:
+        return False
+    since = _parse_time(session_filter.get("since"))
+    until = _parse_time(session_filter.get("until"))
+    if since or until:
+        created_at = _parse_time(data.get("created_at"))
+        if created_at is None:
+            return False
+        if since and created_at < since:
+            return False
+        if until and created_at > until:
+            return False
+    return True
+
+def rescore_session(data: Dict[str, Any], perspectives: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Refresh the feedback and metric scores of one stored session in place.
+
+    Returns a summary row, or None when the session has no stored snapshot.
+    """
+    snapshot = data.get("snapshot")
+    if not snapshot:
+        return None
+
+    session_id = data["session_id"]
+    url = data.get("url", snapshot.get("url", ""))
+    old_feedback = data.get("feedback")
+    old_score = old_feedback["overall_score"] if old_feedback else None
+
+    new_score = None
+    if old_feedback:
+        # Seed by session so re-running the same heuristics is reproducible
+        feedback = generate_feedback(snapshot, old_feedback["perspective"], random.Random(session_id))
+        data["feedback"] = feedback.dict()
+        new_score = feedback.overall_score
+
+    if perspectives:
+        data["perspective_scores"] = {
+            perspective: generate_feedback(
+                snapshot, perspective, random.Random(f"{session_id}:{perspective}")
+            ).overall_score
+            for perspective in perspectives
+        }
+
+    data["metric_scores"] = _get_engine().score_one(url, snapshot)
+    data["rescored_at"] = datetime.now()
+
+    return {
+        "session_id": session_id,
+        "url": url,
+        "old_score": old_score,
+        "new_score": new_score,
+        "metric_scores": data["metric_scores"],
+        "perspective_scores": data.get("perspective_scores", {}),
+    }
+
+def rescore_chunk(paths: List[str], session_filter: Optional[Dict[str, Any]],
+                  perspectives: Optional[List[str]]) -> Dict[str, Any]:
+    """Worker entry point: re-score a batch of session files"""
+    rows = []
+    skipped = 0
+    failed = 0
+    for path_str in paths:
+        path = Path(path_str)
+        try:
+            data = read_session_file(path)
+            if not matches_filter(data, session_filter or {}):
+                skipped += 1
+                continue
+            row = rescore_session(data, perspectives)
+            if row is None:
+                skipped += 1
+                continue
+            write_session_file(path, data)
+            rows.append(row)
+        except Exception:
+            failed += 1
+    return {"scanned": len(paths), "skipped": skipped, "failed": failed, "rows": rows}
+
+async def rescore_sessions(
+    store: SessionStore,
+    session_filter: Optional[Dict[str, Any]] = None,
+    perspectives: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Re-score every stored session matching ``session_filter`` across a process pool.
+
+    Results stream back chunk by chunk: sessions held in memory by ``store`` are
+    reloaded as soon as their chunk finishes, and ``on_chunk`` (if given) is
+    called with each chunk's result.
+    """
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+
+    session_ids = (session_filter or {}).get("session_ids")
+    if session_ids:
+        found = [store.find_path(session_id) for session_id in session_ids]
+        paths = [str(path) for path in found if path is not None]
+    else:
+        paths = await asyncio.to_thread(lambda: [str(path) for path in store.iter_paths()])
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+
+    workers = workers or os.cpu_count() or 1
+    totals = {"scanned": 0, "rescored": 0, "skipped": 0, "failed": 0}
+    score_deltas = []
+    changed = []
+
+    # Spawn (not fork) so workers never inherit the browser or event loop threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = set()
+        chunk_iter = iter(chunks)
+
+        def submit_next():
+            chunk = next(chunk_iter, None)
+            if chunk is not None:
+                pending.add(loop.run_in_executor(pool, rescore_chunk, chunk, session_filter, perspectives))
+
+        # Keep a bounded number of chunks in flight so memory stays flat
+        for _ in range(workers * 2):
+            submit_next()
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                result = future.result()
+                totals["scanned"] += result["scanned"]
+                totals["skipped"] += result["skipped"]
+                totals["failed"] += result["failed"]
+                totals["rescored"] += len(result["rows"])
+
+                for row in result["rows"]:
+                    if row["session_id"] in store.sessions:
+                        store.reload(row["session_id"])
+                    if row["old_score"] is not None and row["new_score"] is not None:
+                        delta = row["new_score"] - row["old_score"]
+                        score_deltas.append(delta)
+                        if delta and len(changed) < 50:
+                            changed.append(row)
+
+                if on_chunk:
+                    on_chunk(result)
+                submit_next()
+
+    elapsed = time.perf_counter() - start
+    return {
+        **totals,
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "sessions_per_second": round(totals["scanned"] / elapsed, 1) if elapsed else 0.0,
+        "average_score_delta": round(sum(score_deltas) / len(score_deltas), 3) if score_deltas else 0.0,
+        "changed_sessions": changed,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-score stored sessions without a browser")
+    parser.add_argument("--sessions-dir", type=Path, default=SESSIONS_DIR)
+    parser.add_argument("--url-prefix")
+    parser.add_argument("--perspective", help="Only sessions whose feedback used this perspective")
+    parser.add_argument("--since", help="ISO timestamp; only sessions created at or after it")
+    parser.add_argument("--until", help="ISO timestamp; only sessions created at or before it")
+    parser.add_argument("--perspectives", nargs="+", help="Also score every session from these perspectives")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    session_filter = {
+        key: value for key, value in {
+            "url_prefix": args.url_prefix,
+            "perspective": args.perspective,
+            "since": args.since,
+            "until": args.until,
+        }.items() if value
+    }
+
+    def report(result: Dict[str, Any]):
+        print(f"  chunk: scanned {result['scanned']}, rescored {len(result['rows'])}, "
+              f"skipped {result['skipped']}, failed {result['failed']}")
+
+    summary = asyncio.run(rescore_sessions(
+        SessionStore(args.sessions_dir),
+        session_filter,
+        args.perspectives,
+        args.workers,
+        args.chunk_size,
+        on_chunk=report
+    ))
+    print(f"Re-scored {summary['rescored']} of {summary['scanned']} sessions in "
+          f"{summary['elapsed_seconds']}s ({summary['sessions_per_second']}/s), "
+          f"average score change {summary['average_score_delta']:+}")
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
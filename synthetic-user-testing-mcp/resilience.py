@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Deadlines, retries and circuit breakers for the Synthetic User Testing MCP Server.
+
+- ``deadline(seconds)`` (from ``deadlines``) sets a time budget for the
+  enclosed block; ``with_deadline`` gives a whole tool one.
+- ``retry_call`` retries transient failures (network resets, timeouts, 5xx)
+  with exponential backoff and jitter, never past the deadline.
+- ``CircuitBreakers`` stops hammering an origin that keeps failing: after
+  repeated failures calls fail fast until a cool-down has passed.
+
+``RetryReport`` records what happened so tools can report attempts, errors
+and timeouts in their results.
+"""
+
+import asyncio
+import functools
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from config import ServerConfig
+from deadlines import DeadlineExceeded, deadline, expired, remaining
+
+BASE_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 8.0
+
+# Extra time a tool gets past its deadline to close browser contexts cleanly
+DEADLINE_GRACE_SECONDS = 5.0
+
+# Error fragments that mark a failure as transient
+RETRYABLE_MESSAGES = (
+    "timeout",
+    "net::err_connection_reset",
+    "net::err_connection_refused",
+    "net::err_connection_closed",
+    "net::err_connection_timed_out",
+    "net::err_timed_out",
+    "net::err_network_changed",
+    "net::err_empty_response",
+    "net::err_http2_protocol_error",
+    "target closed",
+    "econnreset",
+)
+RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+class CircuitOpenError(Exception):
+    """Calls to an origin are short-circuited after repeated failures"""
+
+class RetryableStatusError(Exception):
+    """An HTTP response whose status code is worth retrying"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP status {status_code}")
+        self.status_code = status_code
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failure looks transient and worth another attempt"""
+    if isinstance(error, (DeadlineExceeded, CircuitOpenError)):
+        return False
+    if isinstance(error, (RetryableStatusError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    # httpx transport errors and Playwright's TimeoutError, without importing either
+    if type(error).__name__ in ("TimeoutError", "ConnectError", "ReadError", "RemoteProtocolError",
+                                "ReadTimeout", "ConnectTimeout", "PoolTimeout"):
+        return True
+    message = str(error).lower()
+    return any(fragment in message for fragment in RETRYABLE_MESSAGES)
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+class CircuitBreaker:
+    """Closed → open after ``failure_threshold`` failures → half-open after ``reset_timeout``"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            self._trial_in_flight = False
+        if self.state == "half_open":
+            # Let a single trial call through to probe the origin
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a half-open trial whose outcome says nothing about the origin's health"""
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+class CircuitBreakers:
+    """One circuit breaker per origin"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        origin = origin_of(url)
+        if origin not in self._breakers:
+            self._breakers[origin] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self._breakers[origin]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """State of every breaker that is not fully closed"""
+        return {
+            origin: {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "retry_after": round(breaker.retry_after(), 1) if breaker.state == "open" else 0.0,
+            }
+            for origin, breaker in self._breakers.items()
+            if breaker.state != "closed" or breaker.failures
+        }
+
+class RetryReport:
+    """What retry_call did, for inclusion in tool results"""
+
+    def __init__(self):
+        self.attempts = 0
+        self.errors: List[str] = []
+        self.timed_out = False
+        self.circuit_open = False
+
+    @property
+    def notable(self) -> bool:
+        """Whether anything beyond a single clean attempt happened"""
+        return self.attempts > 1 or self.timed_out or self.circuit_open
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"attempts": self.attempts}
+        if self.errors:
+            result["retried_errors"] = self.errors
+        if self.timed_out:
+            result["timed_out"] = True
+        if self.circuit_open:
+            result["circuit_open"] = True
+        return result
+
+async def retry_call(
+    func: Callable[[], Awaitable[Any]],
+    url: str,
+    breakers: Optional[CircuitBreakers] = None,
+    retries: int = ServerConfig.MAX_RETRIES,
+    report: Optional[RetryReport] = None
+) -> Any:
+    """
+    Await ``func()``, retrying transient failures up to ``retries`` times.
+
+    Backoff doubles from BASE_BACKOFF_SECONDS (with +/-50% jitter) and stops
+    early when the next attempt would start past the deadline. The last
+    error is re-raised; ``report`` records attempts, errors and timeouts.
+    """
+    report = report if report is not None else RetryReport()
+    breaker = breakers.for_url(url) if breakers is not None else None
+
+    for attempt in range(retries + 1):
+        if breaker is not None and not breaker.allow():
+            report.circuit_open = True
+            raise CircuitOpenError(
+                f"Circuit open for {origin_of(url)} after repeated failures; "
+                f"retry in {breaker.retry_after():.0f}s"
+            )
+        if expired():
+            report.timed_out = True
+            raise DeadlineExceeded(f"Deadline exceeded before attempt {attempt + 1} for {url}")
+
+        report.attempts += 1
+        try:
+            result = await func()
+        except Exception as e:
+            retryable = is_retryable(e)
+            if breaker is not None:
+                if retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.release()
+            if isinstance(e, DeadlineExceeded) or expired():
+                report.timed_out = True
+            if not retryable or attempt == retries or report.timed_out:
+                raise
+            report.errors.append(f"{type(e).__name__}: {e}")
+
+            delay = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** attempt) * random.uniform(0.5, 1.5)
+            left = remaining()
+            if left is not None and left <= delay:
+                report.timed_out = True
+                raise
+            await asyncio.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+def with_deadline(seconds: float) -> Callable:
+    """
+    Give an async tool an overall time budget.
+
+    Playwright waits inside the tool are cut to the budget; if the tool still
+    overruns by more than DEADLINE_GRACE_SECONDS it is cancelled. Dictionary
+    results are flagged with "deadline_exceeded" when the budget ran out.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with deadline(seconds):
+                try:
+                    result = await asyncio.wait_for(func(*args, **kwargs), seconds + DEADLINE_GRACE_SECONDS)
+                except (asyncio.TimeoutError, DeadlineExceeded):
+                    return {"error": f"Deadline of {seconds:g}s exceeded", "deadline_exceeded": True}
+                if isinstance(result, dict) and expired():
+                    result["deadline_exceeded"] = True
+                return result
+        return wrapper
+    return decorator
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitBreakers",
+    "CircuitOpenError",
+    "DeadlineExceeded",
+    "RetryReport",
+    "RetryableStatusError",
+    "deadline",
+    "expired",
+    "is_retryable",
+    "remaining",
+    "retry_call",
+    "with_deadline",
+]
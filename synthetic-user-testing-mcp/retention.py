@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Data retention for sessions, reports and screenshots.
+
+``RetentionCollector`` sweeps the data directory on an interval and applies a
+``RetentionPolicy`` per kind of data:
+
+- files older than ``max_age_days`` are deleted,
+- sessions and reports older than ``compress_after_days`` are compressed in
+  place (see ``cold_storage``), and
+- when a kind of data still takes more than ``max_bytes``, its oldest files
+  are deleted until it fits.
+
+Screenshots nothing refers to are deleted as well, once they are older than
+``ORPHAN_GRACE_SECONDS`` (a screenshot is taken before the session that refers
+to it is saved). A screenshot is kept while a stored session, a
+change-detection entry (the last ``visit_page`` snapshot of a URL) or a live
+shared-cache snapshot refers to it. The screenshots each session and
+change-detection file refers to are cached by modification time, so a sweep
+only re-reads files that changed.
+
+Sweeps work in steps of at most ``batch_size`` files, run file I/O in worker
+threads and pause between steps, so a sweep never holds up tool calls. Files
+are aged by modification time, so a re-saved (e.g. re-scored) session counts
+as new again.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from cold_storage import compress_file, is_compressed, resolve_codec
+from config import RetentionPolicy
+from report_catalog import ReportCatalog
+from session_store import SESSION_SUFFIXES, SessionStore, read_session_file, session_id_for
+from shared_cache import SharedCache
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 24 * 60 * 60
+# Screenshots younger than this are never treated as orphans
+ORPHAN_GRACE_SECONDS = 60 * 60
+# Delay before the first sweep, so it does not compete with server startup
+FIRST_SWEEP_DELAY = 60.0
+
+SCREENSHOT_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+# (path, size in bytes, modification time)
+FileInfo = Tuple[Path, int, float]
+
+def _list_files(directory: Path, suffixes: Tuple[str, ...]) -> List[FileInfo]:
+    """Files in ``directory`` with one of ``suffixes``, oldest first"""
+    if not directory.is_dir():
+        return []
+    files = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.name.endswith(suffixes):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((Path(entry.path), stat.st_size, stat.st_mtime))
+    files.sort(key=lambda f: f[2])
+    return files
+
+def _screenshot_refs(path: Path) -> List[str]:
+    """File names of the screenshots a session file refers to"""
+    data = read_session_file(path)
+    refs = list(data.get("screenshots") or [])
+    snapshot = data.get("snapshot") or {}
+    if snapshot.get("screenshot"):
+        refs.append(snapshot["screenshot"])
+    return [Path(ref).name for ref in refs]
+
+def _change_screenshot_refs(path: Path) -> List[str]:
+    """File name of the screenshot a change-detection entry's snapshot refers to"""
+    entry = json.loads(path.read_text())
+    screenshot = (entry.get("snapshot") or {}).get("screenshot")
+    return [Path(screenshot).name] if screenshot else []
+
+def _batches(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class RetentionCollector:
+    """Applies retention policies to sessions, reports and screenshots in the background"""
+
+    def __init__(
+        self,
+        store: SessionStore,
+        reports: ReportCatalog,
+        screenshots_dir: Path,
+        policies: Dict[str, RetentionPolicy],
+        interval: float = 3600,
+        codec: str = "auto",
+        batch_size: int = 100,
+        pause: float = 0.05,
+        changes_dir: Optional[Path] = None,
+        shared_cache: Optional[SharedCache] = None
+    ):
+        self.store = store
+        self.reports = reports
+        self.screenshots_dir = screenshots_dir
+        # Other places visit_page snapshots (and their screenshots) are kept
+        self.changes_dir = changes_dir
+        self.shared_cache = shared_cache
+        self.policies = policies
+        self.interval = interval
+        self.codec = codec
+        self.batch_size = max(1, batch_size)
+        self.pause = pause
+        self.last_sweep: Optional[Dict[str, Any]] = None
+        self._refs: Dict[Path, Tuple[float, List[str]]] = {}
+        self._change_refs: Dict[Path, Tuple[float, List[str]]] = {}
+        self._sweep_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        """Start sweeping every ``interval`` seconds (a no-op when it is 0)"""
+        if self.started or self.interval <= 0:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Retention sweeps every {self.interval:.0f}s")
+
+    async def stop(self):
+        # A sweep in progress stops after its current step
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def _loop(self):
+        delay = min(self.interval, FIRST_SWEEP_DELAY)
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                break
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Retention sweep failed: {e}")
+            delay = self.interval
+
+    async def _step(self, func, items: List[Any]) -> List[Any]:
+        """Run ``func`` over ``items`` in a worker thread, one batch at a time"""
+        results = []
+        for batch in _batches(items, self.batch_size):
+            if self._stopping:
+                break
+            results.extend(await asyncio.to_thread(lambda b=batch: [func(item) for item in b]))
+            await asyncio.sleep(self.pause)
+        return results
+
+    async def sweep(self) -> Dict[str, Any]:
+        """
+        Apply every retention policy once.
+
+        Returns:
+            Dictionary with, per kind of data, the files deleted, compressed
+            and kept and the bytes freed
+        """
+        async with self._sweep_lock:
+            started = time.perf_counter()
+            now = time.time()
+            codec = resolve_codec(self.codec)
+            with tracer.span("retention.sweep"):
+                sessions, refs_complete = await self._sweep_sessions(now, codec)
+                reports = await self._sweep_reports(now, codec)
+                screenshots = await self._sweep_screenshots(now, refs_complete)
+            result = {
+                "swept_at": datetime.now().isoformat(),
+                "duration_seconds": round(time.perf_counter() - started, 3),
+                "codec": codec,
+                "sessions": sessions,
+                "reports": reports,
+                "screenshots": screenshots,
+            }
+            self.last_sweep = result
+            for kind in ("sessions", "reports", "screenshots"):
+                tracer.increment(f"retention.{kind}.deleted", result[kind]["deleted"])
+                tracer.increment(f"retention.{kind}.compressed", result[kind]["compressed"])
+            logger.info(
+                "Retention sweep: " + "; ".join(
+                    f"{kind} {result[kind]['deleted']} deleted, {result[kind]['compressed']} compressed"
+                    for kind in ("sessions", "reports", "screenshots")
+                )
+            )
+            return result
+
+    @staticmethod
+    def _counts() -> Dict[str, int]:
+        return {"deleted": 0, "compressed": 0, "kept": 0, "kept_bytes": 0, "freed_bytes": 0}
+
+    async def _compress(self, files: List[FileInfo], codec: str, counts: Dict[str, int]) -> List[FileInfo]:
+        """Compress ``files``, returning them with their new paths and sizes"""
+        def compress(info: FileInfo) -> FileInfo:
+            path, size, mtime = info
+            try:
+                target = compress_file(path, codec)
+            except FileNotFoundError:
+                return info
+            if target is None:
+                return info
+            return target, target.stat().st_size, mtime
+
+        compressed = await self._step(compress, files)
+        for before, after in zip(files, compressed):
+            if after[0] != before[0]:
+                counts["compressed"] += 1
+                counts["freed_bytes"] += before[1] - after[1]
+        return compressed
+
+    async def _sweep_sessions(self, now: float, codec: str) -> Tuple[Dict[str, int], bool]:
+        policy = self.policies.get("sessions", RetentionPolicy())
+        counts = self._counts()
+        files = await asyncio.to_thread(_list_files, self.store.sessions_dir, SESSION_SUFFIXES)
+
+        expired, files = self._split_expired(files, policy, now)
+        await self._remove_sessions(expired, counts)
+
+        if policy.compress_after_days > 0:
+            cutoff = now - policy.compress_after_days * DAY_SECONDS
+            cold = [info for info in files if info[2] < cutoff and not is_compressed(info[0])]
+            compressed = dict(zip((info[0] for info in cold), await self._compress(cold, codec, counts)))
+            files = [compressed.get(info[0], info) for info in files]
+
+        over, files = self._split_over_budget(files, policy)
+        await self._remove_sessions(over, counts)
+
+        counts["kept"] = len(files)
+        counts["kept_bytes"] = sum(info[1] for info in files)
+        refs_complete = await self._refresh_refs(files, self._refs, _screenshot_refs)
+        return counts, refs_complete
+
+    async def _remove_sessions(self, files: List[FileInfo], counts: Dict[str, int]):
+        for batch in _batches(files, self.batch_size):
+            if self._stopping:
+                return
+            for path, size, _ in batch:
+                self.store.remove(session_id_for(path))
+                self._refs.pop(path, None)
+                counts["deleted"] += 1
+                counts["freed_bytes"] += size
+            await asyncio.sleep(self.pause)
+
+    async def _refresh_refs(
+        self,
+        files: List[FileInfo],
+        cache: Dict[Path, Tuple[float, List[str]]],
+        read_refs: Callable[[Path], List[str]]
+    ) -> bool:
+        """
+        Bring the screenshot references cached in ``cache`` up to date with ``files``.
+
+        Returns:
+            Whether every file could be read, i.e. whether the references
+            are complete enough to delete orphans by
+        """
+        current = {info[0]: info[2] for info in files}
+        for path in list(cache):
+            if path not in current:
+                del cache[path]
+        stale = [path for path, mtime in current.items()
+                 if path not in cache or cache[path][0] != mtime]
+
+        def read(path: Path) -> Optional[List[str]]:
+            try:
+                return read_refs(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read {path.name} for screenshot references: {e}")
+                return None
+
+        complete = True
+        for path, refs in zip(stale, await self._step(read, stale)):
+            if refs is None:
+                complete = False
+            else:
+                cache[path] = (current[path], refs)
+        # An interrupted sweep has not read everything either
+        return complete and len(cache) == len(current)
+
+    async def _other_refs(self) -> Optional[Set[str]]:
+        """
+        Screenshots referenced by change-detection entries and live
+        shared-cache snapshots, or None if they could not all be read.
+        """
+        referenced: Set[str] = set()
+        if self.changes_dir is not None:
+            files = await asyncio.to_thread(_list_files, self.changes_dir, (".json",))
+            if not await self._refresh_refs(files, self._change_refs, _change_screenshot_refs):
+                return None
+            referenced.update(name for _, refs in self._change_refs.values() for name in refs)
+        if self.shared_cache is not None and self.shared_cache.enabled:
+            try:
+                snapshots = await asyncio.to_thread(self.shared_cache.values, "snapshot")
+            except Exception as e:
+                logger.warning(f"Could not read shared cache for screenshot references: {e}")
+                return None
+            referenced.update(
+                Path(snapshot["screenshot"]).name for snapshot in snapshots if snapshot.get("screenshot")
+            )
+        return referenced
+
+    async def _sweep_reports(self, now: float, codec: str) -> Dict[str, int]:
+        policy = self.policies.get("reports", RetentionPolicy())
+        counts = self._counts()
+
+        def info_for(entry: Dict[str, Any]) -> Optional[Tuple[str, FileInfo]]:
+            path = self.reports.path_for(entry)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return None
+            return entry["report_id"], (path, stat.st_size, stat.st_mtime)
+
+        found = [item for item in await self._step(info_for, self.reports.entries()) if item is not None]
+        report_ids = {info[0]: report_id for report_id, info in found}
+        files = sorted((info for _, info in found), key=lambda info: info[2])
+
+        expired, files = self._split_expired(files, policy, now)
+        await self._remove_reports(expired, report_ids, counts)
+
+        if policy.compress_after_days > 0:
+            cutoff = now - policy.compress_after_days * DAY_SECONDS
+            cold = [info for info in files if info[2] < cutoff and not is_compressed(info[0])]
+            compressed = dict(zip((info[0] for info in cold), await self._compress(cold, codec, counts)))
+            files = [compressed.get(info[0], info) for info in files]
+            for before, after in compressed.items():
+                report_ids[after[0]] = report_ids[before]
+
+        over, files = self._split_over_budget(files, policy)
+        await self._remove_reports(over, report_ids, counts)
+
+        counts["kept"] = len(files)
+        counts["kept_bytes"] = sum(info[1] for info in files)
+        return counts
+
+    async def _remove_reports(self, files: List[FileInfo], report_ids: Dict[Path, str], counts: Dict[str, int]):
+        for batch in _batches(files, self.batch_size):
+            if self._stopping:
+                return
+            for path, size, _ in batch:
+                if self.reports.remove(report_ids[path]):
+                    counts["deleted"] += 1
+                    counts["freed_bytes"] += size
+            await asyncio.sleep(self.pause)
+
+    async def _sweep_screenshots(self, now: float, refs_complete: bool) -> Dict[str, int]:
+        policy = self.policies.get("screenshots", RetentionPolicy())
+        counts = self._counts()
+        counts["orphans"] = 0
+        files = await asyncio.to_thread(_list_files, self.screenshots_dir, SCREENSHOT_SUFFIXES)
+
+        expired, files = self._split_expired(files, policy, now)
+        other_refs = await self._other_refs() if refs_complete else None
+        if other_refs is not None:
+            referenced: Set[str] = {name for _, refs in self._refs.values() for name in refs} | other_refs
+            grace_cutoff = now - ORPHAN_GRACE_SECONDS
+            orphans = [info for info in files if info[2] < grace_cutoff and info[0].name not in referenced]
+            orphan_paths = {info[0] for info in orphans}
+            files = [info for info in files if info[0] not in orphan_paths]
+            counts["orphans"] = len(orphans)
+            expired += orphans
+        over, files = self._split_over_budget(files, policy)
+
+        def delete(info: FileInfo) -> bool:
+            try:
+                info[0].unlink()
+            except FileNotFoundError:
+                return False
+            return True
+
+        doomed = expired + over
+        for info, deleted in zip(doomed, await self._step(delete, doomed)):
+            if deleted:
+                counts["deleted"] += 1
+                counts["freed_bytes"] += info[1]
+
+        counts["kept"] = len(files)
+        counts["kept_bytes"] = sum(info[1] for info in files)
+        return counts
+
+    @staticmethod
+    def _split_expired(files: List[FileInfo], policy: RetentionPolicy, now: float) -> Tuple[List[FileInfo], List[FileInfo]]:
+        """(files past the policy's age limit, the rest), both oldest first"""
+        if policy.max_age_days <= 0:
+            return [], files
+        cutoff = now - policy.max_age_days * DAY_SECONDS
+        return [info for info in files if info[2] < cutoff], [info for info in files if info[2] >= cutoff]
+
+    @staticmethod
+    def _split_over_budget(files: List[FileInfo], policy: RetentionPolicy) -> Tuple[List[FileInfo], List[FileInfo]]:
+        """(the oldest files that have to go to fit the size limit, the rest)"""
+        if policy.max_bytes <= 0:
+            return [], files
+        total = sum(info[1] for info in files)
+        cut = 0
+        while total > policy.max_bytes and cut < len(files):
+            total -= files[cut][1]
+            cut += 1
+        return files[:cut], files[cut:]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "codec": self.codec,
+            "policies": {kind: asdict(policy) for kind, policy in self.policies.items()},
+            "last_sweep": self.last_sweep,
+        }
+
+__all__ = [
+    "RetentionCollector",
+]
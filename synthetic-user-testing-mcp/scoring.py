@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Usability metric scoring for the Synthetic User Testing MCP Server.
+
+This module turns page snapshots (the dictionaries returned by
+``UserTester.visit_page``) into per-metric scores and weighted composite
+rankings. All metrics for all URLs are scored into one matrix and ranked in a
+single pass, using NumPy when it is installed and plain Python otherwise.
+
+Each metric has a scalar scorer (``METRIC_SCORERS``, for one snapshot) and a
+vectorized one (``VECTOR_SCORERS``): a feature extractor that reads the few
+numbers the metric needs from each snapshot, and a scoring function that
+turns the (snapshots x features) array into a column of scores with array
+operations. Both give the same scores.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import USABILITY_METRICS
+from lazy import optional_import
+
+# (metric, good threshold, poor threshold, weight) following the Web Vitals
+# "good"/"poor" boundaries; weights loosely mirror Lighthouse's performance score.
+SPEED_VITALS = [
+    ("ttfb", 800, 1800, 0.15),
+    ("fcp", 1800, 3000, 0.15),
+    ("lcp", 2500, 4000, 0.30),
+    ("tbt", 200, 600, 0.25),
+    ("cls", 0.1, 0.25, 0.15),
+]
+
+def score_clarity(url: str, page_info: Dict[str, Any]) -> float:
+    """How clear and understandable the page is"""
+    clarity_score = 5
+    if page_info.get("title"):
+        clarity_score += 2
+    if len(page_info.get("navigation_elements", [])) >= 3:
+        clarity_score += 2
+    if len(page_info.get("main_text", "")) > 100:
+        clarity_score += 1
+    return min(10, clarity_score)
+
+def score_speed(url: str, page_info: Dict[str, Any]) -> float:
+    """Score page speed 1-10 from Web Vitals, falling back to load time"""
+    performance = page_info.get("performance") or {}
+
+    weighted_total = 0.0
+    weight_sum = 0.0
+    for name, good, poor, weight in SPEED_VITALS:
+        value = performance.get(name)
+        if value is None:
+            continue
+        if value <= good:
+            vital_score = 10.0
+        elif value >= poor:
+            vital_score = 2.0
+        else:
+            # Interpolate linearly between the good and poor boundaries
+            vital_score = 10.0 - 8.0 * (value - good) / (poor - good)
+        weighted_total += vital_score * weight
+        weight_sum += weight
+
+    if weight_sum:
+        return max(1, min(10, round(weighted_total / weight_sum)))
+
+    load_time = page_info.get("load_time", 5)
+    if load_time < 1:
+        return 10
+    elif load_time < 2:
+        return 8
+    elif load_time < 3:
+        return 6
+    elif load_time < 5:
+        return 4
+    else:
+        return 2
+
+def comparable_speed_inputs(page_infos: Sequence[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[List[str]]]:
+    """
+    Snapshots whose speed inputs can be ranked against each other.
+
+    The HTTP tier measures only TTFB, while the browser records every Web
+    Vital. When the snapshots come from more than one tier, each one's
+    performance block is cut down to the vitals all of them have (TTFB, in
+    practice), so a browser-rendered page is not penalized for LCP or TBT
+    that the HTTP tier never measures. With no vital in common, every page
+    falls back to ``load_time``.
+
+    Returns:
+        (snapshots to score, the speed inputs they were cut down to, or None
+        when they all come from one tier and are used as they are)
+    """
+    if len({page_info.get("tier") for page_info in page_infos}) <= 1:
+        return list(page_infos), None
+    shared = [
+        name for name, *_ in SPEED_VITALS
+        if all((page_info.get("performance") or {}).get(name) is not None for page_info in page_infos)
+    ]
+    comparable = [{
+        **page_info,
+        "performance": {name: page_info["performance"][name] for name in shared},
+    } for page_info in page_infos]
+    return comparable, shared or ["load_time"]
+
+TRUST_WORDS = ("privacy", "security", "terms")
+
+def score_trust(url: str, page_info: Dict[str, Any]) -> float:
+    """How trustworthy and professional the page appears"""
+    trust_score = 5
+    if "https" in url:
+        trust_score += 2
+    if any(word in page_info.get("main_text", "").lower() for word in TRUST_WORDS):
+        trust_score += 2
+    if page_info.get("title"):
+        trust_score += 1
+    return min(10, trust_score)
+
+def score_navigation(url: str, page_info: Dict[str, Any]) -> float:
+    """How easy it is to find and reach content"""
+    nav_count = len(page_info.get("navigation_elements", []))
+    if nav_count >= 5:
+        return 9
+    elif nav_count >= 3:
+        return 7
+    elif nav_count >= 1:
+        return 5
+    else:
+        return 2
+
+def score_accessibility(url: str, page_info: Dict[str, Any]) -> float:
+    """How accessible the page is, from alt text, labels and document language"""
+    signals = page_info.get("page_signals")
+    if not signals:
+        return 5
+
+    accessibility_score = 10.0
+    images = signals.get("images", 0)
+    if images:
+        accessibility_score -= 4 * signals.get("images_missing_alt", 0) / images
+    inputs = signals.get("form_inputs", 0)
+    if inputs:
+        accessibility_score -= 3 * signals.get("unlabeled_inputs", 0) / inputs
+    if not signals.get("html_lang"):
+        accessibility_score -= 2
+    return max(1, round(accessibility_score))
+
+def score_mobile_friendliness(url: str, page_info: Dict[str, Any]) -> float:
+    """How well the page is set up for mobile devices"""
+    signals = page_info.get("page_signals")
+    if not signals:
+        return 5
+
+    mobile_score = 4
+    if signals.get("has_viewport_meta"):
+        mobile_score += 4
+    if not signals.get("horizontal_overflow"):
+        mobile_score += 2
+    return min(10, mobile_score)
+
+# Findability score by clicks from the page to a task's page (0, 1, 2, ... clicks)
+FINDABILITY_BY_CLICKS = (10, 10, 8, 6, 4)
+
+def score_findability(url: str, page_info: Dict[str, Any]) -> float:
+    """How few clicks key task pages are, from the link graph routes in page_info["findability"]"""
+    findability = page_info.get("findability") or {}
+    routes = list((findability.get("tasks") or {}).values())
+    if not routes:
+        return 5
+
+    task_scores = []
+    for route in routes:
+        if route is None:
+            # Not reachable through any link the site graph knows about
+            task_scores.append(2)
+        else:
+            task_scores.append(FINDABILITY_BY_CLICKS[min(route["clicks"], len(FINDABILITY_BY_CLICKS) - 1)])
+    return round(sum(task_scores) / len(task_scores))
+
+METRIC_SCORERS: Dict[str, Callable[[str, Dict[str, Any]], float]] = {
+    "clarity": score_clarity,
+    "speed": score_speed,
+    "trust": score_trust,
+    "navigation": score_navigation,
+    "accessibility": score_accessibility,
+    "mobile_friendliness": score_mobile_friendliness,
+    "findability": score_findability,
+}
+
+# Vectorized scorers: features are floats, with NaN for a missing value
+
+def _number(value: Any) -> float:
+    return float("nan") if value is None else float(value)
+
+def _clarity_features(url: str, page_info: Dict[str, Any]) -> Tuple[float, ...]:
+    return (
+        bool(page_info.get("title")),
+        len(page_info.get("navigation_elements", [])),
+        len(page_info.get("main_text", "")),
+    )
+
+def _clarity_scores(np, features):
+    has_title, nav_count, text_length = features.T
+    return np.minimum(10, 5 + 2 * has_title + 2 * (nav_count >= 3) + (text_length > 100))
+
+def _speed_features(url: str, page_info: Dict[str, Any]) -> Tuple[float, ...]:
+    performance = page_info.get("performance") or {}
+    vitals = tuple(_number(performance.get(name)) for name, *_ in SPEED_VITALS)
+    return vitals + (_number(page_info.get("load_time", 5)),)
+
+def _speed_scores(np, features):
+    weighted_total = np.zeros(len(features))
+    weight_sum = np.zeros(len(features))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for column, (name, good, poor, weight) in enumerate(SPEED_VITALS):
+            value = features[:, column]
+            present = ~np.isnan(value)
+            vital_score = np.where(value <= good, 10.0, np.where(
+                value >= poor, 2.0, 10.0 - 8.0 * (value - good) / (poor - good)
+            ))
+            weighted_total = weighted_total + np.where(present, vital_score * weight, 0.0)
+            weight_sum = weight_sum + np.where(present, weight, 0.0)
+        vitals_score = np.clip(np.round(weighted_total / weight_sum), 1, 10)
+
+    load_time = features[:, -1]
+    load_time_score = np.select([load_time < 1, load_time < 2, load_time < 3, load_time < 5], [10, 8, 6, 4], 2)
+    return np.where(weight_sum > 0, vitals_score, load_time_score)
+
+def _trust_features(url: str, page_info: Dict[str, Any]) -> Tuple[float, ...]:
+    text = page_info.get("main_text", "").lower()
+    return (
+        "https" in url,
+        any(word in text for word in TRUST_WORDS),
+        bool(page_info.get("title")),
+    )
+
+def _trust_scores(np, features):
+    is_https, mentions_policies, has_title = features.T
+    return np.minimum(10, 5 + 2 * is_https + 2 * mentions_policies + has_title)
+
+def _navigation_features(url: str, page_info: Dict[str, Any]) -> Tuple[float, ...]:
+    return (len(page_info.get("navigation_elements", [])),)
+
+def _navigation_scores(np, features):
+    nav_count = features[:, 0]
+    return np.select([nav_count >= 5, nav_count >= 3, nav_count >= 1], [9, 7, 5], 2)
+
+def _accessibility_features(url: str, page_info: Dict[str, Any]) -> Tuple[float, ...]:
+    signals = page_info.get("page_signals")
+    if not signals:
+        return (False, 0, 0, 0, 0, False)
+    return (
+        True,
+        signals.get("images", 0) or 0,
+        signals.get("images_missing_alt", 0),
+        signals.get("form_inputs", 0) or 0,
+        signals.get("unlabeled_inputs", 0),
+        bool(signals.get("html_lang")),
+    )
+
+def _accessibility_scores(np, features):
+    has_signals, images, missing_alt, inputs, unlabeled, has_lang = features.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        accessibility_score = 10.0 - np.where(images != 0, 4 * missing_alt / images, 0.0)
+        accessibility_score = accessibility_score - np.where(inputs != 0, 3 * unlabeled / inputs, 0.0)
+    accessibility_score = accessibility_score - np.where(has_lang > 0, 0, 2)
+    return np.where(has_signals > 0, np.maximum(1, np.round(accessibility_score)), 5)
+
+def _mobile_friendliness_features(url: str, page_info: Dict[str, Any]) -> Tuple[float, ...]:
+    signals = page_info.get("page_signals")
+    if not signals:
+        return (False, False, False)
+    return (True, bool(signals.get("has_viewport_meta")), bool(signals.get("horizontal_overflow")))
+
+def _mobile_friendliness_scores(np, features):
+    has_signals, has_viewport, overflows = features.T
+    return np.where(has_signals > 0, np.minimum(10, 4 + 4 * has_viewport + 2 * (1 - overflows)), 5)
+
+def _findability_features(url: str, page_info: Dict[str, Any]) -> Tuple[float, ...]:
+    # How many tasks are 0, 1, ... clicks away, and how many are unreachable
+    counts = [0] * (len(FINDABILITY_BY_CLICKS) + 1)
+    findability = page_info.get("findability") or {}
+    for route in (findability.get("tasks") or {}).values():
+        if route is None:
+            counts[-1] += 1
+        else:
+            counts[min(route["clicks"], len(FINDABILITY_BY_CLICKS) - 1)] += 1
+    return tuple(counts)
+
+def _findability_scores(np, features):
+    task_scores = np.asarray(FINDABILITY_BY_CLICKS + (2,), dtype=float)
+    tasks = features.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.round(features @ task_scores / tasks)
+    return np.where(tasks > 0, mean, 5)
+
+VECTOR_SCORERS: Dict[str, Tuple[Callable[[str, Dict[str, Any]], Tuple[float, ...]], Callable[..., Any]]] = {
+    "clarity": (_clarity_features, _clarity_scores),
+    "speed": (_speed_features, _speed_scores),
+    "trust": (_trust_features, _trust_scores),
+    "navigation": (_navigation_features, _navigation_scores),
+    "accessibility": (_accessibility_features, _accessibility_scores),
+    "mobile_friendliness": (_mobile_friendliness_features, _mobile_friendliness_scores),
+    "findability": (_findability_features, _findability_scores),
+}
+
+def default_weights(metrics: Sequence[str]) -> Dict[str, float]:
+    """Weights for the given metrics taken from config.USABILITY_METRICS"""
+    weights = {metric: USABILITY_METRICS.get(metric, {}).get("weight", 0.0) for metric in metrics}
+    if not any(weights.values()):
+        # None of the metrics has a configured weight - weigh them equally
+        weights = {metric: 1.0 for metric in metrics}
+    return weights
+
+class ScoringEngine:
+    """Scores many snapshots on many metrics and ranks them in one pass"""
+
+    def __init__(self, metrics: Sequence[str], weights: Optional[Dict[str, float]] = None):
+        unknown = [metric for metric in metrics if metric not in METRIC_SCORERS]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+
+        self.metrics = list(metrics)
+        raw_weights = weights if weights is not None else default_weights(self.metrics)
+        weight_vector = [float(raw_weights.get(metric, 0.0)) for metric in self.metrics]
+        total = sum(weight_vector)
+        if total <= 0:
+            raise ValueError("Metric weights must sum to a positive value")
+        self.weights = [weight / total for weight in weight_vector]
+
+    def score_matrix(self, urls: Sequence[str], page_infos: Sequence[Dict[str, Any]]):
+        """Return a (len(urls) x len(metrics)) matrix of metric scores"""
+        # NumPy is optional, and imported on first use to keep startup fast
+        np = optional_import("numpy")
+        if np is None:
+            scorers = [METRIC_SCORERS[metric] for metric in self.metrics]
+            return [[scorer(url, page_info) for scorer in scorers]
+                    for url, page_info in zip(urls, page_infos)]
+
+        matrix = np.empty((len(page_infos), len(self.metrics)))
+        if not len(page_infos):
+            return matrix
+        for column, metric in enumerate(self.metrics):
+            if metric in VECTOR_SCORERS:
+                extract, score = VECTOR_SCORERS[metric]
+                features = np.array([extract(url, page_info) for url, page_info in zip(urls, page_infos)], dtype=float)
+                matrix[:, column] = score(np, features)
+            else:
+                scorer = METRIC_SCORERS[metric]
+                matrix[:, column] = [scorer(url, page_info) for url, page_info in zip(urls, page_infos)]
+        return matrix
+
+    def score_one(self, url: str, page_info: Dict[str, Any]) -> Dict[str, float]:
+        """Score a single snapshot on every metric"""
+        return {metric: METRIC_SCORERS[metric](url, page_info) for metric in self.metrics}
+
+    def rank(self, urls: Sequence[str], page_infos: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Score and rank all URLs.
+
+        Returns:
+            Dictionary with per-URL "scores" and "composite" values, and
+            "rankings" for every metric plus the weighted "overall" ranking
+        """
+        matrix = self.score_matrix(urls, page_infos)
+        if optional_import("numpy") is not None:
+            composite, orders = self._rank_numpy(matrix)
+            score_rows = matrix.tolist()
+        else:
+            composite, orders = self._rank_python(matrix)
+            score_rows = matrix
+
+        columns = self.metrics + ["overall"]
+        rankings = {}
+        for column_index, column in enumerate(columns):
+            rankings[column] = [{
+                "rank": rank + 1,
+                "url": urls[row],
+                "score": round(composite[row], 2) if column == "overall" else score_rows[row][column_index]
+            } for rank, row in enumerate(orders[column_index])]
+
+        return {
+            "scores": [dict(zip(self.metrics, row)) for row in score_rows],
+            "composite": [round(value, 2) for value in composite],
+            "weights": dict(zip(self.metrics, self.weights)),
+            "rankings": rankings
+        }
+
+    def _rank_numpy(self, matrix):
+        np = optional_import("numpy")
+        composite = matrix @ np.asarray(self.weights)
+        # Sort every metric column and the composite together, highest first;
+        # a stable sort keeps input order for ties like sorted() did
+        combined = np.column_stack([matrix, composite])
+        orders = np.argsort(-combined, axis=0, kind="stable").T
+        return composite.tolist(), orders.tolist()
+
+    def _rank_python(self, matrix):
+        composite = [sum(score * weight for score, weight in zip(row, self.weights)) for row in matrix]
+        row_indices = range(len(matrix))
+        orders = [sorted(row_indices, key=lambda row: -matrix[row][column])
+                  for column in range(len(self.metrics))]
+        orders.append(sorted(row_indices, key=lambda row: -composite[row]))
+        return composite, orders
+
+__all__ = [
+    "FINDABILITY_BY_CLICKS",
+    "METRIC_SCORERS",
+    "SPEED_VITALS",
+    "TRUST_WORDS",
+    "VECTOR_SCORERS",
+    "ScoringEngine",
+    "comparable_speed_inputs",
+    "default_weights",
+]
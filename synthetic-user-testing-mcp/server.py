@@ -6,158 +6,492 @@ A Model Context Protocol server that simulates users interacting with websites
 and provides structured feedback for usability testing.
 """
 
+import argparse
 import asyncio
 import json
 import logging
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
 from fastmcp import FastMCP
-from playwright.async_api import async_playwright, Browser, Page
-from pydantic import BaseModel
+
+from admission import AdmissionController, AdmissionRejected, admitted, current_client
+from config import (
+    DATA_DIR, FINDABILITY_TASKS, REPORTS_DIR, SCREENSHOTS_DIR, SESSIONS_DIR, TASK_PATTERNS, USER_PERSONAS, ServerConfig
+)
+from change_detection import ChangeDetector
+from fast_fetch import FETCH_MODES, NOT_MODIFIED, FastFetcher, response_validators
+from feedback import generate_feedback as _generate_feedback
+from har_store import HAR_MODES, HarStore
+from link_graph import LinkGraphIndex, normalize_url
+from load_test import ContextPool, run_load_test
+from models import Feedback, JourneyStepResult, PerformanceMetrics, Session, TaskResult
+from monitoring import MonitorScheduler
+import page_scripts
+from progress import ProgressReporter, StepLog
+from report_catalog import REPORT_FORMATS, ReportCatalog
+from report_rendering import ReportCache
+import monte_carlo
+from resilience import (
+    RETRYABLE_STATUS_CODES, CircuitBreakers, RetryableStatusError, RetryReport, deadline, retry_call, with_deadline
+)
+from retention import RetentionCollector
+from scoring import METRIC_SCORERS, ScoringEngine, comparable_speed_inputs
+from session_store import SessionStore, classify_task
+from shared_cache import SharedCache, digest
+from tracing import instrument, traced, traced_tool, tracer
+
+if TYPE_CHECKING:
+    # Playwright is imported when the browser is first launched
+    from playwright.async_api import Browser, Page
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Data models
-class TaskResult(BaseModel):
-    success: bool
-    steps_taken: int
-    time_taken: float
-    steps_attempted: List[str]
-    error_message: Optional[str] = None
-
-class Feedback(BaseModel):
-    positives: List[str]
-    negatives: List[str]
-    overall_score: int  # 1-10
-    perspective: str
-    timestamp: datetime
-
-class Session(BaseModel):
-    session_id: str
-    url: str
-    task_description: Optional[str] = None
-    task_result: Optional[TaskResult] = None
-    feedback: Optional[Feedback] = None
-    screenshots: List[str] = []
-    created_at: datetime
+async def _navigate(page: "Page", url: str):
+    """Load ``url`` in ``page``, raising RetryableStatusError on a 429/5xx so retry_call retries it"""
+    response = await page.goto(url, wait_until="networkidle")
+    if response is not None and response.status in RETRYABLE_STATUS_CODES:
+        raise RetryableStatusError(response.status)
+    return response
 
 class UserTester:
     """Handles browser automation and user simulation"""
     
     def __init__(self):
-        self.browser: Optional[Browser] = None
-        self.sessions: Dict[str, Session] = {}
-        self.data_dir = Path("./data")
-        self.data_dir.mkdir(exist_ok=True)
+        self.browser: Optional["Browser"] = None
+        self._browser_lock = asyncio.Lock()
+        # Per-origin circuit breakers shared by the HTTP tier and the browser
+        self.breakers = CircuitBreakers()
+        self.fetcher = FastFetcher(
+            timeout=ServerConfig.DEFAULT_TIMEOUT,
+            user_agent=ServerConfig.BROWSER.user_agent,
+            retries=ServerConfig.MAX_RETRIES,
+            breakers=self.breakers
+        )
+        # Directories are created by whatever first writes to them, so
+        # startup does no filesystem work
+        self.data_dir = DATA_DIR
+        
+        self.store = SessionStore(SESSIONS_DIR)
+        self.sessions: Dict[str, Session] = self.store.sessions
+        
+        self.changes = ChangeDetector(self.data_dir / "changes")
+        # Navigation links of every visited page, as one graph per site
+        self.link_graph = LinkGraphIndex(self.data_dir / "link_graphs")
+        
+        self.reports = ReportCatalog(REPORTS_DIR)
+        self.report_cache = ReportCache()
+        
+        self.har_store = HarStore(
+            self.data_dir / "har",
+            max_bytes=ServerConfig.HAR_MAX_BYTES,
+            max_archives=ServerConfig.HAR_MAX_ARCHIVES
+        )
         
-        # Create subdirectories
-        (self.data_dir / "sessions").mkdir(exist_ok=True)
-        (self.data_dir / "screenshots").mkdir(exist_ok=True)
-        (self.data_dir / "reports").mkdir(exist_ok=True)
+        # Shared with the other server processes on this host
+        self.shared_cache = SharedCache(
+            Path(ServerConfig.SHARED_CACHE_PATH),
+            ttl=ServerConfig.SHARED_CACHE_TTL,
+            lease_seconds=ServerConfig.TOOL_DEADLINES["visit_page"]
+        )
     
     async def start_browser(self):
         """Initialize Playwright browser"""
-        if not self.browser:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(headless=True)
-            logger.info("Browser started")
+        if self.browser:
+            return
+        # Concurrent first calls must not launch a browser each
+        async with self._browser_lock:
+            if not self.browser:
+                with tracer.span("playwright.launch"):
+                    from playwright.async_api import async_playwright
+                    playwright = await async_playwright().start()
+                    browser = await playwright.chromium.launch(headless=True)
+                # Every call on the browser and the contexts/pages it creates is traced
+                self.browser = instrument(browser)
+                logger.info("Browser started")
     
     async def stop_browser(self):
         """Close browser"""
+        await self.fetcher.close()
         if self.browser:
             await self.browser.close()
             self.browser = None
             logger.info("Browser stopped")
     
-    async def visit_page(self, url: str) -> Dict[str, Any]:
-        """Visit a webpage and extract basic information"""
+    async def open_context(self, url: str, har_mode: str = "off", har_archive: Optional[str] = None):
+        """
+        Open a browser context, optionally recording or replaying a HAR archive.
+        
+        Returns:
+            (context, recording_id, replayed_archive_id) - pass the context and
+            recording id to close_context when done
+        """
+        if har_mode not in HAR_MODES:
+            raise ValueError(f"Unknown HAR mode: {har_mode}")
+        
         await self.start_browser()
         
-        context = await self.browser.new_context()
+        if har_mode == "record":
+            recording_id = str(uuid.uuid4())
+            context = await self.new_context(
+                record_har_path=str(self.har_store.recording_path(recording_id)),
+                record_har_content="embed"
+            )
+            return context, recording_id, None
+        
+        if har_mode == "replay":
+            archive_path = self.har_store.archive_path(har_archive, url)
+            if archive_path is None:
+                raise ValueError(f"No HAR archive recorded for {har_archive or url}")
+            context = await self.new_context()
+            # Requests missing from the archive fail instead of reaching the live site
+            await context.route_from_har(str(archive_path), not_found="abort")
+            return context, None, archive_path.stem
+        
+        return await self.new_context(), None, None
+    
+    async def new_context(self, **options):
+        """Open a browser context with the in-page helper library installed"""
+        await self.start_browser()
+        context = await self.browser.new_context(**options)
+        await page_scripts.install(context)
+        return context
+    
+    async def close_context(self, context, recording_id: Optional[str], url: str) -> Optional[Dict[str, Any]]:
+        """Close a context from open_context and store its HAR recording, if any"""
+        await context.close()
+        if recording_id is None:
+            return None
+        # Playwright writes the HAR on close; dedup its bodies off the event loop
+        with tracer.span("persist.har"):
+            return await asyncio.to_thread(self.har_store.finalize, recording_id, url)
+    
+    async def visit_page(
+        self,
+        url: str,
+        fetch_mode: str = "browser",
+        har_mode: str = "off",
+        har_archive: Optional[str] = None,
+        detect_changes: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Visit a webpage and extract basic information.
+        
+        fetch_mode "http" parses the raw HTML without a browser, "browser" always
+        renders the page, and "auto" tries HTTP first and escalates to the browser
+        when the page looks like it needs JavaScript. Recording or replaying a HAR
+        archive always uses the browser.
+        
+        With detect_changes, a page whose stored ETag/Last-Modified validators
+        are still current is not fetched again: the previous snapshot is
+        returned instead. Every result then carries a "change" entry saying
+        whether the content is new, unchanged or changed (with a diff).
+        
+        Otherwise, with the shared cache enabled, a snapshot another server
+        process (or call) took within the cache TTL is returned instead of
+        visiting the page again, marked with "cache": "hit" or "waited".
+        
+        The page's navigation links are added to its site's link graph.
+        """
+        if not self.shared_cache.enabled or har_mode != "off" or detect_changes or fetch_mode not in FETCH_MODES:
+            page_info = await self._visit_page(url, fetch_mode, har_mode, har_archive, detect_changes)
+        else:
+            page_info, status = await self.shared_cache.get_or_compute(
+                "snapshot",
+                f"{fetch_mode} {url}",
+                lambda: self._visit_page(url, fetch_mode),
+                cacheable=lambda info: "error" not in info
+            )
+            if status != "miss":
+                page_info["cache"] = status
+        # Replays reflect their archive, not the live site
+        if "error" not in page_info and not page_info.get("har_replayed"):
+            with tracer.span("persist.link_graph"):
+                self.link_graph.record(url, page_info.get("navigation_links"))
+        return page_info
+    
+    async def _visit_page(
+        self,
+        url: str,
+        fetch_mode: str = "browser",
+        har_mode: str = "off",
+        har_archive: Optional[str] = None,
+        detect_changes: bool = False
+    ) -> Dict[str, Any]:
+        if fetch_mode not in FETCH_MODES:
+            return {"error": f"Unknown fetch mode: {fetch_mode}", "url": url}
+        if har_mode != "off":
+            fetch_mode = "browser"
+            # Replays reflect their archive, not the live page
+            detect_changes = False
+        
+        validators = self.changes.validators(url) if detect_changes else {}
+        page_info = None
+        escalation_reason = None
+        if fetch_mode == "browser":
+            # Only revalidate (a conditional HEAD); the browser fetches the page
+            if validators and await self.fetcher.revalidate(url, validators):
+                return self._not_modified(url)
+        else:
+            snapshot, reason = await self.fetcher.fetch(url, validators)
+            if reason == NOT_MODIFIED:
+                return self._not_modified(url)
+            if snapshot is not None and (reason is None or fetch_mode == "http"):
+                snapshot["tier"] = "http"
+                page_info = snapshot
+            elif fetch_mode == "http":
+                return {"error": reason, "url": url, "tier": "http"}
+            else:
+                escalation_reason = reason
+        
+        if page_info is None:
+            report = RetryReport()
+            try:
+                if har_mode == "off":
+                    page_info = await retry_call(
+                        lambda: self._visit_with_browser(url), url, self.breakers, report=report
+                    )
+                else:
+                    # Recordings and replays are not retried against the live site
+                    page_info = await self._visit_with_browser(url, har_mode, har_archive)
+            except ValueError as e:
+                return {"error": str(e), "url": url}
+            except Exception as e:
+                logger.error(f"Error visiting page {url}: {e}")
+                return {"error": str(e), "url": url, "tier": "browser", **report.as_dict()}
+            if report.notable:
+                page_info["retries"] = report.as_dict()
+            page_info["tier"] = "browser"
+            if escalation_reason:
+                page_info["escalation_reason"] = escalation_reason
+        
+        if detect_changes and "error" not in page_info:
+            with tracer.span("persist.change"):
+                change = self.changes.record(url, page_info)
+            tracer.increment(f"change.{change['status']}")
+            page_info["change"] = change
+        return page_info
+    
+    def _not_modified(self, url: str) -> Dict[str, Any]:
+        """The previous snapshot of ``url``, which the server confirmed is current"""
+        page_info = self.changes.previous_snapshot(url)
+        with tracer.span("persist.change"):
+            page_info["change"] = self.changes.mark_not_modified(url)
+        tracer.increment("change.not_modified")
+        return page_info
+    
+    async def _visit_with_browser(self, url: str, har_mode: str = "off", har_archive: Optional[str] = None) -> Dict[str, Any]:
+        """Render a webpage in Chromium and extract basic information; navigation errors propagate"""
+        context, recording_id, replayed_archive = await self.open_context(url, har_mode, har_archive)
         page = await context.new_page()
         
+        request_count = 0
+        def _count_request(_request):
+            nonlocal request_count
+            request_count += 1
+        page.on("request", _count_request)
+        
         try:
             start_time = datetime.now()
-            await page.goto(url, wait_until="networkidle")
-            load_time = (datetime.now() - start_time).total_seconds()
-            
-            # Extract page information
-            title = await page.title()
+            response = await _navigate(page, url)
+            wall_time = (datetime.now() - start_time).total_seconds()
             
-            # Get main text content
-            main_text = await page.evaluate("""
-                () => {
-                    const content = document.querySelector('main') || document.body;
-                    return content ? content.innerText.slice(0, 1000) : '';
-                }
-            """)
+            # Read timings recorded by the browser for this same navigation
+            performance = await self._collect_performance(page, request_count)
+            if performance.load_event is not None:
+                load_time = performance.load_event / 1000
+            else:
+                load_time = wall_time
             
-            # Get navigation elements
-            nav_elements = await page.evaluate("""
-                () => {
-                    const navs = document.querySelectorAll('nav a, .nav a, .navigation a, header a');
-                    return Array.from(navs).slice(0, 10).map(a => a.textContent?.trim()).filter(Boolean);
-                }
-            """)
+            # Extract page information in one round trip
+            extracted = await page_scripts.call(page, "snapshot")
+            nav_links = extracted["nav_links"]
+            nav_elements = [link["text"] for link in nav_links]
             
             # Take screenshot
-            screenshot_path = self.data_dir / "screenshots" / f"{uuid.uuid4()}.png"
+            # Playwright creates the directory if needed
+            screenshot_path = SCREENSHOTS_DIR / f"{uuid.uuid4()}.png"
             await page.screenshot(path=str(screenshot_path))
             
-            return {
-                "title": title,
+            page_info = {
+                "title": extracted["title"],
                 "url": url,
                 "load_time": load_time,
-                "main_text": main_text,
+                "wall_time": wall_time,
+                "performance": performance.dict(),
+                "main_text": extracted["main_text"],
                 "navigation_elements": nav_elements,
-                "screenshot": str(screenshot_path)
+                "navigation_links": nav_links,
+                "forms": extracted["forms"],
+                "footer_text": extracted["footer_text"],
+                "page_signals": extracted["signals"],
+                "screenshot": str(screenshot_path),
+                "validators": response_validators(response.headers) if response else {}
             }
+            if replayed_archive:
+                page_info["har_replayed"] = replayed_archive
             
-        except Exception as e:
-            logger.error(f"Error visiting page {url}: {e}")
-            return {
-                "error": str(e),
-                "url": url
-            }
         finally:
-            await context.close()
+            har = await self.close_context(context, recording_id, url)
+        
+        if har:
+            page_info["har"] = har
+        return page_info
+    
+    async def _collect_performance(self, page: "Page", request_count: int) -> PerformanceMetrics:
+        """Read Navigation Timing, Paint Timing and Web Vitals from the loaded page"""
+        try:
+            timings = await page_scripts.call(page, "performance")
+        except Exception as e:
+            logger.warning(f"Could not collect performance timings: {e}")
+            timings = {}
+        return PerformanceMetrics(request_count=request_count, **timings)
+    
+    def save_session(self, session: Session):
+        """Register a session and persist it to disk"""
+        with tracer.span("persist.session"):
+            self.store.save(session)
+
+async def _run_monitor_job(url: str, task: Optional[str], perspective: str) -> Dict[str, Any]:
+    """One monitor job: simulate the task, or collect feedback when there is none"""
+    if task:
+        return await simulate_task(url, task, perspective)
+    # Monitors revisit the same pages, so unchanged ones are not re-scored
+    return await collect_feedback(url, perspective, detect_changes=True)
+
+async def _preload_browser():
+    try:
+        await tester.start_browser()
+    except Exception as e:
+        # Tools still try to launch it on first use
+        logger.warning(f"Could not start browser at startup: {e}")
+
+@asynccontextmanager
+async def _lifespan(server):
+    """Start the browser, the monitoring scheduler and retention sweeps before serving, stop them after"""
+    warmup = None
+    if ServerConfig.PRELOAD_BROWSER:
+        if ServerConfig.FAST_START:
+            # Answer the handshake right away; tools that need the browser
+            # in the meantime wait for this launch rather than starting another
+            warmup = asyncio.create_task(_preload_browser())
+        else:
+            await _preload_browser()
+    await scheduler.start()
+    await retention.start()
+    try:
+        yield
+    finally:
+        if warmup is not None:
+            await warmup
+        await retention.stop()
+        await scheduler.stop()
+        await cleanup()
 
 # Initialize the MCP server
-mcp = FastMCP("Synthetic User Testing")
+mcp = FastMCP("Synthetic User Testing", lifespan=_lifespan)
 tester = UserTester()
+scheduler = MonitorScheduler(
+    DATA_DIR / "monitors.json",
+    _run_monitor_job,
+    max_concurrency=ServerConfig.MONITOR_MAX_CONCURRENCY,
+    origin_interval=ServerConfig.MONITOR_ORIGIN_INTERVAL,
+    min_interval=ServerConfig.MONITOR_MIN_INTERVAL
+)
+retention = RetentionCollector(
+    tester.store,
+    tester.reports,
+    SCREENSHOTS_DIR,
+    ServerConfig.RETENTION,
+    interval=ServerConfig.RETENTION_INTERVAL,
+    codec=ServerConfig.RETENTION_CODEC,
+    batch_size=ServerConfig.RETENTION_BATCH,
+    pause=ServerConfig.RETENTION_PAUSE,
+    changes_dir=tester.changes.root,
+    shared_cache=tester.shared_cache
+)
+# Shared by every browser-backed tool, whichever client calls it
+admission = AdmissionController(
+    max_concurrency=ServerConfig.MAX_CONCURRENCY,
+    max_per_client=ServerConfig.MAX_PER_CLIENT,
+    max_queue=ServerConfig.MAX_QUEUE,
+    queue_timeout=ServerConfig.QUEUE_TIMEOUT
+)
+_all_metrics_engine = ScoringEngine(list(METRIC_SCORERS))
+tracer.configure(profile_mode=ServerConfig.PROFILE_MODE, profile_dir=DATA_DIR / "profiles")
 
 @mcp.tool()
-async def visit_page(url: str) -> Dict[str, Any]:
+@traced_tool("visit_page")
+@admitted(admission)
+@with_deadline(ServerConfig.TOOL_DEADLINES["visit_page"])
+async def visit_page(
+    url: str,
+    fetch_mode: str = "browser",
+    har_mode: str = "off",
+    har_archive: Optional[str] = None,
+    detect_changes: bool = False
+) -> Dict[str, Any]:
     """
     Visit a webpage and return structured information about it.
     
     Args:
         url: The URL to visit
+        fetch_mode: "browser" (always render; the only mode that takes a screenshot),
+                    "auto" (plain HTTP first, browser when the page needs JavaScript)
+                    or "http" (never launch a browser)
+        har_mode: "off", "record" (save network traffic to a HAR archive) or
+                  "replay" (serve responses from a recorded archive, offline)
+        har_archive: Archive id to replay (defaults to the latest one recorded for the URL)
+        detect_changes: Revalidate with ETag/Last-Modified and compare content
+                        fingerprints against the previous visit
         
     Returns:
-        Dictionary containing page title, main text, navigation elements, and metadata
+        Dictionary containing page title, main text, navigation elements, metadata,
+        the "tier" ("http" or "browser") that produced it and, with
+        detect_changes, a "change" entry ("new", "not_modified", "unchanged" or
+        "changed" with a diff)
     """
-    return await tester.visit_page(url)
+    return await tester.visit_page(url, fetch_mode, har_mode, har_archive, detect_changes)
+
+async def _score_snapshot(url: str, page_info: Dict[str, Any], perspective: str) -> tuple[Feedback, Dict[str, float]]:
+    """Feedback and metric scores for a snapshot, shared with other processes scoring the same snapshot"""
+    if not tester.shared_cache.enabled:
+        return _generate_feedback(page_info, perspective), _all_metrics_engine.score_one(url, page_info)
+    
+    async def score() -> Dict[str, Any]:
+        feedback = _generate_feedback(page_info, perspective)
+        return {"feedback": feedback.dict(), "metric_scores": _all_metrics_engine.score_one(url, page_info)}
+    
+    # Keyed on the whole snapshot, so only the exact snapshot (e.g. one served
+    # from the shared snapshot cache) reuses the scores
+    snapshot = {key: value for key, value in page_info.items() if key != "cache"}
+    scored, _ = await tester.shared_cache.get_or_compute("scores", f"{perspective} {digest(snapshot)}", score)
+    return Feedback(**{**scored["feedback"], "timestamp": datetime.now()}), scored["metric_scores"]
 
 @mcp.tool()
-async def collect_feedback(url: str, perspective: str = "new_user") -> Dict[str, Any]:
+@traced_tool("collect_feedback")
+@admitted(admission)
+@with_deadline(ServerConfig.TOOL_DEADLINES["collect_feedback"])
+async def collect_feedback(url: str, perspective: str = "new_user", detect_changes: bool = False) -> Dict[str, Any]:
     """
     Generate feedback after interacting with a website from a specific user perspective.
     
     Args:
         url: The URL that was tested
         perspective: User perspective ("new_user", "expert_user", "elderly_user", "mobile_user")
+        detect_changes: Reuse the previous feedback and scores when the page has
+                        not changed since it was last scored
         
     Returns:
         Dictionary containing structured feedback with positives, negatives, and overall score
     """
     # Visit the page to gather information for feedback
-    page_info = await tester.visit_page(url)
+    page_info = await tester.visit_page(url, detect_changes=detect_changes)
     
     if "error" in page_info:
         return {
@@ -165,26 +499,39 @@ async def collect_feedback(url: str, perspective: str = "new_user") -> Dict[str,
             "url": url
         }
     
-    # Generate perspective-based feedback
-    feedback = _generate_feedback(page_info, perspective)
+    change = page_info.pop("change", None)
+    previous = None
+    if change and change["status"] in ("not_modified", "unchanged"):
+        previous = tester.changes.previous_scores(url, perspective)
     
-    # Store feedback
     session_id = str(uuid.uuid4())
+    if previous:
+        # Same content as last time: record the session without re-scoring
+        feedback = Feedback(**{**previous["feedback"], "timestamp": datetime.now()})
+        metric_scores = previous["metric_scores"]
+        tracer.increment("change.scores_reused")
+    else:
+        # Generate perspective-based feedback
+        feedback, metric_scores = await _score_snapshot(url, page_info, perspective)
+        if change:
+            tester.changes.remember_scores(url, perspective, feedback.dict(), metric_scores, session_id)
+    
+    # Store feedback
     session = Session(
         session_id=session_id,
         url=url,
+        perspective=perspective,
         feedback=feedback,
+        snapshot=page_info,
+        metric_scores=metric_scores,
+        reused_from=previous["session_id"] if previous else None,
+        changes=change.get("diff") if change else None,
         created_at=datetime.now()
     )
     
-    tester.sessions[session_id] = session
-    
-    # Save session data
-    session_file = tester.data_dir / "sessions" / f"{session_id}.json"
-    with open(session_file, 'w') as f:
-        json.dump(session.dict(), f, indent=2, default=str)
+    tester.save_session(session)
     
-    return {
+    result = {
         "session_id": session_id,
         "url": url,
         "perspective": perspective,
@@ -193,125 +540,25 @@ async def collect_feedback(url: str, perspective: str = "new_user") -> Dict[str,
         "overall_score": feedback.overall_score,
         "timestamp": feedback.timestamp.isoformat()
     }
-
-def _generate_feedback(page_info: Dict[str, Any], perspective: str) -> Feedback:
-    """Generate realistic feedback based on page information and user perspective"""
-    positives = []
-    negatives = []
-    score = 5  # Base score
-    
-    # Analyze load time
-    load_time = page_info.get("load_time", 0)
-    if load_time < 2:
-        positives.append("Page loads quickly")
-        score += 1
-    elif load_time > 5:
-        negatives.append("Page takes too long to load")
-        score -= 1
-    
-    # Analyze title
-    title = page_info.get("title", "")
-    if title and len(title) > 10:
-        positives.append("Clear page title")
-    else:
-        negatives.append("Missing or unclear page title")
-        score -= 1
-    
-    # Analyze navigation
-    nav_elements = page_info.get("navigation_elements", [])
-    if len(nav_elements) >= 3:
-        positives.append("Good navigation structure")
-        score += 1
-    elif len(nav_elements) < 2:
-        negatives.append("Limited navigation options")
-        score -= 1
-    
-    # Analyze content
-    main_text = page_info.get("main_text", "")
-    if len(main_text) > 100:
-        positives.append("Sufficient content available")
-    else:
-        negatives.append("Limited content on page")
-        score -= 1
-    
-    # Perspective-specific feedback
-    if perspective == "new_user":
-        # New users need clear guidance
-        if "welcome" in main_text.lower() or "get started" in main_text.lower():
-            positives.append("Welcoming content for new users")
-        else:
-            negatives.append("Lacks clear guidance for new users")
-            score -= 1
-        
-        # New users might be overwhelmed by too many options
-        if len(nav_elements) > 8:
-            negatives.append("Too many navigation options might confuse new users")
-            score -= 1
-    
-    elif perspective == "expert_user":
-        # Expert users want efficiency
-        if len(nav_elements) >= 5:
-            positives.append("Comprehensive navigation for power users")
-        else:
-            negatives.append("Limited options for advanced users")
-            score -= 1
-        
-        # Expert users appreciate shortcuts
-        if "search" in str(nav_elements).lower():
-            positives.append("Search functionality available")
-        else:
-            negatives.append("No search functionality found")
-            score -= 1
-    
-    elif perspective == "elderly_user":
-        # Elderly users need larger, clearer elements
-        negatives.append("Cannot assess text size and contrast from automation")
-        score -= 1
-        
-        # Prefer simpler navigation
-        if len(nav_elements) <= 5:
-            positives.append("Simple, uncluttered navigation")
-        else:
-            negatives.append("Navigation might be too complex")
-            score -= 1
-    
-    elif perspective == "mobile_user":
-        # Mobile users need responsive design
-        negatives.append("Cannot assess mobile responsiveness from desktop automation")
-        score -= 1
-        
-        # Mobile users prefer concise content
-        if len(main_text) < 500:
-            positives.append("Concise content suitable for mobile")
-        else:
-            negatives.append("Content might be too lengthy for mobile")
-            score -= 1
-    
-    # Ensure score is within bounds
-    score = max(1, min(10, score))
-    
-    # Add some randomness to simulate real user variability
-    import random
-    if random.random() < 0.3:  # 30% chance of additional random feedback
-        random_negatives = [
-            "Button placement could be improved",
-            "Color scheme feels outdated",
-            "Some text is hard to read",
-            "Layout feels cluttered"
-        ]
-        negatives.append(random.choice(random_negatives))
-        score = max(1, score - 1)
-    
-    return Feedback(
-        positives=positives,
-        negatives=negatives,
-        overall_score=score,
-        perspective=perspective,
-        timestamp=datetime.now()
-    )
+    if change:
+        result["change"] = change["status"]
+        if "diff" in change:
+            result["changes"] = change["diff"]
+        if previous:
+            result["reused_from"] = previous["session_id"]
+    return result
 
 @mcp.tool()
-async def simulate_task(url: str, task_description: str, perspective: str = "new_user") -> Dict[str, Any]:
+@traced_tool("simulate_task")
+@admitted(admission)
+@with_deadline(ServerConfig.TOOL_DEADLINES["simulate_task"])
+async def simulate_task(
+    url: str,
+    task_description: str,
+    perspective: str = "new_user",
+    har_mode: str = "off",
+    har_archive: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Simulate a user attempting to complete a specific task on a website.
     
@@ -319,6 +566,9 @@ async def simulate_task(url: str, task_description: str, perspective: str = "new
         url: The URL to test
         task_description: Description of the task to attempt (e.g., "sign up", "find contact info")
         perspective: User perspective ("new_user", "expert_user", "elderly_user", "mobile_user")
+        har_mode: "off", "record" (save network traffic to a HAR archive) or
+                  "replay" (run against a recorded archive instead of the live site)
+        har_archive: Archive id to replay (defaults to the latest one recorded for the URL)
         
     Returns:
         Dictionary containing task success status, steps taken, and detailed results
@@ -328,37 +578,33 @@ async def simulate_task(url: str, task_description: str, perspective: str = "new
         session_id=session_id,
         url=url,
         task_description=task_description,
+        perspective=perspective,
         created_at=datetime.now()
     )
     
-    await tester.start_browser()
-    context = await tester.browser.new_context()
+    try:
+        context, recording_id, replayed_archive = await tester.open_context(url, har_mode, har_archive)
+    except ValueError as e:
+        return {"error": str(e), "url": url}
     page = await context.new_page()
     
-    steps_attempted = []
+    # Each step is streamed to the client as it happens
+    progress = ProgressReporter("simulate_task")
+    steps_attempted = StepLog(progress)
     start_time = datetime.now()
     success = False
     error_message = None
+    navigation = RetryReport()
     
     try:
-        # Navigate to page
-        await page.goto(url, wait_until="networkidle")
+        # Navigate to page, retrying transient network errors
+        await retry_call(
+            lambda: _navigate(page, url), url, tester.breakers, report=navigation
+        )
         steps_attempted.append(f"Navigated to {url}")
         
         # Simulate task based on description and perspective
-        if "sign up" in task_description.lower():
-            success, task_steps = await _simulate_signup_task(page, perspective)
-            steps_attempted.extend(task_steps)
-        elif "contact" in task_description.lower():
-            success, task_steps = await _simulate_contact_task(page, perspective)
-            steps_attempted.extend(task_steps)
-        elif "search" in task_description.lower():
-            success, task_steps = await _simulate_search_task(page, perspective)
-            steps_attempted.extend(task_steps)
-        else:
-            # Generic task simulation
-            success, task_steps = await _simulate_generic_task(page, task_description, perspective)
-            steps_attempted.extend(task_steps)
+        success, _ = await _run_task(page, task_description, perspective, steps_attempted)
             
     except Exception as e:
         error_message = str(e)
@@ -366,7 +612,13 @@ async def simulate_task(url: str, task_description: str, perspective: str = "new
         steps_attempted.append(f"Error occurred: {e}")
     
     finally:
-        await context.close()
+        try:
+            har = await tester.close_context(context, recording_id, url)
+        finally:
+            await progress.close()
+    
+    steps_attempted = list(steps_attempted)
+    session.har_archive = har["archive_id"] if har else replayed_archive
     
     time_taken = (datetime.now() - start_time).total_seconds()
     
@@ -379,25 +631,204 @@ async def simulate_task(url: str, task_description: str, perspective: str = "new
     )
     
     session.task_result = task_result
-    tester.sessions[session_id] = session
+    tester.save_session(session)
     
-    # Save session data
-    session_file = tester.data_dir / "sessions" / f"{session_id}.json"
-    with open(session_file, 'w') as f:
-        json.dump(session.dict(), f, indent=2, default=str)
-    
-    return {
+    result = {
         "session_id": session_id,
         "success": success,
         "steps_taken": len(steps_attempted),
         "time_taken": time_taken,
         "steps_attempted": steps_attempted,
+        "error_message": error_message,
+        "har_archive": session.har_archive
+    }
+    if navigation.notable:
+        result["retries"] = navigation.as_dict()
+    return result
+
+async def _run_task(
+    page: "Page", task_description: str, perspective: str, steps: Optional[List[str]] = None
+) -> tuple[bool, List[str]]:
+    """
+    Dispatch a task to the matching simulator on an already-open page.
+    
+    Steps are appended to ``steps`` (e.g. a StepLog) as they happen, when given.
+    """
+    task_type = classify_task(task_description)
+    if task_type == "signup":
+        return await _simulate_signup_task(page, perspective, steps)
+    elif task_type == "contact":
+        return await _simulate_contact_task(page, perspective, steps)
+    elif task_type == "search":
+        return await _simulate_search_task(page, perspective, steps)
+    else:
+        # Generic task simulation
+        return await _simulate_generic_task(page, task_description, perspective, steps)
+
+@mcp.tool()
+@traced_tool("simulate_journey")
+@admitted(admission)
+@with_deadline(ServerConfig.TOOL_DEADLINES["simulate_journey"])
+async def simulate_journey(
+    url: str,
+    steps: List[str],
+    perspective: str = "new_user",
+    stop_on_failure: bool = True
+) -> Dict[str, Any]:
+    """
+    Simulate a user working through an ordered, multi-step journey in one browser session.
+    
+    All steps share a single browser context and page, so cookies, cart contents
+    and the current location carry over from one step to the next.
+    
+    Args:
+        url: The URL where the journey starts
+        steps: Ordered task descriptions (e.g., ["browse products", "add item to cart", "checkout"])
+        perspective: User perspective ("new_user", "expert_user", "elderly_user", "mobile_user")
+        stop_on_failure: Stop at the first failed step instead of attempting the rest
+        
+    Returns:
+        Dictionary containing overall success, per-step results and timings
+    """
+    if not steps:
+        return {"error": "At least one journey step is required"}
+    
+    session_id = str(uuid.uuid4())
+    session = Session(
+        session_id=session_id,
+        url=url,
+        task_description=" → ".join(steps),
+        perspective=perspective,
+        created_at=datetime.now()
+    )
+    
+    context = await tester.new_context()
+    page = await context.new_page()
+    
+    journey_steps: List[JourneyStepResult] = []
+    steps_attempted = []
+    start_time = datetime.now()
+    error_message = None
+    navigation = RetryReport()
+    # Each finished step is streamed to the client
+    progress = ProgressReporter("simulate_journey", total=len(steps))
+    
+    try:
+        # Navigate once; every step continues from wherever the last one left off
+        await retry_call(
+            lambda: _navigate(page, url), url, tester.breakers, report=navigation
+        )
+        steps_attempted.append(f"Navigated to {url}")
+        
+        for index, task_description in enumerate(steps):
+            step_start = datetime.now()
+            step_error = None
+            try:
+                success, task_steps = await _run_task(page, task_description, perspective)
+            except Exception as e:
+                success, task_steps = False, [f"Error occurred: {e}"]
+                step_error = str(e)
+            
+            journey_steps.append(JourneyStepResult(
+                step_index=index,
+                task_description=task_description,
+                success=success,
+                time_taken=(datetime.now() - step_start).total_seconds(),
+                steps_attempted=task_steps,
+                url_after=page.url,
+                error_message=step_error
+            ))
+            steps_attempted.extend(f"[{index + 1}] {step}" for step in task_steps)
+            await progress.advance(
+                f"Step {index + 1}/{len(steps)} {'succeeded' if success else 'failed'}: {task_description}",
+                journey_steps[-1].dict()
+            )
+            
+            if not success and stop_on_failure:
+                steps_attempted.append(f"Stopped journey after failed step {index + 1}: {task_description}")
+                break
+    
+    except Exception as e:
+        error_message = str(e)
+        logger.error(f"Error during journey simulation: {e}")
+        steps_attempted.append(f"Error occurred: {e}")
+    
+    finally:
+        await context.close()
+    
+    time_taken = (datetime.now() - start_time).total_seconds()
+    success = len(journey_steps) == len(steps) and all(step.success for step in journey_steps)
+    
+    session.task_result = TaskResult(
+        success=success,
+        steps_taken=len(steps_attempted),
+        time_taken=time_taken,
+        steps_attempted=steps_attempted,
+        error_message=error_message
+    )
+    session.journey_steps = journey_steps
+    tester.save_session(session)
+    
+    result = {
+        "session_id": session_id,
+        "success": success,
+        "steps_completed": sum(1 for step in journey_steps if step.success),
+        "total_steps": len(steps),
+        "time_taken": time_taken,
+        "steps": [step.dict() for step in journey_steps],
         "error_message": error_message
     }
+    if navigation.notable:
+        result["retries"] = navigation.as_dict()
+    return result
+
+# Words in a task description that say nothing about where its page is
+_ROUTE_STOP_WORDS = {"find", "page", "with", "from", "your", "that", "this", "into", "want", "where", "some", "information"}
 
-async def _simulate_signup_task(page: Page, perspective: str) -> tuple[bool, List[str]]:
+def _route_keywords(task_description: str) -> List[str]:
+    """Keywords a page for the task has in its URL or link text"""
+    task_type = classify_task(task_description)
+    if task_type in TASK_PATTERNS:
+        return TASK_PATTERNS[task_type]["target_elements"]
+    return [word for word in task_description.lower().split()
+            if len(word) > 3 and word.isalnum() and word not in _ROUTE_STOP_WORDS]
+
+async def _follow_known_route(page: "Page", keywords: List[str], steps: List[str]) -> bool:
+    """
+    Click along the shortest route the site's link graph knows from the
+    current page to a page matching ``keywords``.
+    
+    Returns:
+        Whether the page reached matches
+    """
+    if not keywords:
+        return False
+    for _ in range(ServerConfig.ROUTE_MAX_CLICKS + 1):
+        route = tester.link_graph.route(page.url, keywords)
+        if route is None:
+            return False
+        if route["clicks"] == 0:
+            return True
+        next_url = route["path"][1]
+        link = await page_scripts.call(page, "findLink", next_url)
+        if not link:
+            steps.append(f"Known route to {route['url']} not linked from this page")
+            return False
+        try:
+            async with page.expect_navigation(wait_until="domcontentloaded", timeout=5000):
+                await page.locator("a").nth(link["index"]).click()
+        except Exception:
+            steps.append(f"Link to {next_url} did not navigate")
+            return False
+        steps.append(f"Followed known route to {route['url']} ({route['clicks']} clicks): clicked {link['text'] or next_url}")
+    return False
+
+@traced("simulate.signup")
+async def _simulate_signup_task(
+    page: "Page", perspective: str, steps: Optional[List[str]] = None
+) -> tuple[bool, List[str]]:
     """Simulate signup task with realistic user behavior"""
-    steps = []
+    steps = [] if steps is None else steps
     
     try:
         # Look for signup button/link
@@ -407,32 +838,32 @@ async def _simulate_signup_task(page: Page, perspective: str) -> tuple[bool, Lis
         ]
         
         signup_found = False
-        for selector in signup_selectors:
+        match = await page_scripts.wait_for(page, "firstMatch", signup_selectors)
+        if match:
             try:
-                element = await page.wait_for_selector(selector, timeout=2000)
-                if element:
-                    await element.click()
-                    steps.append(f"Clicked signup element: {selector}")
-                    signup_found = True
-                    break
-            except:
-                continue
+                await page.locator(match["selector"]).first.click()
+                steps.append(f"Clicked signup element: {match['selector']}")
+                signup_found = True
+            except Exception:
+                pass
         
         if not signup_found:
             # Simulate user confusion - try navigation menu
             steps.append("Could not find obvious signup button")
             
-            # Try clicking on common navigation items
-            nav_items = await page.query_selector_all('nav a, .nav a, header a')
-            for item in nav_items[:3]:  # Only try first 3
-                text = await item.inner_text()
-                if any(word in text.lower() for word in ['sign', 'register', 'join', 'account']):
-                    await item.click()
-                    steps.append(f"Tried navigation item: {text}")
-                    break
-            else:
-                steps.append("Failed to find signup in navigation")
-                return False, steps
+            # A route through the site's known links beats guessing
+            if not await _follow_known_route(page, TASK_PATTERNS["signup"]["target_elements"], steps):
+                # Try clicking on common navigation items (only the first 3)
+                nav_selector = 'nav a, .nav a, header a'
+                item = await page_scripts.call(
+                    page, "findByText", nav_selector, ['sign', 'register', 'join', 'account'], 3
+                )
+                if item:
+                    await page.locator(nav_selector).nth(item["index"]).click()
+                    steps.append(f"Tried navigation item: {item['text']}")
+                else:
+                    steps.append("Failed to find signup in navigation")
+                    return False, steps
         
         # Wait for potential form
         await page.wait_for_timeout(1000)
@@ -458,17 +889,18 @@ async def _simulate_signup_task(page: Page, perspective: str) -> tuple[bool, Lis
                 # Submit form
                 submit_button = await page.query_selector('button[type="submit"], input[type="submit"], button:has-text("Sign Up")')
                 if submit_button:
-                    await submit_button.click()
+                    # Wait (up to 3s) for a success or error message to show up
+                    verdict = await page_scripts.observe_outcome(
+                        page, TASK_PATTERNS["signup"]["outcome_signals"], submit_button.click, timeout=3000
+                    )
                     steps.append("Clicked submit button")
                     
-                    # Wait for response
-                    await page.wait_for_timeout(3000)
-                    
-                    # Check for success indicators
-                    success_indicators = await page.query_selector_all('.success, .welcome, .confirmation')
-                    if success_indicators or "welcome" in (await page.content()).lower():
-                        steps.append("Signup appears successful")
+                    if verdict["status"] == "success":
+                        steps.append(f"Signup appears successful ({verdict['signal']})")
                         return True, steps
+                    elif verdict["status"] == "error":
+                        steps.append(f"Signup form showed an error ({verdict['signal']})")
+                        return False, steps
                     else:
                         steps.append("Signup form submitted but no clear success indication")
                         return False, steps
@@ -480,9 +912,12 @@ async def _simulate_signup_task(page: Page, perspective: str) -> tuple[bool, Lis
         steps.append(f"Error during signup simulation: {e}")
         return False, steps
 
-async def _simulate_contact_task(page: Page, perspective: str) -> tuple[bool, List[str]]:
+@traced("simulate.contact")
+async def _simulate_contact_task(
+    page: "Page", perspective: str, steps: Optional[List[str]] = None
+) -> tuple[bool, List[str]]:
     """Simulate finding contact information"""
-    steps = []
+    steps = [] if steps is None else steps
     
     try:
         # Look for contact links
@@ -491,30 +926,28 @@ async def _simulate_contact_task(page: Page, perspective: str) -> tuple[bool, Li
             '.contact', '#contact', 'a[href*="about"]'
         ]
         
-        for selector in contact_selectors:
+        signals = TASK_PATTERNS["contact"]["outcome_signals"]
+        match = await page_scripts.wait_for(page, "firstMatch", contact_selectors)
+        if match:
             try:
-                element = await page.wait_for_selector(selector, timeout=2000)
-                if element:
-                    await element.click()
-                    steps.append(f"Clicked contact link: {selector}")
-                    await page.wait_for_timeout(1000)
-                    
-                    # Look for contact information
-                    content = await page.content()
-                    if any(indicator in content.lower() for indicator in ['email', 'phone', '@', 'tel:', 'mailto:']):
-                        steps.append("Found contact information")
-                        return True, steps
-                    break
-            except:
-                continue
+                # Look for contact information as the page opens, or already on it
+                verdict = await page_scripts.observe_outcome(
+                    page, signals, page.locator(match["selector"]).first.click, timeout=1000
+                )
+                steps.append(f"Clicked contact link: {match['selector']}")
+                if verdict["status"] != "success":
+                    verdict = await page_scripts.call(page, "checkOutcome", signals, None)
+                if verdict and verdict["status"] == "success":
+                    steps.append("Found contact information")
+                    return True, steps
+            except Exception:
+                pass
         
         # Try footer
-        footer = await page.query_selector('footer')
-        if footer:
-            footer_text = await footer.inner_text()
-            if any(indicator in footer_text.lower() for indicator in ['email', 'phone', '@']):
-                steps.append("Found contact info in footer")
-                return True, steps
+        verdict = await page_scripts.call(page, "checkOutcome", signals, 'footer')
+        if verdict and verdict["status"] == "success":
+            steps.append("Found contact info in footer")
+            return True, steps
         
         steps.append("Could not find contact information")
         return False, steps
@@ -523,9 +956,12 @@ async def _simulate_contact_task(page: Page, perspective: str) -> tuple[bool, Li
         steps.append(f"Error during contact search: {e}")
         return False, steps
 
-async def _simulate_search_task(page: Page, perspective: str) -> tuple[bool, List[str]]:
+@traced("simulate.search")
+async def _simulate_search_task(
+    page: "Page", perspective: str, steps: Optional[List[str]] = None
+) -> tuple[bool, List[str]]:
     """Simulate using search functionality"""
-    steps = []
+    steps = [] if steps is None else steps
     
     try:
         # Look for search input
@@ -534,27 +970,29 @@ async def _simulate_search_task(page: Page, perspective: str) -> tuple[bool, Lis
             '.search input', '#search', '.search-box input'
         ]
         
-        for selector in search_selectors:
+        match = await page_scripts.wait_for(page, "firstMatch", search_selectors)
+        if match:
             try:
-                search_input = await page.wait_for_selector(selector, timeout=2000)
-                if search_input:
-                    await search_input.fill("test query")
-                    steps.append(f"Entered search query in: {selector}")
-                    
-                    # Try to submit
-                    await search_input.press('Enter')
-                    steps.append("Pressed Enter to search")
-                    
-                    await page.wait_for_timeout(2000)
-                    
-                    # Check for results
-                    results = await page.query_selector_all('.result, .search-result, .results li')
-                    if results:
-                        steps.append(f"Found {len(results)} search results")
-                        return True, steps
-                    break
-            except:
-                continue
+                search_input = page.locator(match["selector"]).first
+                await search_input.fill("test query")
+                steps.append(f"Entered search query in: {match['selector']}")
+                
+                # Try to submit, and wait (up to 2s) for results to show up
+                verdict = await page_scripts.observe_outcome(
+                    page, TASK_PATTERNS["search"]["outcome_signals"],
+                    lambda: search_input.press('Enter'), timeout=2000
+                )
+                steps.append("Pressed Enter to search")
+                
+                # Check for results
+                if verdict["status"] == "success":
+                    results = await page_scripts.call(page, "count", '.result, .search-result, .results li')
+                    steps.append(f"Found {results} search results")
+                    return True, steps
+                if verdict["status"] == "error":
+                    steps.append(f"Search showed no results ({verdict['signal']})")
+            except Exception:
+                pass
         
         steps.append("Could not find or use search functionality")
         return False, steps
@@ -563,33 +1001,38 @@ async def _simulate_search_task(page: Page, perspective: str) -> tuple[bool, Lis
         steps.append(f"Error during search simulation: {e}")
         return False, steps
 
-async def _simulate_generic_task(page: Page, task_description: str, perspective: str) -> tuple[bool, List[str]]:
+@traced("simulate.generic")
+async def _simulate_generic_task(
+    page: "Page", task_description: str, perspective: str, steps: Optional[List[str]] = None
+) -> tuple[bool, List[str]]:
     """Simulate a generic task based on description"""
-    steps = []
+    steps = [] if steps is None else steps
     
     try:
         # Extract keywords from task description
         keywords = task_description.lower().split()
         
-        # Look for relevant links/buttons
-        all_links = await page.query_selector_all('a, button')
-        
-        for link in all_links[:10]:  # Limit to first 10 to simulate realistic behavior
+        # Look for relevant links/buttons, only among the first 10 to simulate realistic behavior
+        link_selector = 'a, button'
+        link = await page_scripts.call(page, "findByText", link_selector, keywords, 10)
+        if link:
             try:
-                text = await link.inner_text()
-                if any(keyword in text.lower() for keyword in keywords):
-                    await link.click()
-                    steps.append(f"Clicked element with text: {text}")
-                    await page.wait_for_timeout(1000)
-                    
-                    # Simple success check - if page changed
-                    current_url = page.url
-                    if current_url != page.url:
-                        steps.append("Page navigation occurred")
-                        return True, steps
-                    break
-            except:
-                continue
+                start_url = page.url
+                await page.locator(link_selector).nth(link["index"]).click()
+                steps.append(f"Clicked element with text: {link['text']}")
+                await page.wait_for_timeout(1000)
+                
+                # Simple success check - if page changed
+                if page.url != start_url:
+                    steps.append("Page navigation occurred")
+                    return True, steps
+            except Exception:
+                pass
+        
+        # Fall back to the shortest route the site's link graph knows
+        if await _follow_known_route(page, _route_keywords(task_description), steps):
+            steps.append(f"Reached a page for the task: {page.url}")
+            return True, steps
         
         steps.append(f"Could not complete task: {task_description}")
         return False, steps
@@ -599,116 +1042,244 @@ async def _simulate_generic_task(page: Page, task_description: str, perspective:
         return False, steps
 
 @mcp.tool()
-async def analyze_usability(urls: List[str], metrics: List[str] = ["clarity", "speed", "trust"]) -> Dict[str, Any]:
+@traced_tool("load_test")
+async def load_test(
+    url: str,
+    task: str,
+    personas: Optional[List[str]] = None,
+    concurrent_users: int = 10,
+    duration: int = 60,
+    ramp_up: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run many simultaneous virtual users through a task to see how usability degrades under load.
+    
+    Args:
+        url: The URL every virtual user starts from
+        task: Task description each user repeats (as in simulate_task)
+        personas: Personas assigned to users in turn (defaults to ["new_user"])
+        concurrent_users: Number of simultaneous virtual users; each holds an
+                          admission slot, so at most MAX_CONCURRENCY and
+                          MAX_PER_CLIENT
+        duration: Seconds to keep starting new iterations
+        ramp_up: Seconds over which users are started (defaults to a quarter of duration)
+        
+    Returns:
+        Dictionary with overall success rate, throughput and load-time percentiles,
+        a per-persona breakdown and a "timeline" of time buckets with active users,
+        throughput, p95 load time and success rate
+    """
+    personas = personas or ["new_user"]
+    unknown = [persona for persona in personas if persona not in USER_PERSONAS]
+    if unknown:
+        return {"error": f"Unknown personas: {', '.join(unknown)}"}
+    max_users = min(ServerConfig.LOAD_TEST_MAX_USERS, admission.max_concurrency, admission.max_per_client)
+    if not 1 <= concurrent_users <= max_users:
+        return {"error": f"concurrent_users must be between 1 and {max_users}"}
+    if not 0 < duration <= ServerConfig.LOAD_TEST_MAX_DURATION:
+        return {"error": f"duration must be between 1 and {ServerConfig.LOAD_TEST_MAX_DURATION} seconds"}
+    ramp_up = duration / 4 if ramp_up is None else min(ramp_up, duration)
+    
+    await tester.start_browser()
+    # Every browser context the test opens holds one of the client's admission slots
+    client = current_client()
+    pool = ContextPool(tester.new_context, concurrent_users, admit=lambda: admission.slot(client))
+    
+    async def iteration(context, persona: str) -> Dict[str, Any]:
+        # Each iteration gets the same budget as a single simulate_task call
+        with deadline(ServerConfig.TOOL_DEADLINES["simulate_task"]):
+            page = await context.new_page()
+            try:
+                start_time = datetime.now()
+                await retry_call(lambda: _navigate(page, url), url, tester.breakers)
+                load_time_ms = (datetime.now() - start_time).total_seconds() * 1000
+                success, _ = await _run_task(page, task, persona)
+                return {"success": success, "load_time_ms": load_time_ms}
+            finally:
+                await page.close()
+    
+    load_test_id = str(uuid.uuid4())
+    try:
+        result = await run_load_test(pool, iteration, personas, concurrent_users, duration, ramp_up)
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected load_test for client {client}: {e}")
+        return {"error": str(e), "status": 429, "retry_after": e.retry_after}
+    result = {"load_test_id": load_test_id, "url": url, "task": task, **result}
+    
+    result_path = DATA_DIR / "load_tests" / f"{load_test_id}.json"
+    with tracer.span("persist.load_test"):
+        result_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(result_path, 'w') as f:
+            json.dump(result, f, indent=2)
+    
+    return result
+
+@mcp.tool()
+@traced_tool("simulate_population")
+async def simulate_population(
+    session_id: str,
+    personas: Optional[List[str]] = None,
+    users: int = monte_carlo.DEFAULT_USERS,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Estimate outcomes for thousands of synthetic users from one recorded run.
+    
+    Takes the steps, findability and timings of a simulate_task or
+    simulate_journey session and samples synthetic users of each persona
+    through them, without opening a browser.
+    
+    Args:
+        session_id: Session of a previous simulate_task or simulate_journey run
+        personas: Personas to simulate (defaults to all configured personas)
+        users: Synthetic users per persona
+        seed: Seed for reproducible results
+        
+    Returns:
+        Dictionary with, per persona, the success probability and its 95%
+        confidence interval, time-to-complete percentiles and drop-off per step
+    """
+    session = tester.sessions.get(session_id) or tester.store.reload(session_id)
+    if session is None:
+        return {"error": f"Session not found: {session_id}"}
+    
+    trace = monte_carlo.trace_from_session(session.dict())
+    try:
+        result = await asyncio.to_thread(
+            monte_carlo.simulate_population, trace, personas, users, seed, session.perspective
+        )
+    except ValueError as e:
+        return {"error": str(e), "session_id": session_id}
+    
+    return {"session_id": session_id, "url": session.url, **result}
+
+@mcp.tool()
+@traced_tool("analyze_usability")
+@admitted(admission)
+@with_deadline(ServerConfig.TOOL_DEADLINES["analyze_usability"])
+async def analyze_usability(
+    urls: List[str],
+    metrics: List[str] = ["clarity", "speed", "trust"],
+    weights: Optional[Dict[str, float]] = None,
+    fetch_mode: str = "auto"
+) -> Dict[str, Any]:
     """
     Compare multiple pages or flows and rank them on given metrics.
     
     Args:
-        urls: List of URLs to compare
-        metrics: List of metrics to evaluate ("clarity", "speed", "trust", "navigation")
+        urls: List of URLs to compare (at most ANALYZE_MAX_URLS, visited
+              ANALYZE_CONCURRENCY at a time)
+        metrics: List of metrics to evaluate ("clarity", "speed", "trust", "navigation",
+                 "accessibility", "mobile_friendliness", "findability")
+        weights: Optional weight per metric for the overall ranking
+                 (defaults to the weights in config.USABILITY_METRICS)
+        fetch_mode: How pages are fetched ("auto", "http" or "browser", see visit_page)
         
     Returns:
         Dictionary containing comparative analysis and rankings
     """
-    if len(urls) > 5:
-        return {"error": "Maximum 5 URLs allowed for comparison"}
+    max_urls = ServerConfig.ANALYZE_MAX_URLS
+    if max_urls and len(urls) > max_urls:
+        return {"error": f"Maximum {max_urls} URLs allowed for comparison"}
     
-    results = []
-    
-    for url in urls:
+    try:
+        engine = ScoringEngine(metrics, weights)
+    except ValueError as e:
+        return {"error": str(e)}
+    
+    # Each URL's scores are streamed to the client as soon as it is analyzed
+    progress = ProgressReporter("analyze_usability", total=len(urls))
+    limit = asyncio.Semaphore(max(1, ServerConfig.ANALYZE_CONCURRENCY))
+    finished = 0
+    
+    async def analyze(url: str):
+        """(page_info, feedback) for ``url``, or (None, failure)"""
+        nonlocal finished
         try:
             # Visit page and collect feedback
-            page_info = await tester.visit_page(url)
+            async with limit:
+                page_info = await tester.visit_page(url, fetch_mode)
             if "error" in page_info:
-                continue
-            
-            feedback = _generate_feedback(page_info, "expert_user")
-            
-            # Calculate metric scores
-            scores = {}
-            
-            if "clarity" in metrics:
-                clarity_score = 5
-                if page_info.get("title"):
-                    clarity_score += 2
-                if len(page_info.get("navigation_elements", [])) >= 3:
-                    clarity_score += 2
-                if len(page_info.get("main_text", "")) > 100:
-                    clarity_score += 1
-                scores["clarity"] = min(10, clarity_score)
-            
-            if "speed" in metrics:
-                load_time = page_info.get("load_time", 5)
-                if load_time < 1:
-                    scores["speed"] = 10
-                elif load_time < 2:
-                    scores["speed"] = 8
-                elif load_time < 3:
-                    scores["speed"] = 6
-                elif load_time < 5:
-                    scores["speed"] = 4
-                else:
-                    scores["speed"] = 2
-            
-            if "trust" in metrics:
-                trust_score = 5
-                if "https" in url:
-                    trust_score += 2
-                if any(word in page_info.get("main_text", "").lower() 
-                       for word in ["privacy", "security", "terms"]):
-                    trust_score += 2
-                if page_info.get("title"):
-                    trust_score += 1
-                scores["trust"] = min(10, trust_score)
-            
-            if "navigation" in metrics:
-                nav_count = len(page_info.get("navigation_elements", []))
-                if nav_count >= 5:
-                    scores["navigation"] = 9
-                elif nav_count >= 3:
-                    scores["navigation"] = 7
-                elif nav_count >= 1:
-                    scores["navigation"] = 5
-                else:
-                    scores["navigation"] = 2
-            
-            results.append({
-                "url": url,
-                "scores": scores,
-                "overall_score": feedback.overall_score,
-                "load_time": page_info.get("load_time", 0)
-            })
-            
+                # Report pages that could not be analyzed instead of dropping them
+                outcome = None, {
+                    key: page_info[key]
+                    for key in ("url", "error", "tier", "attempts", "retried_errors", "timed_out", "circuit_open")
+                    if key in page_info
+                }
+            else:
+                feedback, _ = await _score_snapshot(url, page_info, "expert_user")
+                if "findability" in metrics:
+                    page_info["findability"] = _findability(url)
+                outcome = page_info, feedback
         except Exception as e:
             logger.error(f"Error analyzing {url}: {e}")
-            continue
-    
-    # Rank results
-    rankings = {}
-    for metric in metrics:
-        ranked = sorted(results, key=lambda x: x["scores"].get(metric, 0), reverse=True)
-        rankings[metric] = [{
-            "rank": i + 1,
-            "url": item["url"],
-            "score": item["scores"].get(metric, 0)
-        } for i, item in enumerate(ranked)]
-    
-    # Overall ranking
-    overall_ranked = sorted(results, key=lambda x: x["overall_score"], reverse=True)
-    rankings["overall"] = [{
-        "rank": i + 1,
-        "url": item["url"],
-        "score": item["overall_score"]
-    } for i, item in enumerate(overall_ranked)]
+            outcome = None, {"url": url, "error": str(e)}
+        
+        finished += 1
+        page_info, detail = outcome
+        if page_info is None:
+            await progress.advance(f"Could not analyze {url} ({finished}/{len(urls)})", detail)
+        elif progress.active:
+            # Unranked: rankings need every URL
+            await progress.advance(f"Analyzed {url} ({finished}/{len(urls)})", {
+                "url": url,
+                "scores": engine.score_one(url, page_info),
+                "feedback_score": detail.overall_score,
+                "load_time": page_info.get("load_time", 0),
+                "tier": page_info.get("tier")
+            })
+        return outcome
+    
+    outcomes = await asyncio.gather(*(analyze(url) for url in urls))
+    
+    analyzed_urls = []
+    page_infos = []
+    feedback_scores = []
+    failed_urls = []
+    for url, (page_info, detail) in zip(urls, outcomes):
+        if page_info is None:
+            failed_urls.append(detail)
+        else:
+            analyzed_urls.append(url)
+            page_infos.append(page_info)
+            feedback_scores.append(detail.overall_score)
+    
+    # Score every metric for every URL and rank them in one pass
+    # Pages from different tiers are compared on the speed inputs they share
+    scoring_inputs, speed_basis = comparable_speed_inputs(page_infos)
+    scored = engine.rank(analyzed_urls, scoring_inputs)
+    
+    results = [{
+        "url": url,
+        "scores": scores,
+        "overall_score": composite,
+        "feedback_score": feedback_score,
+        "load_time": page_info.get("load_time", 0),
+        "performance": page_info.get("performance"),
+        "tier": page_info.get("tier"),
+        "retries": page_info.get("retries"),
+        "findability": page_info.get("findability")
+    } for url, scores, composite, feedback_score, page_info in zip(
+        analyzed_urls, scored["scores"], scored["composite"], feedback_scores, page_infos
+    )]
     
     return {
         "metrics_analyzed": metrics,
+        "weights": scored["weights"],
         "total_urls": len(results),
-        "rankings": rankings,
+        "rankings": scored["rankings"],
         "detailed_results": results,
+        "failed_urls": failed_urls,
+        "speed_basis": speed_basis if "speed" in metrics else None,
         "analysis_summary": _generate_analysis_summary(results, metrics)
     }
 
+def _findability(url: str) -> Dict[str, Any]:
+    """Clicks from ``url`` to each key task's page, in its site's link graph"""
+    return tester.link_graph.findability(url, {
+        task: TASK_PATTERNS[task]["target_elements"] for task in FINDABILITY_TASKS
+    })
+
 def _generate_analysis_summary(results: List[Dict], metrics: List[str]) -> str:
     """Generate natural language summary of usability analysis"""
     if not results:
@@ -733,6 +1304,74 @@ def _generate_analysis_summary(results: List[Dict], metrics: List[str]) -> str:
     return ". ".join(summary_parts) + "."
 
 @mcp.tool()
+@traced_tool("crawl_site")
+@admitted(admission)
+@with_deadline(ServerConfig.TOOL_DEADLINES["crawl_site"])
+async def crawl_site(url: str, max_pages: int = 30, max_depth: int = 3) -> Dict[str, Any]:
+    """
+    Map a site's navigation by following its links breadth-first from a landing page.
+    
+    Pages are fetched over plain HTTP (no browser), and their navigation links
+    are added to the site's link graph. Task simulations use the graph to route
+    to a task's page, and analyze_usability uses it for the "findability" metric.
+    
+    Args:
+        url: The landing page to start from
+        max_pages: Maximum number of pages to fetch
+        max_depth: Maximum number of clicks from the landing page to follow
+        
+    Returns:
+        Dictionary with the pages fetched, the size and click-depth histogram
+        of the site's link graph, and the shortest route to each key task's page
+    """
+    start = normalize_url(url)
+    if start is None:
+        return {"error": f"Not an http(s) URL: {url}", "url": url}
+    
+    fetched = []
+    failed_urls = []
+    limit = asyncio.Semaphore(ServerConfig.CRAWL_CONCURRENCY)
+    # Each page is reported as soon as its links are known
+    progress = ProgressReporter("crawl_site", total=max_pages)
+    
+    async def crawl(page_url: str):
+        async with limit:
+            page_info = await tester.visit_page(page_url, "http")
+        if "error" in page_info:
+            failed_urls.append({"url": page_url, "error": page_info["error"]})
+        else:
+            fetched.append(page_url)
+        await progress.advance(f"Crawled {page_url}", {
+            "url": page_url,
+            "links": len(tester.link_graph.links_from(page_url)),
+            "error": page_info.get("error")
+        })
+    
+    seen = {start}
+    level = [start]
+    for depth in range(max_depth + 1):
+        level = level[:max(0, max_pages - len(fetched) - len(failed_urls))]
+        if not level:
+            break
+        await asyncio.gather(*(crawl(page_url) for page_url in level))
+        next_level = []
+        for page_url in level:
+            for link in tester.link_graph.links_from(page_url):
+                if link not in seen:
+                    seen.add(link)
+                    next_level.append(link)
+        level = next_level
+    
+    return {
+        "url": url,
+        "pages_fetched": len(fetched),
+        "failed_urls": failed_urls,
+        "graph": tester.link_graph.summary(url),
+        "findability": _findability(url)["tasks"]
+    }
+
+@mcp.tool()
+@traced_tool("generate_report")
 async def generate_report(session_id: str = None, format: str = "markdown") -> Dict[str, Any]:
     """
     Generate a comprehensive usability report from session data.
@@ -742,11 +1381,17 @@ async def generate_report(session_id: str = None, format: str = "markdown") -> D
         format: Report format ("markdown", "json")
         
     Returns:
-        Dictionary containing the generated report
+        Dictionary containing the generated report. When none of the selected
+        sessions changed since the last call with the same arguments, that
+        report is returned again with "cached" set; when sessions were only
+        added, just the new sessions are rendered into an updated report and
+        the superseded one is deleted.
     """
     if session_id and session_id in tester.sessions:
         sessions = [tester.sessions[session_id]]
+        selection = f"session:{session_id}"
     else:
+        selection = "recent"
         # Get all sessions from the last 24 hours
         recent_sessions = []
         cutoff_time = datetime.now().timestamp() - (24 * 60 * 60)  # 24 hours ago
@@ -757,199 +1402,320 @@ async def generate_report(session_id: str = None, format: str = "markdown") -> D
         
         sessions = recent_sessions
     
+    if format not in REPORT_FORMATS:
+        return {"error": f"Unknown report format: {format}. Use one of {list(REPORT_FORMATS)}"}
+    
     if not sessions:
         return {"error": "No sessions found for report generation"}
     
-    if format == "markdown":
-        report_content = _generate_markdown_report(sessions)
-    else:
-        report_content = _generate_json_report(sessions)
+    # Reuse or extend the last rendering of the same selection when possible
+    key = (selection, format)
+    previous = tester.report_cache.get(key)
+    revisions = [tester.store.revision(session.session_id) for session in sessions]
+    # Each chunk of sessions is streamed to the client as it is rendered
+    progress = ProgressReporter("generate_report", total=len(sessions))
+    with tracer.span("report.render"):
+        for rendered, status, pieces in tester.report_cache.refresh_chunks(key, sessions, revisions):
+            if pieces:
+                done = len(rendered.session_ids)
+                await progress.advance_to(done, f"Rendered {done}/{len(sessions)} sessions", {
+                    "session_ids": rendered.session_ids[done - len(pieces):done],
+                    "content": "\n".join(pieces)
+                })
+    tracer.increment(f"report.{status}")
+    
+    entry = tester.reports.get(rendered.report_id) if rendered.report_is_current else None
+    if status == "unchanged" and entry:
+        # The retention collector may have compressed or deleted it since
+        report_path = tester.reports.path_for(entry)
+        try:
+            report_content = await asyncio.to_thread(tester.reports.read, entry)
+        except FileNotFoundError:
+            report_content = None
+        if report_content is not None:
+            return {
+                "report_id": rendered.report_id,
+                "format": format,
+                "sessions_included": len(sessions),
+                "report_path": str(report_path),
+                "content": report_content,
+                "cached": True
+            }
+    
+    report_content = rendered.render()
     
     # Save report
     report_id = str(uuid.uuid4())
-    report_filename = f"report_{report_id}.{format}"
-    report_path = tester.data_dir / "reports" / report_filename
-    
-    with open(report_path, 'w') as f:
-        f.write(report_content)
+    report_filename = f"report_{report_id}.{REPORT_FORMATS[format]}"
+    report_path = REPORTS_DIR / report_filename
+    
+    with tracer.span("persist.report"):
+        tester.reports.prepare()
+        with open(report_path, 'w') as f:
+            f.write(report_content)
+        tester.reports.add(report_id, format, report_filename, sessions, report_path.stat().st_size)
+        # The previous rendering's report is superseded only now that its
+        # replacement is written, so a cancelled call never loses track of it
+        stale_report_id = previous.report_id if previous else None
+        rendered.mark_saved(report_id, str(report_path))
+        if stale_report_id and stale_report_id != report_id:
+            tester.reports.remove(stale_report_id)
     
     return {
         "report_id": report_id,
         "format": format,
         "sessions_included": len(sessions),
         "report_path": str(report_path),
-        "content": report_content
+        "content": report_content,
+        "cached": False,
+        "render": status
     }
 
-def _generate_markdown_report(sessions: List[Session]) -> str:
-    """Generate a markdown usability report"""
-    report = []
-    report.append("# Synthetic User Testing Report")
-    report.append(f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    report.append(f"\nSessions analyzed: {len(sessions)}")
-    report.append("\n---\n")
-    
-    # Executive Summary
-    report.append("## Executive Summary")
-    
-    successful_tasks = sum(1 for s in sessions if s.task_result and s.task_result.success)
-    total_tasks = sum(1 for s in sessions if s.task_result)
-    
-    if total_tasks > 0:
-        success_rate = (successful_tasks / total_tasks) * 100
-        report.append(f"\n- Task Success Rate: {success_rate:.1f}% ({successful_tasks}/{total_tasks})")
-    
-    # Collect all feedback
-    all_positives = []
-    all_negatives = []
-    scores = []
-    
-    for session in sessions:
-        if session.feedback:
-            all_positives.extend(session.feedback.positives)
-            all_negatives.extend(session.feedback.negatives)
-            scores.append(session.feedback.overall_score)
-    
-    if scores:
-        avg_score = sum(scores) / len(scores)
-        report.append(f"- Average User Satisfaction: {avg_score:.1f}/10")
-    
-    # Top Issues
-    if all_negatives:
-        from collections import Counter
-        common_issues = Counter(all_negatives).most_common(3)
-        report.append("\n### Top Issues:")
-        for issue, count in common_issues:
-            report.append(f"- {issue} (mentioned {count} times)")
-    
-    # Detailed Session Results
-    report.append("\n## Detailed Results")
-    
-    for i, session in enumerate(sessions, 1):
-        report.append(f"\n### Session {i}: {session.url}")
-        report.append(f"\n**Created:** {session.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        if session.task_description:
-            report.append(f"\n**Task:** {session.task_description}")
-        
-        if session.task_result:
-            result = session.task_result
-            status = "✅ Success" if result.success else "❌ Failed"
-            report.append(f"\n**Result:** {status}")
-            report.append(f"\n**Steps taken:** {result.steps_taken}")
-            report.append(f"\n**Time taken:** {result.time_taken:.2f} seconds")
-            
-            if result.steps_attempted:
-                report.append("\n**Steps attempted:**")
-                for step in result.steps_attempted:
-                    report.append(f"- {step}")
-            
-            if result.error_message:
-                report.append(f"\n**Error:** {result.error_message}")
-        
-        if session.feedback:
-            feedback = session.feedback
-            report.append(f"\n**User Perspective:** {feedback.perspective}")
-            report.append(f"\n**Overall Score:** {feedback.overall_score}/10")
-            
-            if feedback.positives:
-                report.append("\n**Positives:**")
-                for positive in feedback.positives:
-                    report.append(f"- ✅ {positive}")
-            
-            if feedback.negatives:
-                report.append("\n**Issues:**")
-                for negative in feedback.negatives:
-                    report.append(f"- ❌ {negative}")
-        
-        report.append("\n---")
+# Resource handlers for MCP
+@mcp.resource("file://sessions/{session_id}")
+async def get_session(session_id: str) -> str:
+    """Get detailed information about a specific session"""
+    if session_id in tester.sessions:
+        session = tester.sessions[session_id]
+        return json.dumps(session.dict(), indent=2, default=str)
+    else:
+        return json.dumps({"error": "Session not found"})
+
+@mcp.resource("file://sessions/{?cursor,limit,url_prefix,perspective,task_type,success,since,until,count_only}")
+async def list_sessions(
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    url_prefix: Optional[str] = None,
+    perspective: Optional[str] = None,
+    task_type: Optional[str] = None,
+    success: Optional[bool] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    count_only: bool = False
+) -> str:
+    """List sessions newest first; pass next_cursor back as cursor for the next page"""
+    try:
+        page = tester.store.query(
+            cursor, limit,
+            url_prefix=url_prefix,
+            perspective=perspective,
+            task_type=task_type,
+            success=success,
+            since=since,
+            until=until,
+            count_only=count_only
+        )
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
+    if count_only:
+        return json.dumps(page)
+    return json.dumps({"total_sessions": len(tester.store), **page}, indent=2)
+
+@mcp.resource("file://reports/{?cursor,limit,format,since,until,url_prefix}")
+async def list_reports(
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    format: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    url_prefix: Optional[str] = None
+) -> str:
+    """List generated reports newest first; pass next_cursor back as cursor for the next page"""
+    try:
+        page = tester.reports.page(cursor, limit, format=format, since=since, until=until, url_prefix=url_prefix)
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
+    return json.dumps(page, indent=2)
+
+@mcp.resource("file://reports/{report_id}")
+async def get_report(report_id: str) -> str:
+    """Get a generated report's metadata and content"""
+    entry = tester.reports.get(report_id)
+    if entry is None:
+        return json.dumps({"error": "Report not found"})
+    path = tester.reports.path_for(entry)
+    try:
+        content = await asyncio.to_thread(tester.reports.read, entry)
+    except FileNotFoundError:
+        return json.dumps({"error": "Report file is missing", "report_id": report_id})
+    return json.dumps({**tester.reports.describe(entry), "path": str(path), "content": content}, indent=2)
+
+@mcp.tool()
+@traced_tool("rescore_sessions")
+async def rescore_sessions(
+    filter: Optional[Dict[str, Any]] = None,
+    perspectives: Optional[List[str]] = None,
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Re-run feedback and metric scoring over stored page snapshots, without a browser.
     
-    # Recommendations
-    report.append("\n## Recommendations")
+    Use this after changing the feedback heuristics or metric scorers to refresh
+    historical scores instead of re-visiting every URL.
     
-    if total_tasks > 0 and success_rate < 70:
-        report.append("\n- **Critical:** Task success rate is below 70%. Review user flows and simplify key actions.")
+    Args:
+        filter: Optional session filter with any of "url_prefix", "perspective",
+                "since", "until" (ISO timestamps) and "session_ids"
+        perspectives: Also score each session from these perspectives
+        workers: Worker processes to use (defaults to the CPU count)
+        
+    Returns:
+        Dictionary with counts of scanned/rescored/skipped sessions, throughput,
+        the average score change and a sample of sessions whose score changed
+    """
+    # Imported on first use; it pulls in multiprocessing
+    import rescore
+    return await rescore.rescore_sessions(tester.store, filter, perspectives, workers)
+
+@mcp.tool()
+@traced_tool("export_sessions")
+async def export_sessions(
+    filter: Optional[Dict[str, Any]] = None,
+    format: str = "auto"
+) -> Dict[str, Any]:
+    """
+    Export stored sessions into columnar tables for analytics.
     
-    if scores and avg_score < 6:
-        report.append("\n- **Important:** User satisfaction is below average. Focus on addressing common usability issues.")
+    Sessions are streamed from disk in row groups, so memory use stays flat
+    for exports of any size. Task steps, feedback items, journey steps and
+    scores go into child tables keyed by session_id.
     
-    if all_negatives:
-        most_common_issue = Counter(all_negatives).most_common(1)[0]
-        report.append(f"\n- **Priority:** Address '{most_common_issue[0]}' as it was the most frequently reported issue.")
+    Args:
+        filter: Optional session filter with any of "url_prefix", "perspective",
+                "since", "until" (ISO timestamps) and "session_ids"
+        format: "parquet" or "arrow" (need pyarrow), "csv" or "jsonl" (gzipped),
+                or "auto" for parquet when pyarrow is installed and csv otherwise
+        
+    Returns:
+        Dictionary with the export directory, the path and row count of each
+        table, and counts of scanned/exported sessions
+    """
+    # Imported on first use; it pulls in pyarrow when that is installed
+    import export
+    try:
+        export.resolve_format(format)
+    except ValueError as e:
+        return {"error": str(e)}
+    output_dir = export.new_export_dir(DATA_DIR / "exports")
+    with tracer.span("persist.export"):
+        return await asyncio.to_thread(export.export_sessions, tester.store, output_dir, filter, format)
+
+@mcp.tool()
+@traced_tool("schedule_monitor")
+async def schedule_monitor(
+    urls: List[str],
+    tasks: Optional[List[str]] = None,
+    perspectives: Optional[List[str]] = None,
+    interval: int = 3600
+) -> Dict[str, Any]:
+    """
+    Re-test URLs on a recurring schedule inside the server.
     
-    report.append("\n- **General:** Continue regular usability testing to monitor improvements.")
+    Each run collects feedback for every URL and perspective, or simulates
+    every task when tasks are given, and stores the results as normal sessions.
     
-    return "\n".join(report)
+    Args:
+        urls: URLs to monitor
+        tasks: Task descriptions to simulate on each URL (feedback only when omitted)
+        perspectives: User perspectives to run (defaults to ["new_user"])
+        interval: Seconds between runs
+        
+    Returns:
+        Dictionary describing the monitor, including its id and next run time
+    """
+    # Loads persisted monitors first, if the server lifespan has not already
+    await scheduler.start()
+    try:
+        monitor = scheduler.schedule(urls, tasks, perspectives, interval)
+    except ValueError as e:
+        return {"error": str(e)}
+    return scheduler.describe(monitor)
 
-def _generate_json_report(sessions: List[Session]) -> str:
-    """Generate a JSON usability report"""
-    report_data = {
-        "generated_at": datetime.now().isoformat(),
-        "sessions_count": len(sessions),
-        "sessions": [session.dict() for session in sessions]
-    }
+@mcp.tool()
+async def list_monitors() -> Dict[str, Any]:
+    """
+    List scheduled monitors with their next run time and latest results.
     
-    # Add summary statistics
-    successful_tasks = sum(1 for s in sessions if s.task_result and s.task_result.success)
-    total_tasks = sum(1 for s in sessions if s.task_result)
+    Returns:
+        Dictionary with the list of monitors
+    """
+    return {"monitors": scheduler.list()}
+
+@mcp.tool()
+async def cancel_monitor(monitor_id: str) -> Dict[str, Any]:
+    """
+    Stop a scheduled monitor; a run in progress is cancelled.
     
-    scores = [s.feedback.overall_score for s in sessions if s.feedback]
+    Args:
+        monitor_id: Id returned by schedule_monitor
+        
+    Returns:
+        Dictionary confirming the cancellation
+    """
+    if not scheduler.cancel(monitor_id):
+        return {"error": f"Monitor not found: {monitor_id}"}
+    return {"monitor_id": monitor_id, "cancelled": True}
+
+@mcp.tool()
+async def get_metrics(reset: bool = False) -> Dict[str, Any]:
+    """
+    Report latency percentiles for every traced operation.
     
-    report_data["summary"] = {
-        "task_success_rate": (successful_tasks / total_tasks * 100) if total_tasks > 0 else 0,
-        "average_satisfaction_score": sum(scores) / len(scores) if scores else 0,
-        "total_tasks_attempted": total_tasks,
-        "successful_tasks": successful_tasks
+    Args:
+        reset: Clear the collected histograms after reading them
+        
+    Returns:
+        Dictionary with p50/p95/p99, counts and errors per operation (tools,
+        Playwright calls, fixed sleeps and persistence steps), any origins
+        whose circuit breaker has recorded failures, admission slot usage, the
+        retention policies with the outcome of the last sweep, and shared
+        cache hits and misses
+    """
+    return {
+        **tracer.snapshot(reset=reset),
+        "circuit_breakers": tester.breakers.snapshot(),
+        "admission": admission.snapshot(),
+        "retention": retention.snapshot(),
+        "shared_cache": tester.shared_cache.snapshot(),
     }
-    
-    return json.dumps(report_data, indent=2, default=str)
 
-# Resource handlers for MCP
-@mcp.resource("file://sessions/{session_id}")
-async def get_session(session_id: str) -> str:
-    """Get detailed information about a specific session"""
-    if session_id in tester.sessions:
-        session = tester.sessions[session_id]
-        return json.dumps(session.dict(), indent=2, default=str)
-    else:
-        return json.dumps({"error": "Session not found"})
-
-@mcp.resource("file://sessions/")
-async def list_sessions() -> str:
-    """List all available sessions"""
-    session_list = []
-    for session_id, session in tester.sessions.items():
-        session_list.append({
-            "session_id": session_id,
-            "url": session.url,
-            "created_at": session.created_at.isoformat(),
-            "has_task_result": session.task_result is not None,
-            "has_feedback": session.feedback is not None
-        })
+@mcp.tool()
+@traced_tool("run_retention")
+async def run_retention() -> Dict[str, Any]:
+    """
+    Apply the data retention policies now instead of waiting for the next sweep.
+    
+    Deletes sessions, reports and screenshots past their age or size limits,
+    compresses cold sessions and reports, and removes screenshots no session
+    refers to. Runs in small steps, so other tool calls are not held up.
     
+    Returns:
+        Dictionary with, per kind of data, the files deleted, compressed and
+        kept and the bytes freed
+    """
+    try:
+        return await retention.sweep()
+    except ValueError as e:
+        return {"error": str(e)}
+
+@mcp.resource("file://metrics")
+async def metrics_resource() -> str:
+    """Latency percentiles for every traced operation"""
     return json.dumps({
-        "total_sessions": len(session_list),
-        "sessions": session_list
+        **tracer.snapshot(),
+        "circuit_breakers": tester.breakers.snapshot(),
+        "admission": admission.snapshot(),
+        "retention": retention.snapshot(),
+        "shared_cache": tester.shared_cache.snapshot(),
     }, indent=2)
 
-@mcp.resource("file://reports/")
-async def list_reports() -> str:
-    """List all generated reports"""
-    reports_dir = tester.data_dir / "reports"
-    reports = []
-    
-    if reports_dir.exists():
-        for report_file in reports_dir.glob("*.md"):
-            reports.append({
-                "filename": report_file.name,
-                "path": str(report_file),
-                "created_at": datetime.fromtimestamp(report_file.stat().st_mtime).isoformat(),
-                "size_bytes": report_file.stat().st_size
-            })
-    
+@mcp.resource("file://har/")
+async def list_har_archives() -> str:
+    """List recorded HAR archives and store usage"""
+    archives = await asyncio.to_thread(tester.har_store.list_archives)
     return json.dumps({
-        "total_reports": len(reports),
-        "reports": reports
+        "stats": tester.har_store.stats(),
+        "archives": archives
     }, indent=2)
 
 # Cleanup function
@@ -958,7 +1724,40 @@ async def cleanup():
     await tester.stop_browser()
     logger.info("Cleanup completed")
 
+def main(argv: Optional[List[str]] = None):
+    """Run the server over stdio, streamable HTTP or SSE"""
+    parser = argparse.ArgumentParser(description="Synthetic User Testing MCP Server")
+    parser.add_argument("--transport", choices=["stdio", "http", "sse"], default=ServerConfig.TRANSPORT,
+                        help="stdio for a single embedding client; http (streamable HTTP) or sse to serve many agents")
+    parser.add_argument("--host", default=ServerConfig.HOST)
+    parser.add_argument("--port", type=int, default=ServerConfig.PORT)
+    parser.add_argument("--path", default=None, help="URL path of the MCP endpoint (default: /mcp, or /sse)")
+    parser.add_argument("--max-concurrency", type=int, default=ServerConfig.MAX_CONCURRENCY,
+                        help="browser-backed tool calls running at once across all clients")
+    parser.add_argument("--max-per-client", type=int, default=ServerConfig.MAX_PER_CLIENT,
+                        help="browser-backed tool calls running at once per client")
+    parser.add_argument("--max-queue", type=int, default=ServerConfig.MAX_QUEUE,
+                        help="calls allowed to wait for a slot before new ones are rejected")
+    parser.add_argument("--queue-timeout", type=float, default=ServerConfig.QUEUE_TIMEOUT,
+                        help="seconds a queued call waits for a slot before it is rejected")
+    parser.add_argument("--lazy-browser", action="store_true",
+                        help="launch the browser on first use instead of at startup")
+    parser.add_argument("--fast-start", action="store_true", default=ServerConfig.FAST_START,
+                        help="answer the handshake before the browser is up, launching it in the background")
+    parser.add_argument("--shared-cache-ttl", type=float, default=ServerConfig.SHARED_CACHE_TTL,
+                        help="seconds snapshots and scores are shared with other server processes (0 disables)")
+    args = parser.parse_args(argv)
+
+    admission.configure(args.max_concurrency, args.max_per_client, args.max_queue, args.queue_timeout)
+    if args.lazy_browser:
+        ServerConfig.PRELOAD_BROWSER = False
+    ServerConfig.FAST_START = args.fast_start
+    tester.shared_cache.ttl = args.shared_cache_ttl
+
+    if args.transport == "stdio":
+        mcp.run(transport="stdio")
+    else:
+        mcp.run(transport=args.transport, host=args.host, port=args.port, path=args.path)
+
 if __name__ == "__main__":
-    import atexit
-    atexit.register(lambda: asyncio.run(cleanup()))
-    mcp.run()
\ No newline at end of file
+    main()
\ No newline at end of file
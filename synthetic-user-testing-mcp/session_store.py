@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Session storage for the Synthetic User Testing MCP Server.
+
+Sessions live in memory for the running server and are persisted as one JSON
+file per session under ``data/sessions/``. Files are written atomically so
+offline jobs (re-scoring, exports) can read and rewrite them while the server
+is running. Sessions the retention collector has compressed are stored as
+``<id>.json.zst`` or ``<id>.json.gz`` and read transparently.
+
+The store also keeps a small summary of every session ordered by creation
+time, so listings can page through sessions and filter them without
+serializing every session on each read.
+"""
+
+import base64
+import binascii
+import bisect
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from cold_storage import COMPRESSED_SUFFIXES, existing_path, is_compressed, read_bytes, remove_variants, write_bytes
+from models import Session
+
+TASK_TYPES = ("signup", "contact", "search", "generic", "journey", "feedback")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def classify_task(task_description: str) -> str:
+    """The task simulator that handles a task description"""
+    description = task_description.lower()
+    if "sign up" in description:
+        return "signup"
+    if "contact" in description:
+        return "contact"
+    if "search" in description:
+        return "search"
+    return "generic"
+
+def session_summary(session: Session) -> Dict[str, Any]:
+    """The listing fields of a session"""
+    if session.journey_steps:
+        task_type = "journey"
+    elif session.task_description:
+        task_type = classify_task(session.task_description)
+    else:
+        task_type = "feedback"
+    perspective = session.perspective or (session.feedback.perspective if session.feedback else None)
+    return {
+        "session_id": session.session_id,
+        "url": session.url,
+        "created_at": session.created_at.isoformat(),
+        "perspective": perspective,
+        "task_type": task_type,
+        "success": session.task_result.success if session.task_result else None,
+        "overall_score": session.feedback.overall_score if session.feedback else None,
+        "has_task_result": session.task_result is not None,
+        "has_feedback": session.feedback is not None
+    }
+
+def _encode_cursor(key: Tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode("|".join(key).encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        key = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    created_at, separator, session_id = key.partition("|")
+    if not separator or not created_at or not session_id:
+        raise ValueError("Invalid cursor")
+    return created_at, session_id
+
+SESSION_SUFFIXES = (".json",) + tuple(".json" + suffix for suffix in COMPRESSED_SUFFIXES)
+
+def write_session_file(path: Path, data: Dict[str, Any]):
+    """Atomically write a session dictionary as JSON, compressed if ``path`` is"""
+    if is_compressed(path):
+        write_bytes(path, json.dumps(data, default=str).encode("utf-8"))
+        return
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+def read_session_file(path: Path) -> Dict[str, Any]:
+    return json.loads(read_bytes(path))
+
+def session_id_for(path: Path) -> str:
+    """The session id a (possibly compressed) session file belongs to"""
+    return path.name.split(".json", 1)[0]
+
+class SessionStore:
+    """In-memory session registry backed by one JSON file per session"""
+
+    def __init__(self, sessions_dir: Path):
+        self.sessions_dir = sessions_dir
+        self.sessions: Dict[str, Session] = {}
+        # (created_at, session_id), sorted, plus the listing summary per session
+        self._keys: List[Tuple[str, str]] = []
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        # Bumped on every save or reload; each session remembers the value
+        # from its last one, so caches can tell which sessions changed
+        self.version = 0
+        self._revisions: Dict[str, int] = {}
+
+    def _index(self, session: Session):
+        self.version += 1
+        self._revisions[session.session_id] = self.version
+        previous = self._summaries.get(session.session_id)
+        if previous is not None:
+            key = (previous["created_at"], session.session_id)
+            del self._keys[bisect.bisect_left(self._keys, key)]
+        summary = session_summary(session)
+        self._summaries[session.session_id] = summary
+        bisect.insort(self._keys, (summary["created_at"], session.session_id))
+
+    def path_for(self, session_id: str) -> Path:
+        return self.sessions_dir / f"{session_id}.json"
+
+    def find_path(self, session_id: str) -> Optional[Path]:
+        """The session's file on disk, plain or compressed"""
+        return existing_path(self.path_for(session_id))
+
+    def save(self, session: Session):
+        """Register a session and persist it to disk"""
+        self.sessions[session.session_id] = session
+        self._index(session)
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(session.session_id)
+        write_session_file(path, session.dict())
+        # A re-saved session is hot again
+        remove_variants(path, keep=path)
+
+    def remove(self, session_id: str):
+        """Forget a session and delete its file"""
+        self.sessions.pop(session_id, None)
+        self._revisions.pop(session_id, None)
+        summary = self._summaries.pop(session_id, None)
+        if summary is not None:
+            del self._keys[bisect.bisect_left(self._keys, (summary["created_at"], session_id))]
+            self.version += 1
+        remove_variants(self.path_for(session_id))
+
+    def get(self, session_id: str) -> Optional[Session]:
+        return self.sessions.get(session_id)
+
+    def revision(self, session_id: str) -> int:
+        """Store version at which the session was last saved or reloaded"""
+        return self._revisions.get(session_id, 0)
+
+    def reload(self, session_id: str) -> Optional[Session]:
+        """Re-read a session from disk, e.g. after an offline job rewrote it"""
+        path = self.find_path(session_id)
+        if path is None:
+            return None
+        session = Session.parse_obj(read_session_file(path))
+        self.sessions[session_id] = session
+        self._index(session)
+        return session
+
+    def query(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        url_prefix: Optional[str] = None,
+        perspective: Optional[str] = None,
+        task_type: Optional[str] = None,
+        success: Optional[bool] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        count_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        One page of session summaries, newest first.
+
+        The time range narrows the index with a bisect; the other filters are
+        checked per entry. With ``count_only`` only the number of matching
+        sessions is returned, which is free without other filters.
+
+        Returns:
+            Dictionary with "sessions" and "next_cursor" (None on the last
+            page), or "total_sessions" alone when ``count_only`` is set
+
+        Raises:
+            ValueError: ``cursor`` is not one this store handed out
+        """
+        low = bisect.bisect_left(self._keys, (since,)) if since else 0
+        high = bisect.bisect_left(self._keys, (until + "\uffff",)) if until else len(self._keys)
+        if cursor:
+            high = min(high, bisect.bisect_left(self._keys, _decode_cursor(cursor)))
+
+        def matches(summary: Dict[str, Any]) -> bool:
+            return ((url_prefix is None or summary["url"].startswith(url_prefix))
+                    and (perspective is None or summary["perspective"] == perspective)
+                    and (task_type is None or summary["task_type"] == task_type)
+                    and (success is None or summary["success"] is success))
+
+        filtered = any(value is not None for value in (url_prefix, perspective, task_type, success))
+        if count_only:
+            if not filtered:
+                return {"total_sessions": max(0, high - low)}
+            return {"total_sessions": sum(1 for _, session_id in self._keys[low:high]
+                                          if matches(self._summaries[session_id]))}
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        sessions: List[Dict[str, Any]] = []
+        position = high - 1
+        while position >= low and len(sessions) < limit:
+            summary = self._summaries[self._keys[position][1]]
+            position -= 1
+            if matches(summary):
+                sessions.append(summary)
+
+        next_cursor = _encode_cursor(self._keys[position + 1]) if position >= low else None
+        return {"sessions": sessions, "next_cursor": next_cursor}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def iter_paths(self) -> Iterator[Path]:
+        """Stream the paths of all stored session files without loading them"""
+        if not self.sessions_dir.is_dir():
+            # Nothing has been saved yet
+            return
+        with os.scandir(self.sessions_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(SESSION_SUFFIXES) and not entry.name.startswith("."):
+                    yield Path(entry.path)
+
+__all__ = [
+    "TASK_TYPES",
+    "SessionStore",
+    "classify_task",
+    "session_summary",
+    "read_session_file",
+    "session_id_for",
+    "write_session_file",
+]
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Cache shared by every server process on a host.
+
+Several server processes behind a load balancer would otherwise each visit
+and score the same URLs. ``SharedCache`` keeps page snapshots and the scores
+derived from them in one SQLite database (in WAL mode, so readers never wait
+on the writer) that all processes using the same data directory open:
+
+- every entry has a TTL and expired entries are purged as new ones are
+  written,
+- writes are single SQLite transactions, so readers see either the old or
+  the new entry, and
+- on a miss, one caller computes the value while the others wait for it
+  (stampede protection): coroutines in one process share an in-flight
+  future, and processes take a lease on the key in the database. Leases
+  expire, so a process that dies mid-computation does not block the key.
+
+The database is opened on first use, one connection per thread.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from tracing import tracer
+
+# Seconds between checks while another process computes a value
+POLL_INTERVAL = 0.1
+# Expired entries are purged every this many writes
+PURGE_EVERY = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS leases (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+def digest(value: Any) -> str:
+    """Stable hash of a JSON-serializable value, for use in cache keys"""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class SharedCache:
+    """TTL cache in a SQLite database shared between processes, with stampede protection"""
+
+    def __init__(self, path: Path, ttl: float = 0, lease_seconds: float = 60):
+        self.path = path
+        # 0 disables the cache
+        self.ttl = ttl
+        self.lease_seconds = lease_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.counts = {"hits": 0, "misses": 0, "waited": 0}
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._writes = 0
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    connection.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.connection = connection
+        return connection
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """The cached value, or None when it is missing or expired"""
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def values(self, namespace: str) -> List[Any]:
+        """Every live (unexpired) value in ``namespace``"""
+        rows = self._connection().execute(
+            "SELECT value FROM entries WHERE namespace = ? AND expires_at > ?",
+            (namespace, time.time())
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def put(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, default=str), now, now + (ttl or self.ttl))
+        )
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def try_lease(self, namespace: str, key: str) -> bool:
+        """Take the lease on computing ``key``, unless another live owner holds it"""
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO leases (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at <= ?",
+            (namespace, key, self.owner, now + self.lease_seconds, now)
+        )
+        return cursor.rowcount == 1
+
+    def release(self, namespace: str, key: str):
+        self._connection().execute(
+            "DELETE FROM leases WHERE namespace = ? AND key = ? AND owner = ?",
+            (namespace, key, self.owner)
+        )
+
+    def purge_expired(self):
+        now = time.time()
+        connection = self._connection()
+        connection.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        connection.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+
+    async def get_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda value: True,
+        ttl: Optional[float] = None
+    ) -> Tuple[Any, str]:
+        """
+        The cached value for ``key``, computing and caching it on a miss.
+
+        Only values for which ``cacheable`` is true are stored, so errors are
+        never served from the cache.
+
+        Returns:
+            (value, status) where status is "hit", "waited" (another caller
+            computed it meanwhile) or "miss"
+        """
+        flight_key = (namespace, key)
+        inflight = self._inflight.get(flight_key)
+        if inflight is not None:
+            # Another coroutine in this process is already on it
+            encoded = await asyncio.shield(inflight)
+            if encoded is None:
+                # It failed or was cancelled; try again
+                return await self.get_or_compute(namespace, key, compute, cacheable, ttl)
+            self._count("waited", namespace)
+            return json.loads(encoded), "waited"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        try:
+            value, status = await self._lookup_or_compute(namespace, key, compute, cacheable, ttl)
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            del self._inflight[flight_key]
+        # Waiters get their own copy, as if they had read it from the cache
+        future.set_result(json.dumps(value, default=str))
+        return value, status
+
+    async def _lookup_or_compute(self, namespace, key, compute, cacheable, ttl) -> Tuple[Any, str]:
+        value = await asyncio.to_thread(self.get, namespace, key)
+        if value is not None:
+            self._count("hits", namespace)
+            return value, "hit"
+
+        waited = False
+        deadline = time.monotonic() + self.lease_seconds
+        while not await asyncio.to_thread(self.try_lease, namespace, key):
+            # Another process is computing it; wait for its result
+            waited = True
+            await asyncio.sleep(POLL_INTERVAL)
+            value = await asyncio.to_thread(self.get, namespace, key)
+            if value is not None:
+                self._count("waited", namespace)
+                return value, "waited"
+            if time.monotonic() > deadline:
+                break
+
+        try:
+            value = await compute()
+            if cacheable(value):
+                await asyncio.to_thread(self.put, namespace, key, value, ttl)
+        finally:
+            await asyncio.to_thread(self.release, namespace, key)
+        self._count("misses", namespace)
+        if waited:
+            tracer.increment(f"shared_cache.{namespace}.lease_expired")
+        return value, "miss"
+
+    def _count(self, outcome: str, namespace: str):
+        self.counts[outcome] += 1
+        tracer.increment(f"shared_cache.{namespace}.{outcome}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path),
+            "ttl": self.ttl,
+            **self.counts,
+        }
+
+__all__ = [
+    "SharedCache",
+    "digest",
+]
@@ -0,0 +1,12 @@
+"""Shared setup for the test suite"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The server's modules live next to this directory, not in a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Keep anything written through config's paths out of the real data directory
+os.environ.setdefault("MCP_DATA_DIR", tempfile.mkdtemp(prefix="sut-tests-"))
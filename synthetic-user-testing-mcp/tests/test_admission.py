@@ -0,0 +1,111 @@
+"""Admission control: server-wide and per-client slots, queueing and rejection"""
+
+import asyncio
+
+import pytest
+
+from admission import LOCAL_CLIENT, AdmissionController, AdmissionRejected, admitted
+
+async def hold(controller, client, release, entered):
+    async with controller.slot(client):
+        entered.append(client)
+        await release.wait()
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_limits_must_be_positive():
+    with pytest.raises(ValueError):
+        AdmissionController(max_concurrency=0)
+    with pytest.raises(ValueError):
+        AdmissionController(max_per_client=0)
+
+def test_busy_client_waits_while_others_are_admitted():
+    async def run():
+        controller = AdmissionController(max_concurrency=3, max_per_client=2)
+        release, entered = asyncio.Event(), []
+        tasks = [asyncio.create_task(hold(controller, client, release, entered))
+                 for client in ("a", "a", "a", "b")]
+        await settle()
+        during = list(entered), controller.snapshot()
+        release.set()
+        await asyncio.gather(*tasks)
+        return during, entered, controller.snapshot()
+
+    (during, snapshot), entered, after = asyncio.run(run())
+    assert sorted(during) == ["a", "a", "b"]
+    assert snapshot["active"] == 3
+    assert snapshot["waiting"] == 1
+    assert snapshot["clients"] == {"a": 2, "b": 1}
+    # The queued call ran once a slot was released
+    assert sorted(entered) == ["a", "a", "a", "b"]
+    assert (after["active"], after["waiting"], after["clients"]) == (0, 0, {})
+
+def test_full_queue_rejects_immediately():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=1)
+        release, entered = asyncio.Event(), []
+        tasks = [asyncio.create_task(hold(controller, client, release, entered)) for client in ("a", "b")]
+        await settle()
+        try:
+            async with controller.slot("c"):
+                pass
+        except AdmissionRejected as e:
+            rejected = e
+        release.set()
+        await asyncio.gather(*tasks)
+        return rejected, entered
+
+    rejected, entered = asyncio.run(run())
+    assert "too many queued requests" in str(rejected)
+    assert rejected.retry_after >= 1.0
+    assert entered == ["a", "b"]
+
+def test_queued_call_gives_up_after_the_timeout():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, queue_timeout=0.05)
+        release, entered = asyncio.Event(), []
+        task = asyncio.create_task(hold(controller, "a", release, entered))
+        await settle()
+        with pytest.raises(AdmissionRejected, match="within 0.05s"):
+            async with controller.slot("b"):
+                pass
+        waiting = controller.snapshot()["waiting"]
+        release.set()
+        await task
+        return waiting
+
+    assert asyncio.run(run()) == 0
+
+def test_admitted_tool_returns_a_429_result():
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+
+    @admitted(controller)
+    async def tool(release=None):
+        if release:
+            await release.wait()
+        return {"ok": True}
+
+    async def run():
+        release = asyncio.Event()
+        busy = asyncio.create_task(tool(release))
+        await settle()
+        rejected = await tool()
+        release.set()
+        return rejected, await busy, await tool()
+
+    rejected, first, later = asyncio.run(run())
+    assert rejected["status"] == 429
+    assert rejected["retry_after"] >= 1.0
+    assert first == later == {"ok": True}
+    assert tool.__name__ == "tool"
+
+def test_calls_outside_a_request_share_the_local_client():
+    controller = AdmissionController(max_concurrency=4, max_per_client=1, queue_timeout=0.05)
+
+    @admitted(controller)
+    async def tool():
+        return controller.snapshot()["clients"]
+
+    assert asyncio.run(tool()) == {LOCAL_CLIENT: 1}
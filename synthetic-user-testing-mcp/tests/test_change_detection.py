@@ -0,0 +1,150 @@
+"""Change detection: fingerprints, diffs, the per-URL store and revalidation"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from change_detection import ChangeDetector, diff_snapshots, fingerprint
+from fast_fetch import FastFetcher
+
+URL = "https://example.com/"
+ETAG = '"v1"'
+
+def snapshot(**fields):
+    base = {
+        "title": "Home",
+        "main_text": "Welcome to the example site",
+        "navigation_links": [{"text": "About", "href": "https://example.com/about"}],
+        "navigation_elements": ["About"],
+        "forms": [],
+        "footer_text": "",
+        "page_signals": {"html_lang": "en"},
+        "load_time": 0.5,
+        "validators": {"etag": ETAG},
+    }
+    base.update(fields)
+    return base
+
+def test_fingerprint_ignores_timings_and_screenshots():
+    assert fingerprint(snapshot()) == fingerprint(snapshot(load_time=9, screenshot="x.png"))
+    assert fingerprint(snapshot()) != fingerprint(snapshot(title="Other"))
+
+def test_diff_describes_changed_fields():
+    diff = diff_snapshots(
+        snapshot(),
+        snapshot(title="New home", navigation_elements=["Pricing", "About"], page_signals={"html_lang": None})
+    )
+    assert diff["title"] == {"before": "Home", "after": "New home"}
+    assert diff["navigation"]["added"] == ["Pricing"]
+    assert diff["page_signals"] == {"html_lang": {"before": "en", "after": None}}
+    assert "main_text" not in diff
+
+def test_record_reports_new_unchanged_and_changed(tmp_path):
+    changes = ChangeDetector(tmp_path)
+    assert changes.record(URL, snapshot())["status"] == "new"
+    assert changes.record(URL, snapshot(load_time=3))["status"] == "unchanged"
+    changed = changes.record(URL, snapshot(main_text="Completely different text"))
+    assert changed["status"] == "changed"
+    assert "main_text" in changed["diff"]
+
+def test_entries_persist_across_instances(tmp_path):
+    changes = ChangeDetector(tmp_path)
+    changes.record(URL, snapshot())
+    changes.remember_scores(URL, "new_user", {"overall_score": 7}, {"clarity": 8}, "session-1")
+
+    reloaded = ChangeDetector(tmp_path)
+    assert reloaded.validators(URL) == {"etag": ETAG}
+    assert reloaded.previous_scores(URL, "new_user") == {
+        "feedback": {"overall_score": 7},
+        "metric_scores": {"clarity": 8},
+        "session_id": "session-1",
+    }
+    assert reloaded.previous_scores(URL, "expert_user") is None
+
+def test_changed_content_drops_previous_scores(tmp_path):
+    changes = ChangeDetector(tmp_path)
+    changes.record(URL, snapshot())
+    changes.remember_scores(URL, "new_user", {}, {"clarity": 8}, "session-1")
+    changes.record(URL, snapshot(title="Changed"))
+    assert changes.previous_scores(URL, "new_user") is None
+
+def test_previous_snapshot_is_a_copy(tmp_path):
+    changes = ChangeDetector(tmp_path)
+    changes.record(URL, snapshot())
+    changes.previous_snapshot(URL)["title"] = "Edited by a caller"
+    assert changes.previous_snapshot(URL)["title"] == "Home"
+
+@pytest.fixture
+def origin():
+    """A local server that honours If-None-Match and counts requests per method"""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _respond(self, with_body):
+            requests.append(self.command)
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = b"<html><head><title>Home</title></head><body><main>Hello</main></body></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if with_body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            self._respond(True)
+
+        def do_HEAD(self):
+            self._respond(False)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/", requests
+    server.shutdown()
+
+def test_revalidate_uses_a_conditional_head(origin):
+    pytest.importorskip("httpx")
+    url, requests = origin
+
+    async def check():
+        fetcher = FastFetcher(timeout=5)
+        try:
+            return (
+                await fetcher.revalidate(url, {"etag": ETAG}),
+                await fetcher.revalidate(url, {"etag": '"stale"'}),
+                await fetcher.revalidate(url, {}),
+            )
+        finally:
+            await fetcher.close()
+
+    assert asyncio.run(check()) == (True, False, False)
+    assert requests == ["HEAD", "HEAD"]
+
+def test_browser_mode_reuses_a_confirmed_snapshot_without_downloading(origin, tmp_path):
+    pytest.importorskip("httpx")
+    pytest.importorskip("fastmcp")
+    import server
+    url, requests = origin
+
+    async def visit():
+        tester = server.UserTester()
+        tester.changes = ChangeDetector(tmp_path)
+        tester.changes.record(url, snapshot(url=url))
+        try:
+            return await tester._visit_page(url, "browser", detect_changes=True)
+        finally:
+            await tester.fetcher.close()
+
+    page_info = asyncio.run(visit())
+    assert page_info["change"]["status"] == "not_modified"
+    assert page_info["title"] == "Home"
+    assert requests == ["HEAD"]
@@ -0,0 +1,163 @@
+"""Bulk export: flattening sessions, batched writes and format fallback"""
+
+import csv
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import export
+from export import TABLES, export_sessions, flatten_session
+from models import Feedback, JourneyStepResult, Session, TaskResult
+from session_store import SessionStore
+
+START = datetime(2024, 1, 1)
+
+def task_session(n, url="https://a.example/signup"):
+    return Session(
+        session_id=f"task{n}",
+        url=url,
+        task_description="Sign up for an account",
+        perspective="new_user",
+        task_result=TaskResult(success=n % 2 == 0, steps_taken=2, time_taken=1.5,
+                               steps_attempted=["Clicked Sign up", "Filled the form"]),
+        feedback=Feedback(positives=["Clear layout"], negatives=["Slow", "No search"], overall_score=6,
+                          perspective="new_user", timestamp=START),
+        metric_scores={"clarity": 7.0, "speed": 4.5},
+        perspective_scores={"new_user": 6},
+        created_at=START + timedelta(minutes=n),
+    )
+
+def journey_session(n):
+    return Session(
+        session_id=f"journey{n}",
+        url="https://b.example/",
+        journey_steps=[
+            JourneyStepResult(step_index=0, task_description="Sign up", success=True, time_taken=1.0,
+                              steps_attempted=["Clicked Sign up"], url_after="https://b.example/welcome"),
+            JourneyStepResult(step_index=1, task_description="Log in", success=False, time_taken=2.0,
+                              steps_attempted=[], error_message="No login link"),
+        ],
+        created_at=START + timedelta(hours=1, minutes=n),
+    )
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(tmp_path / "sessions")
+    for n in range(4):
+        store.save(task_session(n))
+    for n in range(2):
+        store.save(journey_session(n))
+    return store
+
+@pytest.fixture
+def without_pyarrow(monkeypatch):
+    monkeypatch.setattr(export, "pyarrow", None)
+
+def read_csv(path):
+    with gzip.open(path, "rt", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+def read_jsonl(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_flatten_task_session():
+    rows = flatten_session(json.loads(task_session(0).json()))
+    assert rows["sessions"][0]["task_type"] == "signup"
+    assert rows["sessions"][0]["success"] is True
+    assert rows["sessions"][0]["overall_score"] == 6
+    assert rows["sessions"][0]["journey_step_count"] == 0
+    assert [(row["journey_step"], row["position"], row["step"]) for row in rows["steps"]] == [
+        (None, 0, "Clicked Sign up"), (None, 1, "Filled the form"),
+    ]
+    assert [(row["kind"], row["text"]) for row in rows["feedback_items"]] == [
+        ("positive", "Clear layout"), ("negative", "Slow"), ("negative", "No search"),
+    ]
+    assert {(row["kind"], row["name"], row["score"]) for row in rows["scores"]} == {
+        ("metric", "clarity", 7.0), ("metric", "speed", 4.5), ("perspective", "new_user", 6),
+    }
+    assert rows["journey_steps"] == []
+    # Every row has exactly the table's columns
+    for name, table_rows in rows.items():
+        for row in table_rows:
+            assert list(row) == [column for column, _ in TABLES[name]]
+
+def test_flatten_journey_and_feedback_sessions():
+    rows = flatten_session(json.loads(journey_session(0).json()))
+    assert rows["sessions"][0]["task_type"] == "journey"
+    assert rows["sessions"][0]["journey_step_count"] == 2
+    assert [row["success"] for row in rows["journey_steps"]] == [True, False]
+    assert rows["journey_steps"][1]["error_message"] == "No login link"
+    assert [(row["journey_step"], row["step"]) for row in rows["steps"]] == [(0, "Clicked Sign up")]
+
+    feedback_only = flatten_session({"session_id": "f1", "url": "https://c.example/"})
+    assert feedback_only["sessions"][0]["task_type"] == "feedback"
+    assert all(not feedback_only[name] for name in TABLES if name != "sessions")
+
+def test_auto_falls_back_to_csv_without_pyarrow(store, tmp_path, without_pyarrow):
+    summary = export_sessions(store, tmp_path / "out")
+    assert summary["format"] == "csv"
+    assert (summary["scanned"], summary["exported"], summary["failed"]) == (6, 6, 0)
+    expected = {"sessions": 6, "steps": 4 * 2 + 2 * 1, "feedback_items": 4 * 3,
+                "journey_steps": 2 * 2, "scores": 4 * 3}
+    for name, rows in expected.items():
+        table = summary["tables"][name]
+        assert table["path"].endswith(f"{name}.csv.gz")
+        assert table["rows"] == rows
+        assert len(read_csv(table["path"])) == rows
+
+    sessions = {row["session_id"]: row for row in read_csv(summary["tables"]["sessions"]["path"])}
+    assert sessions["task0"]["success"] == "True"
+    assert sessions["journey1"]["task_type"] == "journey"
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_columnar_formats_need_pyarrow(store, tmp_path, without_pyarrow, format):
+    with pytest.raises(ValueError, match="needs pyarrow"):
+        export_sessions(store, tmp_path / "out", format=format)
+    with pytest.raises(ValueError, match="Unknown export format"):
+        export_sessions(store, tmp_path / "out", format="xlsx")
+
+def test_jsonl_export_with_a_filter(store, tmp_path):
+    summary = export_sessions(store, tmp_path / "out", {"url_prefix": "https://a.example"}, format="jsonl")
+    assert (summary["scanned"], summary["exported"]) == (6, 4)
+    sessions = read_jsonl(summary["tables"]["sessions"]["path"])
+    assert sorted(row["session_id"] for row in sessions) == [f"task{n}" for n in range(4)]
+    assert len(read_jsonl(summary["tables"]["feedback_items"]["path"])) == summary["tables"]["feedback_items"]["rows"] == 12
+    assert read_jsonl(summary["tables"]["journey_steps"]["path"]) == []
+
+def test_rows_are_flushed_in_batches(store, tmp_path, monkeypatch):
+    batches = []
+    write = export._CsvTable.write
+
+    def recording_write(self, rows):
+        batches.append((self.path.name, len(rows)))
+        write(self, rows)
+
+    monkeypatch.setattr(export._CsvTable, "write", recording_write)
+    summary = export_sessions(store, tmp_path / "out", format="csv", batch_rows=5)
+    sessions = [size for name, size in batches if name == "sessions.csv.gz"]
+    feedback_items = [size for name, size in batches if name == "feedback_items.csv.gz"]
+    # Full batches as they fill (a session's rows are never split), then the remainder
+    assert sessions == [5, 1]
+    assert feedback_items == [6, 6]
+    assert all(size > 0 for _, size in batches)
+    assert len(read_csv(summary["tables"]["sessions"]["path"])) == 6
+
+def test_unreadable_session_files_are_counted(store, tmp_path):
+    (store.sessions_dir / "broken.json").write_text("{not json")
+    (store.sessions_dir / "incomplete.json").write_text(json.dumps({"url": "https://a.example/"}))
+    summary = export_sessions(store, tmp_path / "out", format="jsonl")
+    assert (summary["scanned"], summary["exported"], summary["failed"]) == (8, 6, 2)
+    assert summary["tables"]["sessions"]["rows"] == 6
+    assert export.main(["--sessions-dir", str(store.sessions_dir), "--output", str(tmp_path / "cli"),
+                        "--format", "jsonl"]) == 1
+
+def test_parquet_round_trip(store, tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    summary = export_sessions(store, tmp_path / "out", format="parquet", batch_rows=2)
+    table = pyarrow.parquet.read_table(summary["tables"]["sessions"]["path"])
+    assert table.num_rows == 6
+    assert pyarrow.parquet.ParquetFile(summary["tables"]["sessions"]["path"]).num_row_groups == 3
@@ -0,0 +1,91 @@
+"""HAR archive store: body deduplication, blob references and eviction"""
+
+import base64
+import json
+import logging
+
+from har_store import HarStore
+
+def record(store, archive_id, url, bodies):
+    """Write a HAR as Playwright would, with inline bodies, and finalize it"""
+    entries = []
+    for body in bodies:
+        content = {"mimeType": "text/plain", "size": len(body)}
+        if isinstance(body, bytes):
+            content.update(text=base64.b64encode(body).decode("ascii"), encoding="base64")
+        else:
+            content["text"] = body
+        entries.append({"request": {"url": url}, "response": {"status": 200, "content": content}})
+    entries.append({"request": {"url": url + "empty"}, "response": {"status": 204, "content": {"size": 0}}})
+    store.recording_path(archive_id).write_text(json.dumps({"log": {"entries": entries}}))
+    return store.finalize(archive_id, url)
+
+def test_bodies_move_to_blobs_referenced_by_file(tmp_path):
+    store = HarStore(tmp_path)
+    metadata = record(store, "a1", "https://a.example/", ["hello", b"\x89PNG\x00"])
+    assert metadata["entries"] == 3
+    assert metadata["new_blob_bytes"] == 5 + 5
+
+    har = json.loads(store.archive_path("a1").read_text())
+    contents = [entry["response"]["content"] for entry in har["log"]["entries"]]
+    for content, body in zip(contents, [b"hello", b"\x89PNG\x00"]):
+        assert "text" not in content and "encoding" not in content
+        assert content["_file"].startswith("blobs/")
+        assert (store.archives_dir / content["_file"]).read_bytes() == body
+    # Entries without a body are left alone
+    assert "_file" not in contents[2]
+
+def test_identical_bodies_are_stored_once(tmp_path):
+    store = HarStore(tmp_path)
+    record(store, "a1", "https://a.example/", ["shared.js", "shared.js", "page a"])
+    second = record(store, "b1", "https://b.example/", ["shared.js", "page b"])
+    assert second["new_blob_bytes"] == len("page b")
+    assert len(list(store.blobs_dir.iterdir())) == 3
+    assert store.stats()["unique_bodies"] == 3
+
+    # The shared body survives until its last archive is deleted
+    assert store.delete("a1")
+    assert len(list(store.blobs_dir.iterdir())) == 2
+    assert store.delete("b1")
+    assert list(store.blobs_dir.iterdir()) == []
+    assert not store.delete("b1")
+
+def test_latest_archive_per_url(tmp_path):
+    store = HarStore(tmp_path)
+    record(store, "old", "https://a.example/", ["v1"])
+    record(store, "new", "https://a.example/", ["v2"])
+    assert store.archive_path(url="https://a.example/").name == "new.har"
+    store.delete("new")
+    assert store.archive_path(url="https://a.example/").name == "old.har"
+    store.delete("old")
+    assert store.archive_path(url="https://a.example/") is None
+
+def test_oldest_archives_are_evicted_past_the_limits(tmp_path):
+    store = HarStore(tmp_path, max_archives=2)
+    for n in range(3):
+        record(store, f"a{n}", f"https://{n}.example/", [f"body {n}"])
+    assert [archive["archive_id"] for archive in store.list_archives()] == ["a2", "a1"]
+    assert store.archive_path("a0") is None
+
+    reopened = HarStore(tmp_path, max_archives=2)
+    assert reopened.stats()["archives"] == 2
+
+def test_size_limit_evicts_older_archives_first(tmp_path):
+    store = HarStore(tmp_path)
+    record(store, "a0", "https://a.example/", ["x" * 2000])
+    har_bytes = store.list_archives()[0]["har_bytes"]
+    store.max_bytes = har_bytes + 2000 + har_bytes + 1500
+    record(store, "a1", "https://b.example/", ["y" * 2000])
+    assert [archive["archive_id"] for archive in store.list_archives()] == ["a1"]
+    assert store.stats()["total_bytes"] <= store.max_bytes
+
+def test_archive_larger_than_the_limit_is_kept(tmp_path, caplog):
+    store = HarStore(tmp_path, max_bytes=100)
+    record(store, "small", "https://a.example/", ["tiny"])
+    with caplog.at_level(logging.WARNING, logger="har_store"):
+        record(store, "huge", "https://a.example/", ["z" * 1000])
+    # Older archives go, but the one just recorded stays replayable
+    assert store.archive_path("huge") is not None
+    assert store.archive_path(url="https://a.example/").name == "huge.har"
+    assert store.archive_path("small") is None
+    assert "alone exceeds" in caplog.text
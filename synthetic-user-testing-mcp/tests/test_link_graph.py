@@ -0,0 +1,141 @@
+"""Site link graphs: URL normalization, routes, depths and persistence"""
+
+import json
+import threading
+
+from link_graph import MAX_LABELS, LinkGraphIndex, SiteGraph, normalize_url, origin_of
+
+ORIGIN = "https://shop.example"
+
+def link(href, text=""):
+    return {"href": href, "text": text}
+
+def shop_graph():
+    # / -> /products -> /products/1 -> /account/signup
+    #   -> /about -> /contact
+    graph = SiteGraph(ORIGIN)
+    graph.add_page(f"{ORIGIN}/", [link(f"{ORIGIN}/products", "Products"), link(f"{ORIGIN}/about", "About us")])
+    graph.add_page(f"{ORIGIN}/products", [link(f"{ORIGIN}/products/1", "Widget")])
+    graph.add_page(f"{ORIGIN}/products/1", [link(f"{ORIGIN}/account/signup", "Create account")])
+    graph.add_page(f"{ORIGIN}/about", [link(f"{ORIGIN}/contact", "Get in touch")])
+    return graph
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Shop.Example/About#team") == "https://shop.example/About"
+    assert normalize_url(" https://shop.example ") == "https://shop.example/"
+    assert normalize_url("https://shop.example/search?q=a#x") == "https://shop.example/search?q=a"
+    assert normalize_url("mailto:hi@shop.example") is None
+    assert normalize_url("/relative") is None
+    assert origin_of("https://shop.example/a/b?c") == ORIGIN
+
+def test_urls_are_interned_once_and_foreign_links_dropped():
+    graph = SiteGraph(ORIGIN)
+    changed = graph.add_page(f"{ORIGIN}/", [
+        link(f"{ORIGIN}/about"),
+        link(f"{ORIGIN}/about#team"),
+        link(f"{ORIGIN}/"),
+        link("https://other.example/about"),
+        link("javascript:void(0)"),
+    ])
+    assert changed
+    assert graph.urls == [f"{ORIGIN}/", f"{ORIGIN}/about"]
+    assert graph.links_from(f"{ORIGIN}/") == [f"{ORIGIN}/about"]
+    # Recording the same links again changes nothing
+    assert not graph.add_page(f"{ORIGIN}/", [link(f"{ORIGIN}/about")])
+    # Pages of another origin are ignored
+    assert not graph.add_page("https://other.example/", [link("https://other.example/a")])
+
+def test_link_labels_are_capped():
+    graph = SiteGraph(ORIGIN)
+    graph.add_page(f"{ORIGIN}/", [link(f"{ORIGIN}/a", f"  Label   {n} ") for n in range(MAX_LABELS + 3)])
+    assert graph.labels[graph.ids[f"{ORIGIN}/a"]] == [f"label {n}" for n in range(MAX_LABELS)]
+
+def test_route_finds_the_fewest_clicks():
+    graph = shop_graph()
+    route = graph.route(f"{ORIGIN}/", ["signup", "register"])
+    assert route == {
+        "url": f"{ORIGIN}/account/signup",
+        "clicks": 3,
+        "path": [f"{ORIGIN}/", f"{ORIGIN}/products", f"{ORIGIN}/products/1", f"{ORIGIN}/account/signup"],
+    }
+    # Link text matches as well as the URL path
+    assert graph.route(f"{ORIGIN}/", ["touch"])["clicks"] == 2
+    # A shortcut added later shortens the route
+    graph.add_page(f"{ORIGIN}/about", [link(f"{ORIGIN}/contact"), link(f"{ORIGIN}/account/signup")])
+    assert graph.route(f"{ORIGIN}/", ["signup"])["clicks"] == 2
+    assert graph.route(f"{ORIGIN}/", ["careers"]) is None
+    assert graph.route(f"{ORIGIN}/unknown", ["signup"]) is None
+    # The start page itself counts as zero clicks
+    assert graph.route(f"{ORIGIN}/about", ["about"])["clicks"] == 0
+
+def test_unreachable_pages_have_no_route():
+    graph = shop_graph()
+    assert graph.route(f"{ORIGIN}/contact", ["signup"]) is None
+
+def test_depths_and_summary():
+    graph = shop_graph()
+    assert graph.depths(f"{ORIGIN}/") == {
+        f"{ORIGIN}/": 0,
+        f"{ORIGIN}/products": 1,
+        f"{ORIGIN}/about": 1,
+        f"{ORIGIN}/products/1": 2,
+        f"{ORIGIN}/contact": 2,
+        f"{ORIGIN}/account/signup": 3,
+    }
+    summary = graph.summary(f"{ORIGIN}/")
+    assert summary["pages_known"] == 6
+    assert summary["pages_expanded"] == 4
+    assert summary["links"] == 5
+    assert summary["max_depth"] == 3
+    assert summary["depth_histogram"] == {"0": 1, "1": 2, "2": 2, "3": 1}
+
+def test_round_trip_through_a_dict():
+    graph = shop_graph()
+    restored = SiteGraph.from_dict(json.loads(json.dumps(graph.to_dict())))
+    assert restored.urls == graph.urls
+    assert restored.labels == graph.labels
+    assert restored.expanded == graph.expanded
+    assert restored.route(f"{ORIGIN}/", ["signup"]) == graph.route(f"{ORIGIN}/", ["signup"])
+    assert restored.depths(f"{ORIGIN}/") == graph.depths(f"{ORIGIN}/")
+
+def test_index_persists_graphs_per_origin(tmp_path):
+    index = LinkGraphIndex(tmp_path)
+    assert index.record(f"{ORIGIN}/", [link(f"{ORIGIN}/contact", "Contact")])
+    assert not index.record(f"{ORIGIN}/", [link(f"{ORIGIN}/contact", "Contact")])
+    assert index.record("https://other.example/", [link("https://other.example/help")])
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+    reopened = LinkGraphIndex(tmp_path)
+    result = reopened.findability(f"{ORIGIN}/", {"contact": ["contact"], "signup": ["signup"]})
+    assert result["tasks"]["contact"]["clicks"] == 1
+    assert result["tasks"]["signup"] is None
+    assert result["pages_known"] == 2
+    assert reopened.links_from(f"{ORIGIN}/") == [f"{ORIGIN}/contact"]
+    assert reopened.summary(f"{ORIGIN}/")["reachable"] == 2
+    assert reopened.findability("ftp://files.example/", {"contact": ["contact"]}) == {"tasks": {}, "pages_known": 0}
+
+def test_routes_are_consistent_while_pages_are_recorded(tmp_path):
+    index = LinkGraphIndex(tmp_path)
+    index.record(f"{ORIGIN}/", [link(f"{ORIGIN}/p0")])
+    errors = []
+
+    def writer():
+        for n in range(200):
+            index.record(f"{ORIGIN}/p{n}", [link(f"{ORIGIN}/p{n + 1}"), link(f"{ORIGIN}/contact-{n}")])
+
+    def reader():
+        try:
+            for _ in range(200):
+                route = index.route(f"{ORIGIN}/", ["contact"])
+                if route is not None:
+                    assert route["clicks"] == len(route["path"]) - 1
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert index.route(f"{ORIGIN}/", ["contact-0"])["clicks"] == 2
@@ -0,0 +1,217 @@
+"""Load testing: context pooling, admission, ramp-up and timelines"""
+
+import asyncio
+import heapq
+import itertools
+
+import pytest
+
+import load_test
+from admission import AdmissionController
+from load_test import ContextPool, run_load_test, summarize
+
+# The real sleep, for the virtual clock's driver; tests patch asyncio.sleep
+_yield = asyncio.sleep
+
+class FakeContext:
+    def __init__(self, number):
+        self.number = number
+        self.cleared = 0
+        self.closed = False
+
+    async def clear_cookies(self):
+        self.cleared += 1
+
+    async def close(self):
+        self.closed = True
+
+def context_factory():
+    created = []
+
+    async def new_context():
+        context = FakeContext(len(created))
+        created.append(context)
+        return context
+    return new_context, created
+
+def test_pool_holds_an_admission_slot_per_context():
+    async def run():
+        controller = AdmissionController(max_concurrency=3, max_per_client=3)
+        new_context, created = context_factory()
+        pool = ContextPool(new_context, 2, admit=lambda: controller.slot("load"))
+        first, second = await pool.acquire(), await pool.acquire()
+        during = controller.snapshot()
+        await pool.release(first)
+        await pool.release(second)
+        await pool.close()
+        return during, controller.snapshot(), created
+
+    during, after, created = asyncio.run(run())
+    assert (during["active"], during["clients"]) == (2, {"load": 2})
+    assert (after["active"], after["clients"]) == (0, {})
+    assert all(context.closed for context in created)
+
+def test_pool_waits_for_a_slot_held_by_another_client():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, queue_timeout=5)
+        new_context, created = context_factory()
+        pool = ContextPool(new_context, 1, admit=lambda: controller.slot("load"))
+        release = asyncio.Event()
+
+        async def other_call():
+            async with controller.slot("other"):
+                await release.wait()
+
+        other = asyncio.create_task(other_call())
+        await asyncio.sleep(0)
+        acquiring = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.01)
+        waited = not acquiring.done() and not created
+        release.set()
+        await other
+        context = await acquiring
+        await pool.release(context)
+        await pool.close()
+        return waited, created
+
+    waited, created = asyncio.run(run())
+    assert waited
+    assert len(created) == 1
+
+class VirtualTime:
+    """
+    A clock that only moves when every task is waiting on a sleep.
+
+    ``sleep`` parks the caller until the clock reaches its wake-up time;
+    ``run`` drives a coroutine, advancing the clock to the next wake-up
+    whenever the ready tasks have run out of work.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self._sleepers = []
+        self._order = itertools.count()
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + seconds, next(self._order), future))
+        await future
+
+    async def run(self, coro):
+        task = asyncio.ensure_future(coro)
+        while not task.done():
+            for _ in range(50):
+                await _yield(0)
+            if self._sleepers and not task.done():
+                wake_at, _, future = heapq.heappop(self._sleepers)
+                self.now = max(self.now, wake_at)
+                future.set_result(None)
+        return task.result()
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = VirtualTime()
+    monkeypatch.setattr(load_test.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(load_test.asyncio, "sleep", clock.sleep)
+    return clock
+
+def load(clock, pool, run_iteration, **kwargs):
+    async def main():
+        return await clock.run(run_load_test(pool, run_iteration, **kwargs))
+    return asyncio.run(main())
+
+def test_users_are_ramped_up_evenly(clock):
+    new_context, _ = context_factory()
+
+    async def iteration(context, persona):
+        await asyncio.sleep(3)
+        return {"success": True, "load_time_ms": 100}
+
+    result = load(clock, ContextPool(new_context, 4), iteration, personas=["new_user", "expert_user"],
+                  concurrent_users=4, duration=20, ramp_up=8, bucket_seconds=5)
+    assert result["timeline"][0]["active_users"] == 3
+    assert [bucket["active_users"] for bucket in result["timeline"][1:4]] == [4, 4, 4]
+    # Users started at 0, 2, 4 and 6 seconds, each repeating a 3 second task until 20s
+    assert result["iterations"] == 7 + 6 + 6 + 5
+    # The last iteration started at 19s and is allowed to finish
+    assert result["elapsed_seconds"] == 22
+    assert result["personas"] == {
+        "expert_user": {"iterations": 11, "success_rate": 1.0, "p95_load_time_ms": 100.0},
+        "new_user": {"iterations": 13, "success_rate": 1.0, "p95_load_time_ms": 100.0},
+    }
+
+def test_contexts_are_reused_across_iterations(clock):
+    new_context, created = context_factory()
+    used, in_flight = [], [0, 0]
+
+    async def iteration(context, persona):
+        used.append(context.number)
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(1)
+        in_flight[0] -= 1
+        return {"success": True}
+
+    result = load(clock, ContextPool(new_context, 2), iteration, personas=["new_user"],
+                  concurrent_users=4, duration=10)
+    # Four users share two contexts, so only two iterations run at a time
+    assert len(created) == 2
+    assert set(used) == {0, 1}
+    assert in_flight[1] == 2
+    assert sum(context.cleared for context in created) == result["iterations"]
+    assert all(context.closed for context in created)
+
+def test_failed_iterations_are_recorded(clock):
+    new_context, created = context_factory()
+    outcomes = itertools.cycle([RuntimeError("page crashed"), {"success": False, "error": "HTTP 503"},
+                                {"success": True, "load_time_ms": 50}])
+
+    async def iteration(context, persona):
+        await asyncio.sleep(1)
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    result = load(clock, ContextPool(new_context, 1), iteration, personas=["new_user"],
+                  concurrent_users=1, duration=6)
+    assert result["iterations"] == 6
+    assert result["errors"] == 4
+    assert result["success_rate"] == round(2 / 6, 3)
+    assert created[0].closed
+
+def test_samples_are_bucketed_by_finish_time():
+    samples = [
+        {"finished_at": 0.5, "duration_ms": 500, "load_time_ms": 100, "success": True},
+        {"finished_at": 1.5, "duration_ms": 900, "load_time_ms": 300, "success": False, "error": "timeout"},
+        {"finished_at": 4.2, "duration_ms": 800, "load_time_ms": None, "success": True},
+        # Finished after the last bucket, so it is counted in it
+        {"finished_at": 7.0, "duration_ms": 700, "load_time_ms": 200, "success": True},
+    ]
+    summary = summarize(samples, duration=6, bucket_seconds=2, user_spans=[(0, 7), (3, 5)])
+    assert [bucket["start"] for bucket in summary["timeline"]] == [0, 2, 4]
+    assert [bucket["completed"] for bucket in summary["timeline"]] == [2, 0, 2]
+    assert [bucket["active_users"] for bucket in summary["timeline"]] == [1, 2, 2]
+    assert [bucket["success_rate"] for bucket in summary["timeline"]] == [0.5, None, 1.0]
+    assert [bucket["p95_load_time_ms"] for bucket in summary["timeline"]] == [300, 0.0, 200]
+    assert [bucket["errors"] for bucket in summary["timeline"]] == [1, 0, 0]
+    assert summary["timeline"][0]["throughput_per_s"] == 1.0
+    assert summary["iterations"] == 4
+    assert summary["throughput_per_s"] == round(4 / 6, 3)
+    assert summary["p50_load_time_ms"] == 200
+    assert summary["p95_iteration_ms"] == 900
+
+def test_long_tests_use_wider_buckets(clock):
+    new_context, _ = context_factory()
+
+    async def iteration(context, persona):
+        await asyncio.sleep(60)
+        return {"success": True}
+
+    result = load(clock, ContextPool(new_context, 1), iteration, personas=["new_user"],
+                  concurrent_users=1, duration=1200, bucket_seconds=1)
+    assert result["bucket_seconds"] == 10
+    assert len(result["timeline"]) == 120
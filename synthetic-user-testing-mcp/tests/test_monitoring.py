@@ -0,0 +1,149 @@
+"""Monitor scheduling: jitter, catch-up runs and per-origin spacing"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import monitoring
+from models import Monitor
+from monitoring import JITTER_FRACTION, MonitorScheduler, OriginRateLimiter
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+class FakeClock:
+    """Stands in for both datetime.now and time.monotonic; sleeping advances it"""
+
+    def __init__(self):
+        self.now = START
+        self.sleeps = []
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+    def monotonic(self):
+        return 1000 + (self.now - START).total_seconds()
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.advance(seconds)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock.now
+
+    monkeypatch.setattr(monitoring, "datetime", FakeDatetime)
+    monkeypatch.setattr(monitoring.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(monitoring.asyncio, "sleep", clock.sleep)
+    return clock
+
+@pytest.fixture
+def max_jitter(monkeypatch):
+    """Pin the jitter to the top of its range"""
+    monkeypatch.setattr(monitoring.random, "uniform", lambda low, high: high)
+
+async def no_job(url, task, perspective):
+    return {"session_id": "s1", "overall_score": 7}
+
+def make_monitor(next_run_at, interval=600):
+    return Monitor(monitor_id="m1", urls=["https://a.example/"], interval=interval,
+                   created_at=START - timedelta(days=1), next_run_at=next_run_at)
+
+def test_new_monitors_start_within_the_jitter_window(tmp_path, clock):
+    scheduler = MonitorScheduler(tmp_path / "monitors.json", no_job)
+    monitors = [scheduler.schedule(["https://a.example/"], None, None, 600) for _ in range(20)]
+    offsets = [(monitor.next_run_at - START).total_seconds() for monitor in monitors]
+    assert all(0 <= offset <= 600 * JITTER_FRACTION for offset in offsets)
+    # Monitors created together do not all fire at once
+    assert len(set(offsets)) > 1
+    assert len(json.loads((tmp_path / "monitors.json").read_text())) == 20
+
+def test_intervals_below_the_minimum_are_rejected(tmp_path, clock):
+    scheduler = MonitorScheduler(tmp_path / "monitors.json", no_job, min_interval=60)
+    with pytest.raises(ValueError, match="at least 60 seconds"):
+        scheduler.schedule(["https://a.example/"], None, None, 30)
+    with pytest.raises(ValueError, match="URL"):
+        scheduler.schedule([], None, None, 600)
+
+def test_runs_missed_while_stopped_are_coalesced(tmp_path, clock, max_jitter):
+    path = tmp_path / "monitors.json"
+    # Due 10.5 intervals ago
+    path.write_text(json.dumps([make_monitor(START - timedelta(seconds=6300)).dict()], default=str))
+    scheduler = MonitorScheduler(path, no_job)
+    scheduler._load()
+    monitor = scheduler.monitors["m1"]
+    assert monitor.missed_runs == 10
+    # One catch-up run, jittered like a new monitor
+    assert monitor.next_run_at == START + timedelta(seconds=600 * JITTER_FRACTION)
+
+def test_monitors_not_yet_due_are_loaded_unchanged(tmp_path, clock):
+    path = tmp_path / "monitors.json"
+    due = START + timedelta(seconds=30)
+    path.write_text(json.dumps([make_monitor(due).dict()], default=str))
+    scheduler = MonitorScheduler(path, no_job)
+    scheduler._load()
+    assert scheduler.monitors["m1"].next_run_at == due
+    assert scheduler.monitors["m1"].missed_runs == 0
+
+def test_a_long_run_skips_the_slots_it_overran(tmp_path, clock):
+    async def slow_job(url, task, perspective):
+        # Runs for two and a half intervals
+        clock.advance(1500)
+        return {"session_id": "s1", "overall_score": 7, "change": None}
+
+    scheduler = MonitorScheduler(tmp_path / "monitors.json", slow_job, origin_interval=0)
+    monitor = make_monitor(START)
+    scheduler.monitors["m1"] = monitor
+    asyncio.run(scheduler._run(monitor))
+    assert monitor.runs == 1
+    assert monitor.next_run_at == START + timedelta(seconds=1800)
+    assert monitor.last_results == [{
+        "url": "https://a.example/", "task": None, "perspective": "new_user",
+        "session_id": "s1", "overall_score": 7, "change": None,
+    }]
+
+def test_failed_jobs_are_recorded_in_the_results(tmp_path, clock):
+    async def failing_job(url, task, perspective):
+        raise RuntimeError("browser crashed")
+
+    scheduler = MonitorScheduler(tmp_path / "monitors.json", failing_job, origin_interval=0)
+    monitor = make_monitor(START)
+    monitor.tasks = ["Sign up"]
+    scheduler.monitors["m1"] = monitor
+    asyncio.run(scheduler._run(monitor))
+    assert monitor.last_results[0]["error"] == "browser crashed"
+    assert monitor.next_run_at == START + timedelta(seconds=600)
+
+def test_requests_to_one_origin_are_spaced_out(clock):
+    limiter = OriginRateLimiter(2.0)
+
+    async def run():
+        await limiter.wait("https://a.example/one")
+        await limiter.wait("https://a.example/two")
+        # Another origin is not held back
+        await limiter.wait("https://b.example/")
+        clock.advance(5)
+        await limiter.wait("https://a.example/three")
+
+    asyncio.run(run())
+    assert clock.sleeps == [2.0]
+
+def test_concurrent_requests_to_one_origin_queue_up(clock):
+    limiter = OriginRateLimiter(2.0)
+    started = []
+
+    async def request(url):
+        await limiter.wait(url)
+        started.append((url, clock.monotonic()))
+
+    async def run():
+        await asyncio.gather(*(request(f"https://a.example/{n}") for n in range(3)))
+
+    asyncio.run(run())
+    assert [at for _, at in started] == [1000.0, 1002.0, 1004.0]
@@ -0,0 +1,85 @@
+"""Monte Carlo persona simulation: seeding, backends and trace building"""
+
+import pytest
+
+import monte_carlo
+from config import USER_PERSONAS
+from monte_carlo import persona_seed, simulate_persona, simulate_population, trace_from_session, wilson_interval
+
+TRACE = [
+    {"name": "Open the home page", "time": 1.0, "findability": 0.95},
+    {"name": "Looking for the signup link", "time": 2.0, "findability": 0.6},
+    {"name": "Could not find the submit button", "time": 1.5, "findability": 0.2},
+]
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(monte_carlo, "optional_import", lambda name: None)
+    return request.param
+
+def test_same_seed_reproduces_results(backend):
+    first = simulate_population(TRACE, users=2000, seed=7)
+    second = simulate_population(TRACE, users=2000, seed=7)
+    assert first == second
+    assert first["backend"] == backend
+
+def test_different_seeds_differ(backend):
+    first = simulate_population(TRACE, ["new_user"], users=2000, seed=1)
+    second = simulate_population(TRACE, ["new_user"], users=2000, seed=2)
+    assert first["personas"] != second["personas"]
+
+def test_personas_are_seeded_independently_of_the_others_listed(backend):
+    alone = simulate_population(TRACE, ["expert_user"], users=1000, seed=10)
+    listed = simulate_population(TRACE, ["new_user", "expert_user"], users=1000, seed=10)
+    listed_first = simulate_population(TRACE, ["expert_user", "elderly_user"], users=1000, seed=10)
+    assert alone["personas"]["expert_user"] == listed["personas"]["expert_user"]
+    assert alone["personas"]["expert_user"] == listed_first["personas"]["expert_user"]
+
+def test_personas_get_distinct_streams():
+    assert persona_seed(10, "new_user") == persona_seed(10, "new_user")
+    assert persona_seed(10, "new_user") != persona_seed(10, "expert_user")
+    assert persona_seed(10, "new_user") != persona_seed(11, "new_user")
+
+def test_drop_off_accounts_for_every_user(backend):
+    result = simulate_persona(TRACE, USER_PERSONAS["new_user"], users=3000, seed=3)
+    dropped = sum(step["dropped"] for step in result["drop_off"])
+    successes = round(result["success_probability"] * 3000)
+    assert dropped + successes == 3000
+    assert result["drop_off"][0]["reached"] == 3000
+    interval = result["confidence_interval"]
+    assert interval["low"] <= result["success_probability"] <= interval["high"]
+    percentiles = list(result["time_to_complete_ms"].values())
+    assert percentiles == sorted(percentiles)
+
+def test_invalid_input_is_rejected():
+    with pytest.raises(ValueError, match="Unknown personas"):
+        simulate_population(TRACE, ["nobody"])
+    with pytest.raises(ValueError, match="no steps"):
+        simulate_population([])
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) == {"low": 0.0, "high": 0.0}
+    interval = wilson_interval(50, 100)
+    assert interval["low"] == pytest.approx(0.4038, abs=1e-4)
+    assert interval["high"] == pytest.approx(0.5962, abs=1e-4)
+    assert wilson_interval(10, 10)["high"] == 1.0
+
+def test_trace_from_task_session_splits_time_across_steps():
+    trace = trace_from_session({"task_result": {
+        "time_taken": 3.0,
+        "steps_attempted": ["Clicked Sign up", "Tried the footer link", "Could not submit"],
+    }})
+    assert [step["time"] for step in trace] == [1.0, 1.0, 1.0]
+    assert [step["findability"] for step in trace] == [0.95, 0.6, 0.2]
+    assert trace_from_session({}) == []
+
+def test_trace_from_journey_session_marks_failed_steps_hard():
+    trace = trace_from_session({"journey_steps": [
+        {"task_description": "Sign up", "time_taken": 2.0, "success": True, "steps_attempted": ["Clicked"]},
+        {"task_description": "Log in", "time_taken": 0.0, "success": False, "steps_attempted": []},
+    ]})
+    assert [step["findability"] for step in trace] == [0.95, 0.2]
+    assert trace[1]["time"] == 0.001
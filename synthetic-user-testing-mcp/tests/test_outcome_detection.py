@@ -0,0 +1,106 @@
+"""
+Task outcome detection (page_scripts.observe_outcome) against fixture pages.
+
+Needs Chromium: the tests are skipped where Playwright or its browser cannot
+be launched.
+"""
+
+import asyncio
+from urllib.parse import urlsplit
+
+import pytest
+
+pytest.importorskip("playwright.async_api")
+
+import page_scripts
+from config import TASK_PATTERNS
+
+SIGNALS = TASK_PATTERNS["signup"]["outcome_signals"]
+ORIGIN = "http://fixture.test"
+
+def form_page(on_click: str, before: str = "") -> str:
+    return (
+        f"<html><body>{before}<form><input type='email' name='email'>"
+        f"<button type='button' id='submit' onclick=\"{on_click}\">Sign up</button>"
+        f"</form></body></html>"
+    )
+
+def observe(pages, timeout: float = 1500):
+    """Open "/" of ``pages`` (path -> HTML), click #submit and return the verdict"""
+    async def scenario():
+        from playwright.async_api import async_playwright
+        async with async_playwright() as playwright:
+            try:
+                browser = await playwright.chromium.launch()
+            except Exception as e:
+                pytest.skip(f"Chromium cannot be launched: {e}")
+            try:
+                context = await browser.new_context()
+                await page_scripts.install(context)
+
+                async def serve(route):
+                    path = urlsplit(route.request.url).path
+                    await route.fulfill(
+                        status=200 if path in pages else 404,
+                        content_type="text/html",
+                        body=pages.get(path, "")
+                    )
+                await context.route(f"{ORIGIN}/**", serve)
+
+                page = await context.new_page()
+                await page.goto(f"{ORIGIN}/")
+                return await page_scripts.observe_outcome(
+                    page, SIGNALS, lambda: page.click("#submit"), timeout=timeout
+                )
+            finally:
+                await browser.close()
+    return asyncio.run(scenario())
+
+def test_success_shown_synchronously_by_the_click():
+    verdict = observe({"/": form_page(
+        "document.body.insertAdjacentHTML('beforeend', '<p>Thank you for signing up</p>')"
+    )})
+    assert verdict["status"] == "success"
+    assert verdict["signal"] == "thank you"
+    assert verdict["url_changed"] is False
+
+def test_success_shown_after_a_delay():
+    verdict = observe({"/": form_page(
+        "setTimeout(() => document.body.insertAdjacentHTML('beforeend', '<div class=confirmation>Done</div>'), 300)"
+    )})
+    assert verdict["status"] == "success"
+    assert verdict["signal"] == ".confirmation"
+
+def test_error_message():
+    verdict = observe({"/": form_page(
+        "document.body.insertAdjacentHTML('beforeend', '<p class=error>That email is invalid</p>')"
+    )})
+    assert verdict["status"] == "error"
+
+def test_timeout_when_nothing_happens():
+    verdict = observe({"/": form_page("")}, timeout=500)
+    assert verdict["status"] == "timeout"
+    assert verdict["signal"] is None
+
+def test_signal_already_visible_does_not_count():
+    verdict = observe({"/": form_page(
+        "", before="<p class=welcome>Welcome back! Thank you for visiting</p>"
+    )}, timeout=500)
+    assert verdict["status"] == "timeout"
+
+def test_success_page_after_navigation():
+    verdict = observe({
+        "/": form_page("location.href = '/thanks'"),
+        "/thanks": "<html><body><h1>Account created</h1></body></html>",
+    })
+    assert verdict["status"] == "success"
+    assert verdict["signal"] == "account created"
+    assert verdict["url_changed"] is True
+
+def test_navigation_to_a_page_without_signals_times_out():
+    verdict = observe({
+        "/": form_page("location.href = '/next'", before="<p>Welcome</p>"),
+        "/next": "<html><body><h1>Next step</h1></body></html>",
+    }, timeout=800)
+    assert verdict["status"] == "timeout"
+    assert verdict["url_changed"] is True
@@ -0,0 +1,149 @@
+"""Progress notifications: ordering, throttling and calls without a token"""
+
+import asyncio
+
+import pytest
+
+import progress
+from progress import PARTIAL_RESULT_KEY, ProgressReporter, StepLog
+
+pytest.importorskip("mcp")
+
+class FakeSession:
+    def __init__(self):
+        self.sent = []
+
+    async def send_notification(self, notification, request_id):
+        assert request_id == "request-1"
+        self.sent.append(notification.params)
+
+class FakeContext:
+    def __init__(self):
+        self.session = FakeSession()
+        self.request_id = "request-1"
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def context(monkeypatch):
+    context = FakeContext()
+    monkeypatch.setattr(progress, "_progress_target", lambda: (context, "token-1"))
+    return context
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(progress.time, "monotonic", clock)
+    return clock
+
+def sent(context):
+    return [(params.progress, params.message) for params in context.session.sent]
+
+def test_awaited_reports_are_sent_in_order_with_partial_results(context):
+    async def run():
+        reporter = ProgressReporter("analyze_usability", total=3)
+        await reporter.advance("Analyzed a", {"url": "a"})
+        await reporter.advance("Analyzed b", {"url": "b"})
+        await reporter.advance_to(3, "Analyzed c")
+
+    asyncio.run(run())
+    assert sent(context) == [(1, "Analyzed a"), (2, "Analyzed b"), (3, "Analyzed c")]
+    params = context.session.sent[0]
+    assert params.progress_token == "token-1"
+    assert params.total == 3
+    assert params.meta[PARTIAL_RESULT_KEY] == {"tool": "analyze_usability", "result": {"url": "a"}}
+    assert context.session.sent[2].meta is None
+
+def test_steps_posted_in_quick_succession_are_coalesced(context, clock):
+    async def run():
+        reporter = ProgressReporter("simulate_task", min_post_interval=1.0)
+        steps = StepLog(reporter)
+        steps.append("Navigated")
+        await asyncio.sleep(0)
+        for step in ("Clicked Sign up", "Filled the form", "Submitted"):
+            clock.now += 0.1
+            steps.append(step)
+            await asyncio.sleep(0)
+        # Nothing new goes out until the interval has passed, or the call ends
+        during = sent(context)
+        await reporter.close()
+        return during, list(steps)
+
+    during, steps = asyncio.run(run())
+    assert during == [(1, "Navigated")]
+    assert sent(context) == [(1, "Navigated"), (4, "Submitted")]
+    assert context.session.sent[1].meta[PARTIAL_RESULT_KEY]["result"] == {
+        "step": 4, "description": "Submitted",
+    }
+    # The step list itself keeps every step
+    assert steps == ["Navigated", "Clicked Sign up", "Filled the form", "Submitted"]
+
+def test_posts_go_out_once_the_interval_has_passed(context, clock):
+    async def run():
+        reporter = ProgressReporter("simulate_task", min_post_interval=1.0)
+        steps = StepLog(reporter)
+        for step in ("one", "two", "three"):
+            steps.append(step)
+            await asyncio.sleep(0)
+            clock.now += 1.5
+        await reporter.close()
+
+    asyncio.run(run())
+    assert sent(context) == [(1, "one"), (2, "two"), (3, "three")]
+
+def test_an_awaited_report_sends_a_waiting_post_first(context, clock):
+    async def run():
+        reporter = ProgressReporter("simulate_journey", total=3, min_post_interval=1.0)
+        reporter.post("first")
+        await asyncio.sleep(0)
+        reporter.post("second")
+        await reporter.advance("third", {"step": 3})
+        await reporter.close()
+
+    asyncio.run(run())
+    assert sent(context) == [(1, "first"), (2, "second"), (3, "third")]
+
+def test_a_failing_client_does_not_fail_the_call(context):
+    async def broken(notification, request_id):
+        raise ConnectionError("client went away")
+
+    context.session.send_notification = broken
+
+    async def run():
+        reporter = ProgressReporter("crawl_site")
+        await reporter.advance("Crawled a")
+        StepLog(reporter, ["step"])
+        await reporter.close()
+        return reporter.progress
+
+    assert asyncio.run(run()) == 2
+
+def test_nothing_is_sent_without_a_progress_token(monkeypatch):
+    monkeypatch.setattr(progress, "_progress_target", lambda: (None, None))
+
+    async def run():
+        reporter = ProgressReporter("simulate_task")
+        steps = StepLog(reporter, ["Navigated", "Clicked"])
+        await reporter.advance("Done", {"ok": True})
+        await reporter.close()
+        return reporter, list(steps)
+
+    reporter, steps = asyncio.run(run())
+    assert not reporter.active
+    assert reporter.progress == 3
+    assert steps == ["Navigated", "Clicked"]
+    # Posts did not even start a sender
+    assert reporter._sender is None
+
+def test_calls_outside_a_request_report_nothing():
+    async def run():
+        reporter = ProgressReporter("generate_report")
+        await reporter.advance("Rendered")
+        return reporter.active
+
+    assert asyncio.run(run()) is False
@@ -0,0 +1,138 @@
+"""Report catalog: indexing, paging and removal"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import report_catalog
+from models import Feedback, Session, TaskResult
+from report_catalog import INDEX_NAME, ReportCatalog
+
+START = datetime(2024, 1, 1)
+
+def sessions(url="https://a.example/"):
+    return [
+        Session(session_id="s1", url=url, created_at=START,
+                task_result=TaskResult(success=True, steps_taken=1, time_taken=1.0, steps_attempted=[]),
+                feedback=Feedback(positives=[], negatives=[], overall_score=8,
+                                  perspective="new_user", timestamp=START)),
+        Session(session_id="s2", url=url, created_at=START + timedelta(days=2),
+                task_result=TaskResult(success=False, steps_taken=1, time_taken=1.0, steps_attempted=[])),
+    ]
+
+def add_reports(catalog, count):
+    for n in range(count):
+        report_format = "json" if n % 2 else "markdown"
+        filename = f"report_r{n}.{'json' if n % 2 else 'md'}"
+        catalog.prepare()
+        (catalog.reports_dir / filename).write_text("{}")
+        catalog.add(f"r{n}", report_format, filename,
+                    sessions("https://a.example/" if n % 3 else "https://b.example/"), 2)
+
+def page_through(catalog, **filters):
+    seen, cursor = [], None
+    while True:
+        page = catalog.page(cursor=cursor, **filters)
+        seen.extend(report["report_id"] for report in page["reports"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+def test_entries_record_session_range_and_summary(tmp_path):
+    catalog = ReportCatalog(tmp_path / "reports")
+    add_reports(catalog, 1)
+    entry = catalog.get("r0")
+    assert entry["session_count"] == 2
+    assert entry["sessions_from"] == START.isoformat()
+    assert entry["sessions_to"] == (START + timedelta(days=2)).isoformat()
+    assert entry["summary"]["task_success_rate"] == 50
+    assert entry["summary"]["average_satisfaction_score"] == 8
+    assert "seq" not in ReportCatalog.describe(entry)
+
+def test_pages_run_newest_first_with_filters(tmp_path):
+    catalog = ReportCatalog(tmp_path / "reports")
+    add_reports(catalog, 12)
+    assert page_through(catalog, limit=5) == [f"r{n}" for n in reversed(range(12))]
+    assert page_through(catalog, limit=2, format="json") == [f"r{n}" for n in reversed(range(12)) if n % 2]
+    assert page_through(catalog, limit=2, url_prefix="https://b.example") == ["r9", "r6", "r3", "r0"]
+    assert catalog.page(limit=3)["total_reports"] == 12
+
+def test_since_stops_at_older_reports(tmp_path):
+    catalog = ReportCatalog(tmp_path / "reports")
+    add_reports(catalog, 3)
+    since = catalog.get("r1")["created_at"]
+    page = catalog.page(since=since)
+    assert [report["report_id"] for report in page["reports"]] == ["r2", "r1"]
+    assert page["next_cursor"] is None
+
+def test_index_survives_a_restart_and_honours_removals(tmp_path):
+    catalog = ReportCatalog(tmp_path / "reports")
+    add_reports(catalog, 4)
+    assert catalog.remove("r2")
+    assert not catalog.remove("r2")
+    assert not (tmp_path / "reports" / "report_r2.md").exists()
+
+    reopened = ReportCatalog(tmp_path / "reports")
+    assert [entry["report_id"] for entry in reopened.entries()] == ["r0", "r1", "r3"]
+    entry = reopened.add("r9", "json", "report_r9.json", [], 2)
+    # Sequence numbers keep growing past removed reports
+    assert entry["seq"] == 5
+
+def test_existing_reports_are_indexed_once(tmp_path):
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    (reports / "report_old.json").write_text(json.dumps({"sessions_count": 3, "summary": {"x": 1}}))
+    (reports / "report_older.md").write_text("# Report\n\nSessions analyzed: 7\n")
+    (reports / "notes.txt").write_text("not a report")
+
+    catalog = ReportCatalog(reports)
+    counts = {entry["report_id"]: entry["session_count"] for entry in catalog.entries()}
+    assert counts == {"old": 3, "older": 7}
+    assert (reports / INDEX_NAME).exists()
+    assert len(ReportCatalog(reports)) == 2
+
+def test_catalog_does_not_touch_disk_until_used(tmp_path):
+    ReportCatalog(tmp_path / "reports")
+    assert not (tmp_path / "reports").exists()
+
+@pytest.mark.parametrize("cursor", ["abc", "-1", "1.5", "٣"])
+def test_malformed_cursors_are_rejected(tmp_path, cursor):
+    catalog = ReportCatalog(tmp_path / "reports")
+    add_reports(catalog, 2)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        catalog.page(cursor=cursor)
+
+def index_lines(catalog):
+    return (catalog.reports_dir / INDEX_NAME).read_text().splitlines()
+
+def test_index_is_compacted_once_tombstones_pile_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_catalog, "COMPACT_MIN_TOMBSTONES", 3)
+    catalog = ReportCatalog(tmp_path / "reports")
+    add_reports(catalog, 8)
+    for report_id in ("r0", "r1"):
+        catalog.remove(report_id)
+    assert len(index_lines(catalog)) == 10
+    catalog.remove("r2")
+    # Rewritten with only the five live entries
+    assert [json.loads(line)["report_id"] for line in index_lines(catalog)] == ["r3", "r4", "r5", "r6", "r7"]
+    catalog.remove("r3")
+    reopened = ReportCatalog(tmp_path / "reports")
+    assert [entry["report_id"] for entry in reopened.entries()] == ["r4", "r5", "r6", "r7"]
+    assert page_through(reopened, limit=3, format="json") == ["r7", "r5"]
+
+def test_filtered_pages_after_removals(tmp_path):
+    catalog = ReportCatalog(tmp_path / "reports")
+    add_reports(catalog, 10)
+    catalog.remove("r5")
+    catalog.remove("r4")
+    assert page_through(catalog, limit=1, format="json") == ["r9", "r7", "r3", "r1"]
+    assert page_through(catalog, limit=2, format="markdown") == ["r8", "r6", "r2", "r0"]
+    assert catalog.page(format="pdf")["reports"] == []
+
+def test_until_and_since_bound_the_range(tmp_path):
+    catalog = ReportCatalog(tmp_path / "reports")
+    add_reports(catalog, 6)
+    since, until = catalog.get("r1")["created_at"], catalog.get("r4")["created_at"]
+    assert page_through(catalog, limit=2, since=since, until=until) == ["r4", "r3", "r2", "r1"]
+    assert page_through(catalog, limit=1, format="markdown", since=since, until=until) == ["r4", "r2"]
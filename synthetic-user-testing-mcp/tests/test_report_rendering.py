@@ -0,0 +1,144 @@
+"""Memoized report rendering: unchanged, extended and re-rendered reports"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import Feedback, Session, TaskResult
+from report_rendering import ReportCache, render_report
+
+START = datetime(2024, 1, 1)
+
+def make_session(n, success=True, score=7):
+    return Session(
+        session_id=f"s{n}",
+        url=f"https://a.example/{n}",
+        task_description="Sign up",
+        task_result=TaskResult(success=success, steps_taken=2, time_taken=1.0, steps_attempted=["Clicked"]),
+        feedback=Feedback(positives=["Fast"], negatives=["No search"], overall_score=score,
+                          perspective="new_user", timestamp=START),
+        created_at=START + timedelta(minutes=n),
+    )
+
+def refresh(cache, key, sessions, revisions=None, chunk_size=50):
+    revisions = revisions or [1] * len(sessions)
+    chunks = list(cache.refresh_chunks(key, sessions, revisions, chunk_size))
+    rendered, status, _ = chunks[-1]
+    return rendered, status, chunks
+
+def test_first_call_renders_and_repeats_are_unchanged():
+    cache = ReportCache()
+    sessions = [make_session(n) for n in range(3)]
+    rendered, status, _ = refresh(cache, ("recent", "markdown"), sessions)
+    assert status == "rendered"
+    again, status, chunks = refresh(cache, ("recent", "markdown"), sessions)
+    assert status == "unchanged"
+    assert again is rendered
+    assert chunks == [(rendered, "unchanged", [])]
+
+def test_added_sessions_extend_the_rendering():
+    cache = ReportCache()
+    sessions = [make_session(n) for n in range(3)]
+    rendered, _, _ = refresh(cache, ("recent", "markdown"), sessions)
+    rendered.mark_saved("old", "/tmp/old.md")
+
+    more = sessions + [make_session(3, success=False, score=3)]
+    extended, status, chunks = refresh(cache, ("recent", "markdown"), more)
+    assert status == "extended"
+    assert extended is rendered
+    # Only the new session was rendered
+    assert len(chunks) == 1 and len(chunks[0][2]) == 1
+    assert "Session 4" in chunks[0][2][0]
+    assert extended.summary()["successful_tasks"] == 3
+    # The old report is still recorded, but no longer covers everything
+    assert extended.report_id == "old"
+    assert not extended.report_is_current
+    assert extended.render().split("Generated:")[1].split("\n", 1)[1] == \
+        render_report(more, "markdown").split("Generated:")[1].split("\n", 1)[1]
+
+def test_changed_or_dropped_sessions_force_a_full_render():
+    cache = ReportCache()
+    sessions = [make_session(n) for n in range(3)]
+    rendered, _, _ = refresh(cache, ("recent", "json"), sessions)
+    # s1 was re-saved since
+    again, status, _ = refresh(cache, ("recent", "json"), sessions, [1, 2, 1])
+    assert status == "rendered"
+    assert again is not rendered
+    _, status, _ = refresh(cache, ("recent", "json"), sessions[1:], [2, 1])
+    assert status == "rendered"
+
+def test_json_rendering_is_valid_json():
+    sessions = [make_session(n) for n in range(2)]
+    report = json.loads(render_report(sessions, "json"))
+    assert report["sessions_count"] == 2
+    assert [session["session_id"] for session in report["sessions"]] == ["s0", "s1"]
+    assert report["summary"]["average_satisfaction_score"] == 7
+
+def test_sessions_are_rendered_in_chunks():
+    cache = ReportCache()
+    sessions = [make_session(n) for n in range(5)]
+    _, _, chunks = refresh(cache, ("recent", "markdown"), sessions, chunk_size=2)
+    assert [len(pieces) for _, _, pieces in chunks] == [2, 2, 1]
+
+def test_an_abandoned_render_leaves_the_cache_alone():
+    cache = ReportCache()
+    sessions = [make_session(n) for n in range(4)]
+    previous, _, _ = refresh(cache, ("recent", "markdown"), sessions[:2])
+    previous.mark_saved("old", "/tmp/old.md")
+
+    # A full re-render stopped after its first chunk is not cached
+    chunks = cache.refresh_chunks(("recent", "markdown"), sessions, [2, 1, 1, 1], chunk_size=2)
+    next(chunks)
+    chunks.close()
+    assert cache.get(("recent", "markdown")) is previous
+    assert previous.report_is_current
+
+def test_cache_keeps_the_most_recently_used_renderings():
+    cache = ReportCache(max_entries=2)
+    sessions = [make_session(0)]
+    for selection in ("a", "b"):
+        refresh(cache, (selection, "markdown"), sessions)
+    cache.get(("a", "markdown"))
+    refresh(cache, ("c", "markdown"), sessions)
+    assert cache.get(("b", "markdown")) is None
+    assert cache.get(("a", "markdown")) is not None
+    assert cache.get(("c", "markdown")) is not None
+    cache.forget(("a", "markdown"))
+    assert cache.get(("a", "markdown")) is None
+
+def test_cancelled_extension_still_replaces_the_old_report(monkeypatch):
+    pytest.importorskip("fastmcp")
+    import server
+
+    tester = server.tester
+    monkeypatch.setattr(tester, "report_cache", ReportCache())
+    for session_id in list(tester.sessions):
+        tester.store.remove(session_id)
+    now = datetime.now()
+    for n in range(2):
+        tester.store.save(make_session(n).copy(update={"created_at": now}))
+
+    first = asyncio.run(server.generate_report())
+    assert first["render"] == "rendered"
+
+    tester.store.save(make_session(2).copy(update={"created_at": now}))
+
+    async def cancel(*args, **kwargs):
+        raise asyncio.CancelledError()
+
+    with monkeypatch.context() as patch:
+        patch.setattr(server.ProgressReporter, "advance_to", cancel)
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(server.generate_report())
+    # The old report is still catalogued and not returned as if current
+    assert tester.reports.get(first["report_id"]) is not None
+
+    second = asyncio.run(server.generate_report())
+    assert second["cached"] is False
+    assert second["sessions_included"] == 3
+    # Once its replacement is written, the superseded report is evicted
+    assert tester.reports.get(first["report_id"]) is None
+    assert tester.reports.get(second["report_id"]) is not None
+    assert asyncio.run(server.generate_report())["cached"] is True
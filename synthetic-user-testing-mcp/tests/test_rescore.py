@@ -0,0 +1,99 @@
+"""Offline re-scoring of stored sessions"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from models import Feedback, Session
+from rescore import matches_filter, rescore_chunk, rescore_sessions
+from scoring import METRIC_SCORERS
+from session_store import SessionStore, read_session_file
+
+START = datetime(2024, 1, 1)
+
+SNAPSHOT = {
+    "url": "https://a.example/",
+    "title": "Welcome to the example shop",
+    "main_text": "Welcome! Get started with our products. Read the privacy policy. " * 5,
+    "navigation_elements": ["Home", "Shop", "About", "Contact", "Help"],
+    "load_time": 0.8,
+}
+
+def make_store(tmp_path, count=6):
+    store = SessionStore(tmp_path / "sessions")
+    for n in range(count):
+        store.save(Session(
+            session_id=f"s{n}",
+            url="https://a.example/" if n % 2 else "https://b.example/",
+            snapshot=SNAPSHOT if n else None,
+            feedback=Feedback(positives=[], negatives=[], overall_score=1,
+                              perspective="new_user" if n % 3 else "expert_user", timestamp=START),
+            created_at=START + timedelta(days=n),
+        ))
+    return store
+
+def test_matches_filter():
+    data = {"session_id": "s1", "url": "https://a.example/x", "created_at": START.isoformat(),
+            "feedback": {"perspective": "new_user"}}
+    assert matches_filter(data, {})
+    assert matches_filter(data, {"url_prefix": "https://a.example", "perspective": "new_user"})
+    assert not matches_filter(data, {"url_prefix": "https://b.example"})
+    assert not matches_filter(data, {"perspective": "expert_user"})
+    assert not matches_filter(data, {"session_ids": ["s2"]})
+    assert matches_filter(data, {"since": "2023-12-31", "until": "2024-01-02"})
+    assert not matches_filter(data, {"since": "2024-01-02"})
+    assert not matches_filter({"url": ""}, {"until": "2024-01-02"})
+
+def test_chunk_rewrites_matching_sessions_in_place(tmp_path):
+    store = make_store(tmp_path)
+    paths = sorted(str(path) for path in store.iter_paths())
+    result = rescore_chunk(paths, {"url_prefix": "https://a.example"}, ["elderly_user"])
+
+    # s1, s3 and s5 match; s0 has no snapshot and is skipped with the b.example ones
+    assert sorted(row["session_id"] for row in result["rows"]) == ["s1", "s3", "s5"]
+    assert (result["scanned"], result["skipped"], result["failed"]) == (6, 3, 0)
+    data = read_session_file(store.path_for("s1"))
+    assert data["feedback"]["overall_score"] != 1
+    assert set(data["metric_scores"]) == set(METRIC_SCORERS)
+    assert set(data["perspective_scores"]) == {"elderly_user"}
+    assert data["rescored_at"]
+    # Untouched sessions keep their old scores
+    assert read_session_file(store.path_for("s2"))["feedback"]["overall_score"] == 1
+
+def test_rescoring_is_reproducible(tmp_path):
+    store = make_store(tmp_path)
+    paths = [str(store.path_for("s4"))]
+    first = rescore_chunk(paths, None, ["new_user", "mobile_user"])["rows"]
+    second = rescore_chunk(paths, None, ["new_user", "mobile_user"])["rows"]
+    assert first[0]["new_score"] == second[0]["new_score"]
+    assert first[0]["perspective_scores"] == second[0]["perspective_scores"]
+
+def test_unreadable_files_are_counted_as_failed(tmp_path):
+    store = make_store(tmp_path, count=2)
+    broken = store.sessions_dir / "broken.json"
+    broken.write_text("{")
+    result = rescore_chunk([str(broken), str(store.path_for("s1"))], None, None)
+    assert result["failed"] == 1
+    assert len(result["rows"]) == 1
+
+def test_rescore_sessions_across_the_pool_reloads_held_sessions(tmp_path):
+    store = make_store(tmp_path)
+    chunks = []
+    summary = asyncio.run(rescore_sessions(
+        store, {"perspective": "new_user"}, workers=2, chunk_size=2, on_chunk=chunks.append
+    ))
+    assert summary["scanned"] == 6
+    # s1, s2, s4 and s5 used new_user
+    assert summary["rescored"] == 4
+    assert summary["failed"] == 0
+    assert len(chunks) == 3
+    # The server's in-memory copies were reloaded from the rewritten files
+    assert store.get("s1").feedback.overall_score != 1
+    assert store.get("s1").rescored_at is not None
+    # s3 used another perspective and was left alone
+    assert store.get("s3").feedback.overall_score == 1
+
+def test_rescore_sessions_by_id(tmp_path):
+    store = make_store(tmp_path)
+    summary = asyncio.run(rescore_sessions(store, {"session_ids": ["s2", "missing"]}, workers=1))
+    assert summary["scanned"] == 1
+    assert summary["rescored"] == 1
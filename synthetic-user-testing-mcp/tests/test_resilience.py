@@ -0,0 +1,193 @@
+"""Retries, circuit breakers and deadlines"""
+
+import asyncio
+
+import pytest
+
+import deadlines
+import resilience
+from deadlines import DeadlineExceeded, clamp_playwright_call, deadline, remaining
+from resilience import (
+    BASE_BACKOFF_SECONDS, CircuitBreakers, CircuitOpenError, RetryableStatusError, RetryReport, retry_call,
+    with_deadline
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping, with jitter pinned to 1.0"""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: 1.0)
+    return delays
+
+def failing(*errors, result="ok"):
+    """A call that raises ``errors`` in turn and then returns ``result``"""
+    calls = []
+
+    async def call():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+    return call, calls
+
+def test_transient_failures_are_retried_with_doubling_backoff(sleeps):
+    call, calls = failing(ConnectionError("reset"), RetryableStatusError(503))
+    report = RetryReport()
+    assert asyncio.run(retry_call(call, "https://a.example/", report=report)) == "ok"
+    assert len(calls) == 3
+    assert sleeps == [BASE_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2]
+    assert report.as_dict() == {
+        "attempts": 3,
+        "retried_errors": ["ConnectionError: reset", "RetryableStatusError: HTTP status 503"],
+    }
+
+def test_retries_stop_after_max_retries(sleeps):
+    call, calls = failing(*[ConnectionError("reset")] * 10)
+    report = RetryReport()
+    with pytest.raises(ConnectionError):
+        asyncio.run(retry_call(call, "https://a.example/", retries=3, report=report))
+    # One attempt plus three retries
+    assert len(calls) == 4
+    assert report.attempts == 4
+    assert sleeps == [0.5, 1.0, 2.0]
+
+def test_jitter_scales_the_backoff(sleeps, monkeypatch):
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: low)
+    call, _ = failing(ConnectionError("reset"))
+    asyncio.run(retry_call(call, "https://a.example/"))
+    assert sleeps == [BASE_BACKOFF_SECONDS * 0.5]
+
+def test_other_errors_are_not_retried(sleeps):
+    call, calls = failing(ValueError("bad selector"))
+    with pytest.raises(ValueError):
+        asyncio.run(retry_call(call, "https://a.example/"))
+    assert len(calls) == 1
+    assert sleeps == []
+
+def test_breaker_opens_per_origin_and_recovers_after_a_trial(clock, sleeps):
+    breakers = CircuitBreakers(failure_threshold=2, reset_timeout=30)
+    call, _ = failing(*[ConnectionError("reset")] * 2)
+    with pytest.raises(ConnectionError):
+        asyncio.run(retry_call(call, "https://a.example/one", breakers, retries=1))
+    assert breakers.snapshot() == {"https://a.example": {"state": "open", "failures": 2, "retry_after": 30.0}}
+
+    # Open: calls to the origin fail fast, other origins are unaffected
+    report = RetryReport()
+    call, calls = failing()
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(retry_call(call, "https://a.example/two", breakers, report=report))
+    assert calls == [] and report.circuit_open
+    assert asyncio.run(retry_call(call, "https://b.example/", breakers)) == "ok"
+
+    # Half-open after the cool-down: a single trial call is let through
+    clock.now += 30
+    breaker = breakers.for_url("https://a.example/")
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.release()
+
+    # A failed trial reopens the circuit straight away
+    call, _ = failing(ConnectionError("reset"))
+    with pytest.raises(ConnectionError):
+        asyncio.run(retry_call(call, "https://a.example/", breakers, retries=0))
+    assert breaker.state == "open"
+    assert breaker.retry_after() == 30
+
+    # A successful trial closes it again
+    clock.now += 30
+    call, _ = failing()
+    assert asyncio.run(retry_call(call, "https://a.example/", breakers)) == "ok"
+    assert breaker.state == "closed" and breaker.failures == 0
+    assert breakers.snapshot() == {}
+
+def test_non_transient_errors_do_not_trip_the_breaker(sleeps):
+    breakers = CircuitBreakers(failure_threshold=1)
+    call, _ = failing(ValueError("bad selector"))
+    with pytest.raises(ValueError):
+        asyncio.run(retry_call(call, "https://a.example/", breakers))
+    assert breakers.for_url("https://a.example/").state == "closed"
+
+def test_retries_stop_when_the_backoff_would_pass_the_deadline(sleeps):
+    call, calls = failing(*[ConnectionError("reset")] * 3)
+    report = RetryReport()
+
+    async def run():
+        with deadline(0.2):
+            await retry_call(call, "https://a.example/", report=report)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run())
+    assert len(calls) == 1
+    assert sleeps == []
+    assert report.timed_out
+
+class Page:
+    async def goto(self, url, timeout=None):
+        pass
+
+    async def wait_for_timeout(self, timeout):
+        pass
+
+    async def close(self):
+        pass
+
+def test_playwright_waits_are_clamped_to_the_deadline(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(deadlines.time, "monotonic", clock)
+    page = Page()
+    # Without a deadline nothing changes
+    assert clamp_playwright_call("goto", page.goto, ("u",), {}) == (("u",), {})
+    with deadline(2):
+        assert clamp_playwright_call("goto", page.goto, ("u",), {}) == (("u",), {"timeout": 2000})
+        assert clamp_playwright_call("goto", page.goto, ("u",), {"timeout": 500}) == (("u",), {"timeout": 500})
+        assert clamp_playwright_call("wait_for_timeout", page.wait_for_timeout, (5000,), {}) == ((2000,), {})
+        # Nested deadlines never extend the outer one
+        with deadline(10):
+            assert remaining() == 2
+        clock.now += 3
+        with pytest.raises(DeadlineExceeded):
+            clamp_playwright_call("goto", page.goto, ("u",), {})
+        # Calls that do not wait still go through
+        assert clamp_playwright_call("close", page.close, (), {}) == ((), {})
+    assert remaining() is None
+
+def test_with_deadline_cuts_off_an_overrunning_tool(monkeypatch):
+    monkeypatch.setattr(resilience, "DEADLINE_GRACE_SECONDS", 0)
+
+    @with_deadline(0.01)
+    async def hangs():
+        await asyncio.Event().wait()
+
+    @with_deadline(5)
+    async def gives_up():
+        raise DeadlineExceeded("late")
+
+    @with_deadline(5)
+    async def finishes():
+        return {"success": True, "left": remaining()}
+
+    expected = {"deadline_exceeded": True}
+    assert asyncio.run(hangs()) == {"error": "Deadline of 0.01s exceeded", **expected}
+    assert asyncio.run(gives_up()) == {"error": "Deadline of 5s exceeded", **expected}
+    result = asyncio.run(finishes())
+    assert result["success"] and "deadline_exceeded" not in result
+    assert 0 < result["left"] <= 5
@@ -0,0 +1,145 @@
+"""Retention sweeps over sessions, reports and screenshots"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+from config import RetentionPolicy, ServerConfig
+from models import Session
+from report_catalog import ReportCatalog
+from retention import ORPHAN_GRACE_SECONDS, RetentionCollector
+from session_store import SessionStore
+from shared_cache import SharedCache
+
+DAY = 24 * 60 * 60
+
+def age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+def save_session(store, session_id, screenshot=None):
+    session = Session(
+        session_id=session_id,
+        url="https://example.com",
+        created_at=datetime.now(),
+        snapshot={"screenshot": str(screenshot)} if screenshot else None
+    )
+    store.save(session)
+    return store.path_for(session_id)
+
+def write_screenshot(directory, name, size=10, older_than=ORPHAN_GRACE_SECONDS + 60):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    age(path, older_than)
+    return path
+
+def collector(tmp_path, policies=None, **options):
+    options.setdefault("pause", 0)
+    return RetentionCollector(
+        SessionStore(tmp_path / "sessions"),
+        ReportCatalog(tmp_path / "reports"),
+        tmp_path / "screenshots",
+        policies or {},
+        **options
+    )
+
+def sweep(retention):
+    return asyncio.run(retention.sweep())
+
+def test_retention_is_opt_in_by_default():
+    if "RETENTION_INTERVAL" not in os.environ:
+        assert ServerConfig.RETENTION_INTERVAL == 0
+    for kind, policy in ServerConfig.RETENTION.items():
+        if not any(key.startswith(f"RETENTION_{kind.upper()}_MAX") for key in os.environ):
+            assert policy.max_age_days == 0
+            assert policy.max_bytes == 0
+
+def test_default_policies_delete_nothing(tmp_path):
+    retention = collector(tmp_path, dict(ServerConfig.RETENTION))
+    session_path = save_session(retention.store, "old")
+    age(session_path, 400 * DAY)
+    screenshot = write_screenshot(tmp_path / "screenshots", "kept.png", older_than=400 * DAY)
+    save_session(retention.store, "refers", screenshot)
+
+    result = sweep(retention)
+
+    assert result["sessions"]["deleted"] == 0
+    assert result["screenshots"]["deleted"] == 0
+    assert screenshot.exists()
+
+def test_expired_sessions_are_deleted_in_batches(tmp_path):
+    retention = collector(tmp_path, {"sessions": RetentionPolicy(max_age_days=30)}, batch_size=2)
+    for index in range(5):
+        age(save_session(retention.store, f"old-{index}"), 40 * DAY)
+    save_session(retention.store, "new")
+
+    result = sweep(retention)
+
+    assert result["sessions"]["deleted"] == 5
+    assert result["sessions"]["kept"] == 1
+    assert [path.name for path in (tmp_path / "sessions").iterdir()] == ["new.json"]
+    assert retention.store.get("old-0") is None
+
+def test_cold_sessions_are_compressed(tmp_path):
+    retention = collector(tmp_path, {"sessions": RetentionPolicy(compress_after_days=7)}, codec="gzip")
+    age(save_session(retention.store, "cold"), 10 * DAY)
+    save_session(retention.store, "hot")
+
+    result = sweep(retention)
+
+    assert result["sessions"]["compressed"] == 1
+    assert (tmp_path / "sessions" / "cold.json.gz").exists()
+    assert (tmp_path / "sessions" / "hot.json").exists()
+
+def test_size_limit_deletes_oldest_screenshots_first(tmp_path):
+    retention = collector(tmp_path, {"screenshots": RetentionPolicy(max_bytes=25)})
+    shots = tmp_path / "screenshots"
+    oldest = write_screenshot(shots, "a.png", older_than=3 * DAY)
+    middle = write_screenshot(shots, "b.png", older_than=2 * DAY)
+    newest = write_screenshot(shots, "c.png", older_than=1 * DAY)
+    for index, path in enumerate((oldest, middle, newest)):
+        save_session(retention.store, f"s{index}", path)
+
+    result = sweep(retention)
+
+    assert result["screenshots"]["deleted"] == 1
+    assert not oldest.exists() and middle.exists() and newest.exists()
+
+def test_orphans_respect_every_reference(tmp_path):
+    shots = tmp_path / "screenshots"
+    by_session = write_screenshot(shots, "session.png")
+    by_change = write_screenshot(shots, "change.png")
+    by_cache = write_screenshot(shots, "cache.png")
+    orphan = write_screenshot(shots, "orphan.png")
+    fresh = write_screenshot(shots, "fresh.png", older_than=0)
+
+    changes = tmp_path / "changes"
+    changes.mkdir()
+    (changes / "entry.json").write_text(json.dumps({
+        "url": "https://example.com", "snapshot": {"screenshot": str(by_change)}
+    }))
+    cache = SharedCache(tmp_path / "cache.sqlite3", ttl=60)
+    cache.put("snapshot", "browser https://example.com", {"screenshot": str(by_cache)})
+
+    retention = collector(tmp_path, changes_dir=changes, shared_cache=cache)
+    save_session(retention.store, "s", by_session)
+
+    result = sweep(retention)
+
+    assert result["screenshots"]["orphans"] == 1
+    assert not orphan.exists()
+    assert all(path.exists() for path in (by_session, by_change, by_cache, fresh))
+
+def test_unreadable_change_entry_keeps_orphans(tmp_path):
+    orphan = write_screenshot(tmp_path / "screenshots", "orphan.png")
+    changes = tmp_path / "changes"
+    changes.mkdir()
+    (changes / "broken.json").write_text("{not json")
+
+    result = sweep(collector(tmp_path, changes_dir=changes))
+
+    assert result["screenshots"]["orphans"] == 0
+    assert orphan.exists()
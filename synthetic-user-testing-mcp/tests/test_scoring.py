@@ -0,0 +1,94 @@
+"""Metric scoring and ranking"""
+
+import random
+
+import pytest
+
+from scoring import METRIC_SCORERS, ScoringEngine, comparable_speed_inputs, default_weights, score_speed
+
+BROWSER = {"tier": "browser", "load_time": 1.5, "performance": {
+    "ttfb": 200, "fcp": 900, "lcp": 5000, "tbt": 800, "cls": 0.01
+}}
+HTTP = {"tier": "http", "load_time": 0.4, "performance": {"ttfb": 600}}
+
+def test_single_tier_snapshots_are_scored_as_they_are():
+    snapshots, basis = comparable_speed_inputs([BROWSER, dict(BROWSER)])
+    assert basis is None
+    assert snapshots[0]["performance"] == BROWSER["performance"]
+
+def test_mixed_tiers_are_compared_on_shared_vitals():
+    snapshots, basis = comparable_speed_inputs([BROWSER, HTTP])
+    assert basis == ["ttfb"]
+    assert [snapshot["performance"] for snapshot in snapshots] == [{"ttfb": 200}, {"ttfb": 600}]
+    # The browser page's slow LCP and TBT no longer count against it
+    assert score_speed("", snapshots[0]) > score_speed("", BROWSER)
+    # The caller's snapshots are left alone
+    assert BROWSER["performance"]["lcp"] == 5000
+
+def test_mixed_tiers_without_shared_vitals_fall_back_to_load_time():
+    snapshots, basis = comparable_speed_inputs([BROWSER, {"tier": "http", "load_time": 0.4}])
+    assert basis == ["load_time"]
+    assert all(snapshot["performance"] == {} for snapshot in snapshots)
+
+def test_rank_orders_by_weighted_composite():
+    engine = ScoringEngine(["clarity", "trust"], {"clarity": 1, "trust": 1})
+    pages = [
+        {"title": "", "main_text": ""},
+        {"title": "Home", "main_text": "privacy " * 20, "navigation_elements": ["a", "b", "c"]},
+    ]
+    ranked = engine.rank(["http://a", "https://b"], pages)
+    assert [entry["url"] for entry in ranked["rankings"]["overall"]] == ["https://b", "http://a"]
+    assert ranked["weights"] == {"clarity": 0.5, "trust": 0.5}
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError):
+        ScoringEngine(["clarity", "vibes"])
+
+def test_default_weights_fall_back_to_equal():
+    assert default_weights(["navigation"]) == {"navigation": 1.0}
+
+def random_snapshot(rng):
+    snapshot = {
+        "title": rng.choice(["", "Home"]),
+        "main_text": rng.choice(["", "short", "Read our privacy policy. " * 10, "x" * 150]),
+        "navigation_elements": ["link"] * rng.randint(0, 7),
+        "load_time": rng.choice([0.5, 1.5, 2.5, 4.0, 9.0]),
+        "performance": {
+            name: rng.choice([None, rng.uniform(0, 2) * poor])
+            for name, poor in [("ttfb", 1800), ("fcp", 3000), ("lcp", 4000), ("tbt", 600), ("cls", 0.25)]
+        },
+    }
+    if rng.random() < 0.8:
+        images, inputs = rng.randint(0, 6), rng.randint(0, 4)
+        snapshot["page_signals"] = {
+            "images": images,
+            "images_missing_alt": rng.randint(0, images),
+            "form_inputs": inputs,
+            "unlabeled_inputs": rng.randint(0, inputs),
+            "html_lang": rng.choice(["", "en"]),
+            "has_viewport_meta": rng.random() < 0.5,
+            "horizontal_overflow": rng.random() < 0.5,
+        }
+    if rng.random() < 0.8:
+        snapshot["findability"] = {"tasks": {
+            f"task{n}": rng.choice([None, {"clicks": rng.randint(0, 7)}]) for n in range(rng.randint(0, 4))
+        }}
+    return snapshot
+
+def test_vectorized_scores_match_scalar_scorers():
+    pytest.importorskip("numpy")
+    rng = random.Random(27)
+    snapshots = [random_snapshot(rng) for _ in range(300)]
+    urls = [rng.choice(["http://example.test", "https://example.test"]) for _ in snapshots]
+    engine = ScoringEngine(list(METRIC_SCORERS), None)
+    matrix = engine.score_matrix(urls, snapshots)
+    expected = [[scorer(url, snapshot) for scorer in METRIC_SCORERS.values()]
+                for url, snapshot in zip(urls, snapshots)]
+    assert matrix.tolist() == expected
+
+def test_score_matrix_of_no_pages_is_empty():
+    assert len(ScoringEngine(["speed"], None).score_matrix([], [])) == 0
+
+def test_configured_weights_sum_to_one():
+    from config import USABILITY_METRICS
+    assert sum(metric["weight"] for metric in USABILITY_METRICS.values()) == pytest.approx(1.0)
@@ -0,0 +1,123 @@
+"""Session listing: cursor paging, filters and counts"""
+
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import Feedback, Session, TaskResult
+from session_store import MAX_PAGE_SIZE, SessionStore, classify_task
+
+START = datetime(2024, 1, 1)
+
+def make_session(n, url="https://a.example/page", task=None, success=None, perspective="new_user"):
+    return Session(
+        session_id=f"s{n:03d}",
+        url=url,
+        task_description=task,
+        perspective=perspective,
+        task_result=TaskResult(success=success, steps_taken=1, time_taken=0.1, steps_attempted=[])
+        if success is not None else None,
+        created_at=START + timedelta(minutes=n),
+    )
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(tmp_path / "sessions")
+    for n in range(25):
+        store.save(make_session(
+            n,
+            url="https://a.example/page" if n % 2 else "https://b.example/page",
+            task="Sign up for an account" if n % 3 == 0 else None,
+            success=(n % 4 == 0) if n % 3 == 0 else None,
+        ))
+    return store
+
+def page_through(store, **filters):
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = store.query(cursor=cursor, **filters)
+        seen.extend(summary["session_id"] for summary in page["sessions"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen, pages
+
+def test_cursor_pages_cover_every_session_newest_first(store):
+    seen, pages = page_through(store, limit=7)
+    assert seen == [f"s{n:03d}" for n in reversed(range(25))]
+    assert pages == 4
+
+def test_last_full_page_has_no_cursor(store):
+    page = store.query(limit=25)
+    assert len(page["sessions"]) == 25
+    assert page["next_cursor"] is None
+
+def test_filters_apply_across_pages(store):
+    seen, _ = page_through(store, limit=3, url_prefix="https://a.example", task_type="signup")
+    assert seen == [f"s{n:03d}" for n in reversed(range(25)) if n % 2 and n % 3 == 0]
+    seen, _ = page_through(store, limit=2, success=True)
+    assert seen == [f"s{n:03d}" for n in reversed(range(25)) if n % 12 == 0]
+
+def test_time_range_and_counts(store):
+    since = (START + timedelta(minutes=5)).isoformat()
+    until = (START + timedelta(minutes=9)).isoformat()
+    seen, _ = page_through(store, since=since, until=until)
+    assert seen == ["s009", "s008", "s007", "s006", "s005"]
+    assert store.query(since=since, until=until, count_only=True) == {"total_sessions": 5}
+    assert store.query(url_prefix="https://b.example", count_only=True) == {"total_sessions": 13}
+
+def test_sessions_saved_between_pages_do_not_shift_the_cursor(store):
+    first = store.query(limit=10)
+    # Newer than everything listed so far, so it belongs before the cursor
+    store.save(make_session(100))
+    second = store.query(cursor=first["next_cursor"], limit=10)
+    assert second["sessions"][0]["session_id"] == "s014"
+
+def test_resaving_a_session_keeps_one_index_entry(store):
+    session = store.get("s003")
+    session.task_result = TaskResult(success=True, steps_taken=2, time_taken=0.2, steps_attempted=[])
+    store.save(session)
+    assert len(store) == 25
+    summary = next(s for s in store.query(limit=MAX_PAGE_SIZE)["sessions"] if s["session_id"] == "s003")
+    assert summary["success"] is True
+
+def test_removed_sessions_leave_listings_and_disk(store):
+    store.remove("s024")
+    assert store.query(limit=1)["sessions"][0]["session_id"] == "s023"
+    assert store.find_path("s024") is None
+    assert len(store) == 24
+
+def test_reload_reads_offline_changes(store):
+    session = store.get("s001")
+    session.feedback = Feedback(positives=[], negatives=[], overall_score=8,
+                                perspective="new_user", timestamp=START)
+    fresh = SessionStore(store.sessions_dir)
+    store.save(session)
+    assert fresh.reload("s001").feedback.overall_score == 8
+    assert fresh.query(limit=1)["sessions"][0]["overall_score"] == 8
+
+def test_classify_task():
+    assert classify_task("Sign up for the newsletter") == "signup"
+    assert classify_task("Find the contact page") == "contact"
+    assert classify_task("Search for shoes") == "search"
+    assert classify_task("Read the pricing") == "generic"
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "////",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode("ascii"),
+    base64.urlsafe_b64encode(b"no separator").decode("ascii"),
+    base64.urlsafe_b64encode(b"|s001").decode("ascii"),
+])
+def test_malformed_cursors_are_rejected(store, cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        store.query(cursor=cursor)
+
+def test_listing_resources_report_a_bad_cursor():
+    pytest.importorskip("fastmcp")
+    import server
+    assert json.loads(asyncio.run(server.list_sessions(cursor="abc"))) == {"error": "Invalid cursor"}
+    assert json.loads(asyncio.run(server.list_reports(cursor="abc"))) == {"error": "Invalid cursor"}
@@ -0,0 +1,133 @@
+"""Shared SQLite cache: TTLs, leases and stampede protection"""
+
+import asyncio
+import time
+
+import pytest
+
+from shared_cache import SharedCache, digest
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "cache.sqlite3"
+
+def test_entries_expire_after_their_ttl(path):
+    cache = SharedCache(path, ttl=60)
+    cache.put("pages", "a", {"title": "A"})
+    cache.put("pages", "b", {"title": "B"}, ttl=0.05)
+    assert cache.get("pages", "a") == {"title": "A"}
+    assert cache.get("scores", "a") is None
+    time.sleep(0.1)
+    assert cache.get("pages", "b") is None
+    assert cache.values("pages") == [{"title": "A"}]
+
+def test_processes_share_entries(path):
+    SharedCache(path, ttl=60).put("pages", "a", [1, 2])
+    assert SharedCache(path, ttl=60).get("pages", "a") == [1, 2]
+
+def test_one_owner_holds_a_lease_until_released_or_expired(path):
+    first = SharedCache(path, ttl=60, lease_seconds=0.1)
+    second = SharedCache(path, ttl=60, lease_seconds=0.1)
+    assert first.try_lease("pages", "a")
+    assert not second.try_lease("pages", "a")
+    # Releasing someone else's lease does nothing
+    second.release("pages", "a")
+    assert not second.try_lease("pages", "a")
+    first.release("pages", "a")
+    assert second.try_lease("pages", "a")
+    time.sleep(0.15)
+    # The holder died; its lease expires
+    assert first.try_lease("pages", "a")
+
+def test_concurrent_misses_compute_once(path):
+    cache = SharedCache(path, ttl=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"score": 7}
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_compute("scores", "a", compute) for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert sorted(status for _, status in results) == ["miss"] + ["waited"] * 4
+    assert all(value == {"score": 7} for value, _ in results)
+    # Each caller gets its own copy
+    assert len({id(value) for value, _ in results}) == 5
+    assert asyncio.run(cache.get_or_compute("scores", "a", compute)) == ({"score": 7}, "hit")
+    assert cache.counts == {"hits": 1, "misses": 1, "waited": 4}
+
+def test_waits_for_another_process_holding_the_lease(path):
+    holder = SharedCache(path, ttl=60)
+    cache = SharedCache(path, ttl=60)
+    assert holder.try_lease("pages", "a")
+
+    async def compute():
+        raise AssertionError("computed while another process held the lease")
+
+    async def run():
+        waiting = asyncio.create_task(cache.get_or_compute("pages", "a", compute))
+        await asyncio.sleep(0.15)
+        holder.put("pages", "a", {"title": "A"})
+        holder.release("pages", "a")
+        return await waiting
+
+    assert asyncio.run(run()) == ({"title": "A"}, "waited")
+
+def test_waiting_on_a_stuck_lease_is_bounded(path):
+    cache = SharedCache(path, ttl=60, lease_seconds=0.2)
+    assert SharedCache(path, ttl=60, lease_seconds=60).try_lease("pages", "a")
+
+    async def compute():
+        return {"title": "A"}
+
+    start = time.monotonic()
+    assert asyncio.run(cache.get_or_compute("pages", "a", compute)) == ({"title": "A"}, "miss")
+    assert time.monotonic() - start < 5
+
+def test_errors_are_not_cached(path):
+    cache = SharedCache(path, ttl=60)
+    results = iter([{"error": "timeout"}, {"title": "A"}])
+
+    async def compute():
+        return next(results)
+
+    def lookup():
+        return asyncio.run(cache.get_or_compute(
+            "pages", "a", compute, cacheable=lambda value: "error" not in value
+        ))
+
+    assert lookup() == ({"error": "timeout"}, "miss")
+    assert lookup() == ({"title": "A"}, "miss")
+    assert lookup() == ({"title": "A"}, "hit")
+
+def test_waiters_retry_when_the_computation_fails(path):
+    cache = SharedCache(path, ttl=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        if len(calls) == 1:
+            raise RuntimeError("browser crashed")
+        return {"title": "A"}
+
+    async def run():
+        return await asyncio.gather(
+            *[cache.get_or_compute("pages", "a", compute) for _ in range(3)],
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert isinstance(results[0], RuntimeError)
+    assert sorted(status for _, status in results[1:]) == ["miss", "waited"]
+    assert len(calls) == 2
+    # The failed computation released its lease
+    assert cache.try_lease("pages", "a")
+
+def test_digest_ignores_key_order():
+    assert digest({"a": 1, "b": [1, 2]}) == digest({"b": [1, 2], "a": 1})
+    assert digest({"a": 1}) != digest({"a": 2})
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Lightweight tracing for the Synthetic User Testing MCP Server.
+
+Spans time individual operations (tool calls, Playwright calls, fixed waits,
+disk writes) and feed per-operation latency histograms. Instrumented
+Playwright calls also have their timeouts fitted to the caller's deadline. Optionally every tool
+request can be captured with cProfile or pyinstrument for offline analysis.
+"""
+
+import functools
+import inspect
+import logging
+import math
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from deadlines import clamp_playwright_call
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("off", "cprofile", "pyinstrument")
+
+# Names of the spans opened by the current request, innermost last
+_active_spans: ContextVar[tuple] = ContextVar("active_spans", default=())
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with constant memory per operation"""
+
+    # Buckets grow by 10% starting at 0.01ms, so percentiles are accurate to
+    # within 10% across the whole range up to several minutes.
+    BASE_MS = 0.01
+    GROWTH = 1.1
+    BUCKETS = 200
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+        self.errors = 0
+
+    def record(self, duration_ms: float, error: bool = False):
+        if duration_ms <= self.BASE_MS:
+            index = 0
+        else:
+            index = min(self.BUCKETS - 1, int(math.log(duration_ms / self.BASE_MS, self.GROWTH)) + 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.min_ms = min(self.min_ms, duration_ms)
+        self.max_ms = max(self.max_ms, duration_ms)
+        if error:
+            self.errors += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0.0
+        threshold = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= threshold:
+                upper = self.BASE_MS * self.GROWTH ** index
+                return min(max(upper, self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+        }
+
+class Tracer:
+    """Collects span latencies and optional per-request profiles"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.profile_mode = "off"
+        self.profile_dir: Optional[Path] = None
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def configure(self, profile_mode: str = "off", profile_dir: Optional[Path] = None):
+        """Set the profiling mode ("off", "cprofile", "pyinstrument") and output directory"""
+        if profile_mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {profile_mode}")
+        self.profile_mode = profile_mode
+        self.profile_dir = profile_dir
+
+    def record(self, name: str, duration_ms: float, error: bool = False):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(duration_ms, error)
+
+    def increment(self, name: str, amount: int = 1):
+        """Bump a plain event counter (cache hits, retries, ...)"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block, sync or async, and record it under ``name``"""
+        token = _active_spans.set(_active_spans.get() + (name,))
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, error)
+            _active_spans.reset(token)
+
+    def current_path(self) -> List[str]:
+        """Names of the spans enclosing the caller, outermost first"""
+        return list(_active_spans.get())
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """Return p50/p95/p99 and counts per operation"""
+        with self._lock:
+            operations = {name: histogram.summary()
+                          for name, histogram in sorted(self.histograms.items())}
+            counters = dict(sorted(self.counters.items()))
+            since = self.started_at
+            if reset:
+                self.histograms = {}
+                self.counters = {}
+                self.started_at = time.time()
+        return {
+            "since": since,
+            "profile_mode": self.profile_mode,
+            "operations": operations,
+            "counters": counters,
+        }
+
+    @contextmanager
+    def profile(self, name: str):
+        """Capture a profile of the enclosed block when profiling is enabled"""
+        if self.profile_mode == "off" or self.profile_dir is None:
+            yield
+            return
+
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        stem = self.profile_dir / f"{name}_{uuid.uuid4()}"
+
+        if self.profile_mode == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument is not installed; skipping profile capture")
+                yield
+                return
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                stem.with_suffix(".html").write_text(profiler.output_html())
+            return
+
+        # cProfile sees every coroutine scheduled on the loop while the request
+        # runs, so concurrent requests show up in each other's captures.
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(str(stem.with_suffix(".prof")))
+
+class _TracedProxy:
+    """Wraps a Playwright object so every awaited method call is recorded as a span"""
+
+    __slots__ = ("_target", "_kind")
+
+    def __init__(self, target: Any):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_kind", type(target).__name__.lower())
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            # Properties such as Locator.first or Page.keyboard
+            return _instrument_result(attr)
+        if not inspect.iscoroutinefunction(attr):
+            # Locators (page.locator(), .nth()) are traced too, so their actions are
+            @functools.wraps(attr)
+            def proxied_call(*args, **kwargs):
+                args, kwargs = _unwrap_arguments(args, kwargs)
+                if name.startswith("expect_"):
+                    # Waits used as context managers, like expect_navigation
+                    args, kwargs = clamp_playwright_call(name, attr, args, kwargs)
+                return _instrument_result(attr(*args, **kwargs))
+            return proxied_call
+
+        # Fixed sleeps are reported separately from real browser work
+        span_name = f"sleep.{name}" if name == "wait_for_timeout" else f"playwright.{self._kind}.{name}"
+
+        @functools.wraps(attr)
+        async def traced_call(*args, **kwargs):
+            args, kwargs = _unwrap_arguments(args, kwargs)
+            # Keep every Playwright wait inside the caller's deadline
+            args, kwargs = clamp_playwright_call(name, attr, args, kwargs)
+            with tracer.span(span_name):
+                result = await attr(*args, **kwargs)
+            return _instrument_result(result)
+        return traced_call
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._target, name, value)
+
+    def __repr__(self) -> str:
+        return f"<traced {self._target!r}>"
+
+def _unwrap(value: Any) -> Any:
+    if isinstance(value, _TracedProxy):
+        return value._target
+    if isinstance(value, list):
+        return [_unwrap(item) for item in value]
+    return value
+
+def _unwrap_arguments(args: tuple, kwargs: Dict[str, Any]) -> Tuple[tuple, Dict[str, Any]]:
+    """Hand Playwright its own objects, e.g. a traced locator passed as ``has=``"""
+    return tuple(_unwrap(arg) for arg in args), {key: _unwrap(value) for key, value in kwargs.items()}
+
+def _instrument_result(result: Any) -> Any:
+    if isinstance(result, list):
+        return [_instrument_result(item) for item in result]
+    if type(result).__module__.startswith("playwright.async_api"):
+        return _TracedProxy(result)
+    return result
+
+def instrument(playwright_object: Any) -> Any:
+    """
+    Trace a Playwright browser, context, page or element handle.
+
+    Objects returned from traced calls and properties (contexts, pages,
+    locators, element handles) are traced as well, so instrumenting the
+    browser covers everything below it.
+    """
+    if playwright_object is None or isinstance(playwright_object, _TracedProxy):
+        return playwright_object
+    return _TracedProxy(playwright_object)
+
+def traced(span_name: str) -> Callable:
+    """Decorate an async function so each call is recorded as ``span_name``"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with tracer.span(span_name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def traced_tool(name: str) -> Callable:
+    """Decorate an async MCP tool with a ``tool.<name>`` span and optional profiling"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with tracer.profile(name), tracer.span(f"tool.{name}"):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Process-wide tracer shared by the server, the tester and the simulators
+tracer = Tracer()
+
+__all__ = [
+    "LatencyHistogram",
+    "PROFILE_MODES",
+    "Tracer",
+    "instrument",
+    "traced",
+    "traced_tool",
+    "tracer",
+]